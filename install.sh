@@ -2,10 +2,15 @@
 
 sudo cp ./conf/ee.ounapuu.LinuxCPUManager.conf /etc/dbus-1/system.d/
 
+# keep an existing config
+sudo mkdir -p /etc/linux-cpu-manager
+sudo cp -n ./conf/linux-cpu-manager.conf /etc/linux-cpu-manager/
+
 sudo mkdir -p /usr/bin/linux-cpu-manager
 sudo cp -a ./src/. /usr/bin/linux-cpu-manager/
 sudo chmod +x /usr/bin/linux-cpu-manager/client
 sudo chmod +x /usr/bin/linux-cpu-manager/service
+sudo chmod +x /usr/bin/linux-cpu-manager/coordinator
 
 sudo cp ./conf/linux-cpu-manager.service /etc/systemd/system/
 sudo systemctl enable linux-cpu-manager.service
\ No newline at end of file
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measures how long one control step takes to apply limits across every cpufreq policy, and how many writes it issues,
+as the number of CPUs grows. Runs on a tmpfs acpi-cpufreq tree, limits change on every step so nothing is elided.
+
+"global" writes max_perf_pct, which lands on scaling_max_freq of every policy,
+"percore" is a step of the per-core governor, one scaling_max_freq per policy at its own limit.
+"""
+
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from drivers.DriverDetection import detect_driver
+from modes.pstate.PerCoreGovernor import PerCorePstateGovernor
+from sensors.HwmonIndex import HwmonIndex
+from simulator.FakeSysfsTree import FakeSysfsTree
+from sysfs.DirectorySysfsBackend import DirectorySysfsBackend
+
+def measure(step, governor, steps):
+    """
+    :return: sorted step durations in seconds, attribute writes per step
+    """
+    writes = governor.get_write_counters()["issued"]
+    samples = []
+    for index in range(steps):
+        started = time.perf_counter()
+        step(index)
+        samples.append(time.perf_counter() - started)
+    return sorted(samples), (governor.get_write_counters()["issued"] - writes) / steps
+
+
+def run(cpu_count, cpus_per_policy, steps):
+    temp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(dir=temp_dir) as root, open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        sysfs = DirectorySysfsBackend(root)
+        tree = FakeSysfsTree(sysfs, driver="acpi-cpufreq", cpu_count=cpu_count, cpus_per_policy=cpus_per_policy)
+        driver = detect_driver(sysfs)
+        governor = PerCorePstateGovernor(driver, HwmonIndex(sysfs), sysfs)
+        governor.enter()
+
+        def global_step(index):
+            governor.write_limit(governor.limits["max_perf_pct"], 60 if index % 2 else 90, True)
+
+        def percore_step(index):
+            # swings every zone limit up and down between steps
+            tree.set_temperature(100 if index % 2 else 40)
+            governor.read_current_temps()
+            governor.apply_action(governor.get_action())
+
+        results = {"global": measure(global_step, governor, steps)}
+        governor.write_limit(governor.limits["max_perf_pct"], governor.max_pct_limit)
+        results["percore"] = measure(percore_step, governor, steps)
+
+        governor.exit()
+        driver.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure per-step limit apply latency by CPU count.")
+    parser.add_argument("--cpus", type=int, action="append", help="CPU counts, 4 to 256 if omitted")
+    parser.add_argument("--cpus-per-policy", type=int, default=1, help="CPUs sharing a cpufreq policy")
+    parser.add_argument("--steps", type=int, default=200, help="control steps per measurement")
+    args = parser.parse_args()
+
+    print("{:>5s} {:>9s} {:<8s} {:>11s} {:>9s} {:>9s}".format(
+        "cpus", "policies", "path", "writes/step", "p50 us", "p95 us"))
+
+    for cpu_count in args.cpus or [4, 16, 64, 256]:
+        policies = -(-cpu_count // args.cpus_per_policy)
+        for path, (samples, writes) in run(cpu_count, args.cpus_per_policy, args.steps).items():
+            print("{:>5d} {:>9d} {:<8s} {:>11.1f} {:>9.1f} {:>9.1f}".format(
+                cpu_count, policies, path, writes, statistics.median(samples) * 1e6,
+                samples[int(len(samples) * 0.95)] * 1e6))
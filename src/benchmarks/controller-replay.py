@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Replays a load trace through the thermal controllers in closed loop with a simulated package
+and compares overshoot and the perf pct they allow.
+
+Trace files are CSV lines of "seconds,load" with load between 0 and 1.
+Exits with 1 if the PID controllers don't keep the package closer to its limit than the step rule,
+both in peak overshoot and in time spent over the limit, or if they buy that with more than
+MAX_MEAN_PCT_LOSS of mean perf pct.
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from controllers.BandController import BandController
+from controllers.PidController import PidController
+from controllers.StepController import StepController
+from controllers.ThermalModel import ThermalModel
+from simulator.LoadTrace import SYNTHETIC_TRACE, load_trace
+from simulator.ThermalPlant import ThermalPlant
+
+TICK_IN_SECONDS = 0.25
+MAX_TEMPERATURE = 90
+MIN_PCT = 20
+MAX_PCT = 100
+# mean perf pct the PID controllers may give up against the step rule for the lower overshoot
+MAX_MEAN_PCT_LOSS = 2
+
+
+def replay(controller, trace, sensor_noise=0.0):
+    """
+    Runs the trace through a controller.
+    :param controller:
+    :param trace: list of (seconds, load)
+    :param sensor_noise: standard deviation of the sensor reading in degrees
+    :return: dict of results
+    """
+    # same noise for every controller
+    noise = random.Random(1)
+    plant = ThermalPlant()
+    pct = MAX_PCT
+    timestamp = 0.0
+
+    temperatures = []
+    loaded_pcts = []
+    pcts = []
+
+    for duration, load in trace:
+        for tick in range(int(duration / TICK_IN_SECONDS)):
+            plant.advance(pct, load, TICK_IN_SECONDS)
+            timestamp += TICK_IN_SECONDS
+
+            # coretemp reports whole degrees
+            temperature = int(plant.die_temperature + noise.gauss(0, sensor_noise))
+            pct = controller.get_max_pct(pct, temperature, MAX_TEMPERATURE, MIN_PCT, MAX_PCT, timestamp)
+
+            temperatures.append(plant.die_temperature)
+            pcts.append(pct)
+            if load >= 0.5:
+                loaded_pcts.append(pct)
+
+    return {
+        "overshoot": max(0, max(temperatures) - MAX_TEMPERATURE),
+        "time_over_limit": sum(TICK_IN_SECONDS for temperature in temperatures if temperature > MAX_TEMPERATURE),
+        "mean_pct": sum(pcts) / len(pcts),
+        "mean_loaded_pct": sum(loaded_pcts) / max(1, len(loaded_pcts)),
+        "energy": plant.energy,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare thermal controllers on a load trace.")
+    parser.add_argument("trace", nargs="?", help="CSV trace of seconds,load, a synthetic trace is used if omitted")
+    parser.add_argument("--noise", type=float, default=0.0, help="sensor noise standard deviation in degrees")
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace) if args.trace else SYNTHETIC_TRACE
+
+    controllers = [
+        ("step", StepController()),
+        ("band", BandController()),
+        ("pid", PidController()),
+        ("pid+model", PidController(model=ThermalModel())),
+    ]
+
+    print("{:<10s} {:>10s} {:>12s} {:>9s} {:>16s} {:>10s}".format(
+        "controller", "overshoot", "over limit", "mean pct", "mean loaded pct", "energy"))
+
+    results = {}
+    for name, controller in controllers:
+        results[name] = replay(controller, trace, args.noise)
+        print("{:<10s} {:>8.2f} C {:>10.2f} s {:>9.1f} {:>16.1f} {:>8.0f} J".format(
+            name, results[name]["overshoot"], results[name]["time_over_limit"], results[name]["mean_pct"],
+            results[name]["mean_loaded_pct"], results[name]["energy"]))
+
+    step = results["step"]
+    failed = False
+    for name in ("pid", "pid+model"):
+        print(("{:s} vs step: overshoot {:+.2f} C, over limit {:+.2f} s, mean pct {:+.1f}, "
+               "mean loaded pct {:+.1f}").format(
+            name, results[name]["overshoot"] - step["overshoot"],
+            results[name]["time_over_limit"] - step["time_over_limit"],
+            results[name]["mean_pct"] - step["mean_pct"],
+            results[name]["mean_loaded_pct"] - step["mean_loaded_pct"]))
+        if results[name]["overshoot"] >= step["overshoot"] or \
+                results[name]["time_over_limit"] >= step["time_over_limit"] or \
+                results[name]["mean_pct"] < step["mean_pct"] - MAX_MEAN_PCT_LOSS:
+            failed = True
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measures D-Bus request latency of the running service under many concurrent clients.
+
+Every client is a separate process with its own bus connection, reused for all of its requests,
+like a dashboard would do. Requests are read-only, the service state is not changed.
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+REQUESTS = {
+    "status": lambda client: client.get_status(),
+    "property": lambda client: client.get_property("Temperature"),
+    "metrics": lambda client: client.get_metrics(),
+}
+
+
+def run_client(request, count, start_barrier, results):
+    # imported here so every process makes its own connection
+    import dbus
+    from dbusclient.ManagerClient import ManagerClient
+
+    client = ManagerClient(dbus.SystemBus(private=True))
+    call = REQUESTS[request]
+    call(client)
+
+    start_barrier.wait()
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        call(client)
+        samples.append(time.perf_counter() - started)
+    results.put(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure D-Bus request latency under concurrent clients.")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32], help="concurrent client counts")
+    parser.add_argument("--requests", type=int, default=500, help="requests per client")
+    parser.add_argument("--request", choices=sorted(REQUESTS), default="status", help="request to send")
+    args = parser.parse_args()
+
+    print("{:>8s} {:>10s} {:>10s} {:>10s} {:>12s}".format("clients", "p50 ms", "p99 ms", "max ms", "requests/s"))
+
+    for client_count in args.clients:
+        start_barrier = multiprocessing.Barrier(client_count + 1)
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=run_client,
+                                             args=(args.request, args.requests, start_barrier, results))
+                     for _ in range(client_count)]
+        for process in processes:
+            process.start()
+
+        start_barrier.wait()
+        started = time.perf_counter()
+        samples = []
+        for _ in processes:
+            samples.extend(results.get())
+        elapsed = time.perf_counter() - started
+        for process in processes:
+            process.join()
+
+        samples.sort()
+        print("{:>8d} {:>10.3f} {:>10.3f} {:>10.3f} {:>12.0f}".format(
+            client_count, statistics.median(samples) * 1000, samples[int(len(samples) * 0.99)] * 1000,
+            samples[-1] * 1000, len(samples) / elapsed))
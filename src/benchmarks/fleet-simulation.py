@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+
+"""
+Runs a fleet of simulated daemons on one machine, each with its own fake sysfs tree and package,
+and reports the fleet power against a shared budget: without any cap, with every node capped at an
+equal share, reporting to a fleet coordinator over a Unix socket, and with the coordinator down for a while.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modes.pstate.PerCoreGovernor import PerCorePstateGovernor
+from modes.pstate.PerformanceGovernor import PerformancePstateGovernor
+from modes.pstate.PidGovernor import PidPstateGovernor
+from simulator.FleetSimulator import FleetSimulator
+
+GOVERNORS = {
+    "performance": PerformancePstateGovernor,
+    "pid": PidPstateGovernor,
+    "percore": PerCorePstateGovernor,
+}
+
+# a saturated node, a busy one, one with bursts and an idle one
+FLEET_TRACES = [
+    [(600, 1.0)],
+    [(600, 0.9)],
+    [(30, 0.6), (30, 0.2)],
+    [(600, 0.05)],
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a fleet of daemons sharing a power budget.")
+    parser.add_argument("--budget", type=float, default=120, help="package watts of the whole fleet")
+    parser.add_argument("--duration", type=int, default=600, help="simulated seconds")
+    parser.add_argument("--lease", type=float, default=5.0, help="seconds a ceiling holds without the coordinator")
+    parser.add_argument("--governor", choices=sorted(GOVERNORS), default="performance", help="mode of every node")
+    args = parser.parse_args()
+
+    outage = (args.duration / 3, args.duration / 3 + 60)
+    runs = [
+        ("local", dict(coordinated=False)),
+        ("static caps", dict(coordinated=False, static_caps=True)),
+        ("coordinated", dict()),
+        ("outage 60 s", dict(outage=outage)),
+    ]
+
+    print("{:<12s} {:>8s} {:>12s} {:>9s} {:>10s} {:>10s}  {:s}".format(
+        "fleet", "mean W", "over budget", "busy pct", "fallback", "reconnect", "busy pct per node"))
+    for name, options in runs:
+        results = FleetSimulator(FLEET_TRACES, args.budget, args.duration, governor_class=GOVERNORS[args.governor],
+                                 lease_seconds=args.lease, **options).run()
+        print("{:<12s} {:>8.1f} {:>10.1f} s {:>9.1f} {:>8.1f} s {:>10d}  {:s}".format(
+            name, results["mean_power"], results["time_over_budget"],
+            results["mean_busy_pct"], results["fallback_seconds"], results["reconnects"],
+            " ".join("{:5.1f}".format(pct) for pct in results["node_pct"])))
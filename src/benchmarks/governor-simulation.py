@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Runs the governors through a load trace against a fake sysfs tree and a simulated package,
+much faster than real time, and reports how each of them handles it.
+
+Trace files are CSV lines of "seconds,load" with load between 0 and 1.
+With --fan the package gets a fan, run by a typical firmware curve or by the governors' fan curve.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fans.FanCurve import FanCurve
+from modes.pstate.AutoGovernor import AutoPstateGovernor
+from modes.pstate.LowLatencyGovernor import LowLatencyPstateGovernor
+from modes.pstate.PerformanceGovernor import PerformancePstateGovernor
+from modes.pstate.PidGovernor import PidPstateGovernor
+from modes.pstate.PowerCapGovernor import PowerCapPstateGovernor
+from modes.pstate.PowersaveGovernor import PowersavePstateGovernor
+from modes.pstate.PowersaveLockedGovernor import PowersaveLockedPstateGovernor
+from modes.pstate.StockGovernor import StockPstateGovernor
+from simulator.FakeSysfsTree import DRIVERS
+from simulator.GovernorSimulator import GovernorSimulator
+from simulator.LoadTrace import SYNTHETIC_TRACE, load_trace
+from simulator.ThermalPlant import ThermalPlant
+
+GOVERNORS = [
+    ("powersavelocked", PowersaveLockedPstateGovernor),
+    ("powersave", PowersavePstateGovernor),
+    ("stock", StockPstateGovernor),
+    ("performance", PerformancePstateGovernor),
+    ("pid", PidPstateGovernor),
+    ("auto", AutoPstateGovernor),
+    ("powercap", PowerCapPstateGovernor),
+    ("lowlatency", LowLatencyPstateGovernor),
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the governors on a load trace.")
+    parser.add_argument("trace", nargs="?", help="CSV trace of seconds,load, a synthetic trace is used if omitted")
+    parser.add_argument("--noise", type=float, default=0.0, help="sensor noise standard deviation in degrees")
+    parser.add_argument("--max-temp", type=int, default=90, help="package temperature limit")
+    parser.add_argument("--power-limit", type=int, default=25, help="RAPL long term limit, the powercap budget")
+    parser.add_argument("--driver", choices=DRIVERS, default="intel_pstate", help="scaling driver to mimic")
+    parser.add_argument("--fan", choices=("none", "firmware", "curve"), default="none",
+                        help="no fan, a fan the firmware runs or one the governors run")
+    parser.add_argument("--fan-curve", metavar="CURVE", help="temperature:duty points, e.g. 60:30,70:60,80:100")
+    args = parser.parse_args()
+
+    fan_curve = None
+    if args.fan == "curve":
+        fan_curve = FanCurve.parse(args.fan_curve) if args.fan_curve else FanCurve()
+
+    trace = load_trace(args.trace) if args.trace else SYNTHETIC_TRACE
+
+    print("{:<16s} {:>7s} {:>11s} {:>10s} {:>9s} {:>11s} {:>7s} {:>10s} {:>9s}".format(
+        "governor", "ticks", "over limit", "overshoot", "mean pct", "loaded pct", "writes", "us/tick", "speedup") +
+          " {:>8s}".format("mean W"))
+
+    for name, governor_class in GOVERNORS:
+        # passive cooling twice as bad as with the fan at full speed
+        plant = ThermalPlant(heatsink_resistance=0.8, fan_cooling=0.5) if args.fan != "none" else None
+        results = GovernorSimulator(governor_class, trace, plant=plant, sensor_noise=args.noise,
+                                    max_temp=args.max_temp, fan_curve=fan_curve, power_limit_watts=args.power_limit,
+                                    driver=args.driver, fan=args.fan != "none").run()
+        print("{:<16s} {:>7d} {:>9.1f} s {:>8.2f} C {:>9.1f} {:>11.1f} {:>7d} {:>10.1f} {:>8.0f}x".format(
+            name, results["ticks"], results["time_over_limit"], results["overshoot"], results["mean_pct"],
+            results["mean_loaded_pct"], results["sysfs_writes"], results["tick_cost_us"], results["speedup"]) +
+              " {:>8.1f}".format(results["mean_power"]))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measures the cost of one governor tick (tick() plus get_poll_period()) in microseconds.
+
+The in-memory backend gives the cost of the governor logic alone,
+the directory backend adds the system calls on a tmpfs tree mimicking intel_pstate and coretemp.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modes.pstate.AutoGovernor import AutoPstateGovernor
+from modes.pstate.PerCoreGovernor import PerCorePstateGovernor
+from modes.pstate.PerformanceGovernor import PerformancePstateGovernor
+from modes.pstate.PidGovernor import PidPstateGovernor
+from modes.pstate.PowerCapGovernor import PowerCapPstateGovernor
+from modes.pstate.PowersaveGovernor import PowersavePstateGovernor
+from modes.pstate.PowersaveLockedGovernor import PowersaveLockedPstateGovernor
+from modes.pstate.StockGovernor import StockPstateGovernor
+from simulator.GovernorSimulator import BACKENDS, GovernorSimulator
+from simulator.LoadTrace import SYNTHETIC_TRACE, load_trace
+
+GOVERNORS = [
+    ("powersavelocked", PowersaveLockedPstateGovernor),
+    ("powersave", PowersavePstateGovernor),
+    ("stock", StockPstateGovernor),
+    ("performance", PerformancePstateGovernor),
+    ("percore", PerCorePstateGovernor),
+    ("pid", PidPstateGovernor),
+    ("auto", AutoPstateGovernor),
+    ("powercap", PowerCapPstateGovernor),
+]
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the per-tick cost of the governors.")
+    parser.add_argument("trace", nargs="?", help="CSV trace of seconds,load, a synthetic trace is used if omitted")
+    parser.add_argument("--backend", choices=BACKENDS, action="append", help="sysfs backend, all if omitted")
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace) if args.trace else SYNTHETIC_TRACE
+
+    print("{:<16s} {:<10s} {:>7s} {:>9s} {:>9s} {:>9s} {:>9s}".format(
+        "governor", "backend", "ticks", "mean us", "p50 us", "p99 us", "max us"))
+
+    for name, governor_class in GOVERNORS:
+        for backend in args.backend or BACKENDS:
+            results = GovernorSimulator(governor_class, trace, backend=backend).run()
+            costs = sorted(results["tick_costs_us"])
+            print("{:<16s} {:<10s} {:>7d} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                name, backend, results["ticks"], results["tick_cost_us"], percentile(costs, 0.5),
+                percentile(costs, 0.99), costs[-1]))
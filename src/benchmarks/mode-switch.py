@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measures service startup and mode switch latency on a tmpfs tree mimicking intel_pstate and coretemp.
+
+Startup covers reading the driver info, building the sensor index and activating the first governor.
+A switch covers building the requested governor and swapping it in on a running engine.
+Exits with 1 when a budget is exceeded, so it can guard boot latency.
+"""
+
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from drivers.DriverDetection import detect_driver
+from engine.GovernorEngine import GovernorEngine
+from modes.pstate.AutoGovernor import AutoPstateGovernor
+from modes.pstate.LowLatencyGovernor import LowLatencyPstateGovernor
+from modes.pstate.PerCoreGovernor import PerCorePstateGovernor
+from modes.pstate.PerformanceGovernor import PerformancePstateGovernor
+from modes.pstate.PidGovernor import PidPstateGovernor
+from modes.pstate.PowerCapGovernor import PowerCapPstateGovernor
+from modes.pstate.PolicyGovernor import PolicyPstateGovernor
+from modes.pstate.PowersaveGovernor import PowersavePstateGovernor
+from modes.pstate.PowersaveLockedGovernor import PowersaveLockedPstateGovernor
+from modes.pstate.StockGovernor import StockPstateGovernor
+from sensors.HwmonIndex import HwmonIndex
+from simulator.FakeSysfsTree import FakeSysfsTree
+from sysfs.DirectorySysfsBackend import DirectorySysfsBackend
+
+GOVERNOR_FACTORIES = {
+    "powersavelocked": PowersaveLockedPstateGovernor,
+    "powersave": PowersavePstateGovernor,
+    "stock": StockPstateGovernor,
+    "performance": PerformancePstateGovernor,
+    "percore": PerCorePstateGovernor,
+    "pid": PidPstateGovernor,
+    "auto": AutoPstateGovernor,
+    "policy": PolicyPstateGovernor,
+    "powercap": PowerCapPstateGovernor,
+    "lowlatency": LowLatencyPstateGovernor,
+}
+
+
+def build(name, driver, sensor_index, sysfs):
+    return GOVERNOR_FACTORIES[name](driver, sensor_index, sysfs)
+
+
+def build_eagerly(name, driver, sensor_index, sysfs):
+    """
+    What a switch used to cost: every governor built, one kept.
+    """
+    governors = {other: build(other, driver, sensor_index, sysfs) for other in GOVERNOR_FACTORIES}
+    for other, governor in governors.items():
+        if other != name:
+            governor.exit()
+    return governors[name]
+
+
+def measure_switches(engine, builder, driver, sensor_index, sysfs, rounds):
+    samples = []
+    for _ in range(rounds):
+        for name in GOVERNOR_FACTORIES:
+            started = time.perf_counter()
+            engine.switch(builder(name, driver, sensor_index, sysfs))
+            samples.append(time.perf_counter() - started)
+    return sorted(samples)
+
+
+def print_samples(label, samples):
+    print("{:<20s} median {:7.3f} ms, p95 {:7.3f} ms, max {:7.3f} ms".format(
+        label, statistics.median(samples) * 1000, samples[int(len(samples) * 0.95)] * 1000, samples[-1] * 1000))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure startup and mode switch latency.")
+    parser.add_argument("--rounds", type=int, default=20, help="switches through every mode per measurement")
+    parser.add_argument("--startup-budget-ms", type=float, default=50, help="allowed startup time")
+    parser.add_argument("--switch-budget-ms", type=float, default=10, help="allowed p95 mode switch time")
+    args = parser.parse_args()
+
+    temp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(dir=temp_dir) as root:
+        sysfs = DirectorySysfsBackend(root)
+        FakeSysfsTree(sysfs)
+        engine = GovernorEngine()
+        engine.start()
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            started = time.perf_counter()
+            driver = detect_driver(sysfs)
+            sensor_index = HwmonIndex(sysfs)
+            engine.switch(build("performance", driver, sensor_index, sysfs))
+            startup_seconds = time.perf_counter() - started
+
+            lazy = measure_switches(engine, build, driver, sensor_index, sysfs, args.rounds)
+            eager = measure_switches(engine, build_eagerly, driver, sensor_index, sysfs, args.rounds)
+            engine.stop()
+            driver.close()
+
+    print("{:<20s} {:7.3f} ms".format("startup", startup_seconds * 1000))
+    print_samples("switch", lazy)
+    print_samples("switch, build all", eager)
+
+    switch_p95 = lazy[int(len(lazy) * 0.95)]
+    if startup_seconds * 1000 > args.startup_budget_ms or switch_p95 * 1000 > args.switch_budget_ms:
+        print("over budget")
+        sys.exit(1)
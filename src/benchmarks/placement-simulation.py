@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Runs governors on a package with a hot spot and three busy threads sitting on the cores next to it,
+without thread placement and with it, and reports the clock speed the busy threads got.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modes.pstate.PerCoreGovernor import PerCorePstateGovernor
+from modes.pstate.PerformanceGovernor import PerformancePstateGovernor
+from modes.pstate.PidGovernor import PidPstateGovernor
+from simulator.PlacementSimulator import PlacementSimulator
+
+GOVERNORS = [
+    ("performance", PerformancePstateGovernor),
+    ("pid", PidPstateGovernor),
+    ("percore", PerCorePstateGovernor),
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate thermal thread placement against global throttling.")
+    parser.add_argument("--duration", type=int, default=600, help="simulated seconds of sustained load")
+    parser.add_argument("--max-temp", type=int, default=90, help="temperature limit")
+    args = parser.parse_args()
+
+    print("{:<12s} {:<10s} {:>7s} {:>11s} {:>10s} {:>9s} {:>11s} {:>8s}".format(
+        "governor", "placement", "ticks", "over limit", "overshoot", "busy pct", "migrations", "mean W"))
+    for name, governor_class in GOVERNORS:
+        for placement in (None, "apply"):
+            results = PlacementSimulator(governor_class, placement, args.duration, max_temp=args.max_temp).run()
+            print("{:<12s} {:<10s} {:>7d} {:>9.1f} s {:>8.2f} C {:>9.1f} {:>11d} {:>8.1f}".format(
+                name, placement or "off", results["ticks"], results["time_over_limit"], results["overshoot"],
+                results["mean_busy_pct"], int(results["migrations"]), results["mean_power"]))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+"""
+Measures how long a process blocked on a pipe takes to run again after being woken up from another cpu,
+the delay idle states add to every request a mostly idle server picks up.
+The waker sleeps between wakeups so the cpus have time to go idle, like between requests.
+With --hold the run is repeated while holding a PM QoS latency request like the lowlatency mode does,
+--disable-idle also disables the slower cpuidle states. Both need root.
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from drivers.CpuDmaLatency import CpuDmaLatency
+from drivers.CpuIdleStates import CpuIdleStates
+from sysfs.BatchWriter import BatchWriter
+from sysfs.RealSysfsBackend import RealSysfsBackend
+
+TIMESTAMP = struct.Struct("=q")
+
+
+def measure(samples, gap_seconds):
+    """
+    Wakes a child process up samples times, each after about gap_seconds of idling.
+    :param samples:
+    :param gap_seconds:
+    :return: sorted wakeup latencies in microseconds
+    """
+    wake_read, wake_write = os.pipe()
+    result_read, result_write = os.pipe()
+    cpus = sorted(os.sched_getaffinity(0))
+
+    pid = os.fork()
+    if pid == 0:
+        # the sleeper, on a different cpu than the waker where there is one
+        os.close(wake_write)
+        os.close(result_read)
+        os.sched_setaffinity(0, {cpus[-1]})
+        latencies = []
+        while True:
+            data = os.read(wake_read, TIMESTAMP.size)
+            woken = time.perf_counter_ns()
+            if len(data) < TIMESTAMP.size:
+                break
+            latencies.append(woken - TIMESTAMP.unpack(data)[0])
+        payload = struct.pack("={:d}q".format(len(latencies)), *latencies)
+        with os.fdopen(result_write, "wb") as results:
+            results.write(payload)
+        os._exit(0)
+
+    os.close(wake_read)
+    os.close(result_write)
+    os.sched_setaffinity(0, {cpus[0]})
+    jitter = random.Random(1)
+    for _ in range(samples):
+        time.sleep(gap_seconds * jitter.uniform(0.5, 1.5))
+        os.write(wake_write, TIMESTAMP.pack(time.perf_counter_ns()))
+    os.close(wake_write)
+
+    with os.fdopen(result_read, "rb") as results:
+        payload = results.read()
+    os.waitpid(pid, 0)
+    os.sched_setaffinity(0, cpus)
+    latencies = struct.unpack("={:d}q".format(len(payload) // TIMESTAMP.size), payload)
+    return sorted(latency / 1000 for latency in latencies)
+
+
+def report(name, latencies):
+    def percentile(pct):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))]
+
+    print("{:<28s} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+        name, percentile(50), percentile(90), percentile(99), latencies[-1]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cross-cpu wakeup latency.")
+    parser.add_argument("--samples", type=int, default=2000, help="wakeups per run")
+    parser.add_argument("--gap", type=float, default=2.0, help="average idle milliseconds between wakeups")
+    parser.add_argument("--hold", type=int, metavar="US", help="repeat while holding a PM QoS latency request")
+    parser.add_argument("--disable-idle", action="store_true",
+                        help="with --hold, also disable the cpuidle states slower than the request")
+    args = parser.parse_args()
+
+    print("{:<28s} {:>9s} {:>9s} {:>9s} {:>9s}".format("run", "p50 us", "p90 us", "p99 us", "max us"))
+    report("as is", measure(args.samples, args.gap / 1000))
+
+    if args.hold is not None:
+        sysfs = RealSysfsBackend()
+        latency = CpuDmaLatency(sysfs)
+        writer = BatchWriter()
+        idle = CpuIdleStates(sysfs, writer)
+        try:
+            latency.hold(args.hold)
+            name = "holding {:d} us".format(args.hold)
+            if args.disable_idle:
+                name += ", {:d} states off".format(idle.limit(args.hold))
+            report(name, measure(args.samples, args.gap / 1000))
+        finally:
+            idle.restore()
+            idle.close()
+            latency.release()
@@ -0,0 +1,65 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import fnmatch
+import os
+
+LATENCY_CLASS = "latency"
+BATCH_CLASS = "batch"
+PERFORMANCE_CLASSES = (LATENCY_CLASS, BATCH_CLASS)
+
+
+class CgroupPolicy(object):
+    """
+    Maps cgroups to performance classes.
+    A rule is a glob matched against the cgroup path relative to the hierarchy root
+    (e.g. "system.slice/nginx.service") or, for patterns without a slash, against the last path component,
+    which is where systemd puts the unit or scope name of a process ("*firefox*.scope").
+    The first matching rule wins, cgroups no rule matches are batch.
+    """
+
+    def __init__(self, rules=()):
+        """
+        :param rules: list of (pattern, class)
+        """
+        for pattern, performance_class in rules:
+            if performance_class not in PERFORMANCE_CLASSES:
+                raise ValueError("Unknown performance class '{:s}' for {:s}".format(performance_class, pattern))
+        self.rules = list(rules)
+
+    def classify(self, cgroup):
+        name = os.path.basename(cgroup)
+        for pattern, performance_class in self.rules:
+            if fnmatch.fnmatchcase(cgroup if "/" in pattern else name, pattern):
+                return performance_class
+        return BATCH_CLASS
+
+    @staticmethod
+    def load(path):
+        """
+        Reads rules from a file of "pattern class" lines, # starts a comment.
+        :param path:
+        :return:
+        """
+        rules = []
+        with open(path, "r") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    pattern, performance_class = line.rsplit(None, 1)
+                    rules.append((pattern, performance_class))
+        return CgroupPolicy(rules)
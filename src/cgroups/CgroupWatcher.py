@@ -0,0 +1,145 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import ctypes
+import errno
+import os
+import struct
+import threading
+
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_IGNORED = 0x00008000
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+# struct inotify_event: int wd, uint32 mask, uint32 cookie, uint32 len, char name[len]
+EVENT_HEADER = struct.Struct("iIII")
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR
+
+
+class CgroupWatcher(object):
+    """
+    Keeps track of the cgroups in a cgroup v2 hierarchy through inotify.
+    The hierarchy is walked once, after that only cgroup directories being created and removed are looked at,
+    so the cost doesn't depend on how many processes are running.
+    """
+
+    def __init__(self, root):
+        """
+        :param root: cgroup v2 mount point as a real path
+        """
+        if not os.path.exists(os.path.join(root, "cgroup.controllers")):
+            raise RuntimeError("No cgroup v2 hierarchy at {:s}".format(root))
+
+        self.root = root
+        self.libc = ctypes.CDLL(None, use_errno=True)
+
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+        # watch descriptor -> cgroup path relative to the root, "" for the root itself
+        self.watches = {}
+        self.cgroups = set()
+
+        self.add_tree("")
+
+    def fileno(self):
+        return self.fd
+
+    def add_tree(self, cgroup):
+        """
+        Starts watching a cgroup and everything below it.
+        Children created before the watch was in place are picked up by the walk.
+        :param cgroup:
+        :return:
+        """
+        for path, directories, _ in os.walk(os.path.join(self.root, cgroup)):
+            relative = os.path.relpath(path, self.root)
+            relative = "" if relative == "." else relative
+
+            wd = self.libc.inotify_add_watch(self.fd, path.encode(), WATCH_MASK)
+            if wd < 0:
+                if ctypes.get_errno() in (errno.ENOENT, errno.ENOTDIR):
+                    # removed while walking
+                    continue
+                raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()), path)
+
+            self.watches[wd] = relative
+            self.cgroups.add(relative)
+
+    def remove_tree(self, cgroup):
+        prefix = cgroup + "/"
+        self.cgroups = {path for path in self.cgroups if path != cgroup and not path.startswith(prefix)}
+
+    def read_events(self):
+        """
+        Drains the pending inotify events.
+        :return: True if any cgroup was added or removed
+        """
+        changed = False
+        while True:
+            try:
+                data = os.read(self.fd, 16384)
+            except BlockingIOError:
+                return changed
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0").decode()
+                offset += EVENT_HEADER.size + length
+                changed = True
+
+                if mask & IN_Q_OVERFLOW:
+                    # events were lost, start over
+                    self.rebuild()
+                    continue
+
+                parent = self.watches.get(wd)
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                if parent is None or not mask & IN_ISDIR:
+                    continue
+
+                cgroup = os.path.join(parent, name) if parent else name
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(cgroup)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.remove_tree(cgroup)
+
+    def rebuild(self):
+        for wd in list(self.watches):
+            self.libc.inotify_rm_watch(self.fd, wd)
+        self.watches = {}
+        self.cgroups = set()
+        self.add_tree("")
+
+    def close(self):
+        if self.fd >= 0:
+            # releasing an inotify instance waits for an SRCU grace period (~10 ms), mode switches shouldn't
+            threading.Thread(target=os.close, args=(self.fd,), name="inotify-close", daemon=True).start()
+            self.fd = -1
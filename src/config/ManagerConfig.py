@@ -0,0 +1,252 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import configparser
+import re
+from types import MappingProxyType
+
+from config.ModeSettings import FIELDS, ModeSettings
+from drivers.EnergyPreference import EPP_PROFILES
+from drivers.UncoreFrequency import UNCORE_PROFILES
+from fans.FanController import DEFAULT_RAMP_SECONDS
+from fans.FanCurve import DEFAULT_HYSTERESIS, FanCurve
+from scheduler.ThermalPlacement import PLACEMENT_MODES
+
+CONFIG_PATH = "/etc/linux-cpu-manager/linux-cpu-manager.conf"
+DEFAULT_MODE = "performance"
+
+MANAGER_SECTION = "manager"
+FANS_SECTION = "fans"
+FAN_KEYS = ("enabled", "curve", "hysteresis", "ramp_seconds")
+# [mode.NAME] sections tune a built-in mode or, with a base, define a new one
+MODE_SECTION_PREFIX = "mode."
+MODE_NAME = re.compile(r"^[a-z0-9_-]+$")
+
+# key -> type, lowest and highest value accepted
+NUMERIC_KEYS = {
+    "poll_period": (float, 0.01, 60),
+    "min_pct": (int, 0, 100),
+    "max_pct": (int, 0, 100),
+    "max_temp": (float, 30, 120),
+    "critical_temp": (float, 30, 120),
+    "step_divisor": (float, 0.1, 100),
+    "pid_kp": (float, 0, 100),
+    "pid_ki": (float, 0, 100),
+    "pid_kd": (float, 0, 100),
+    "pid_target_margin": (float, 0, 30),
+    "band_safe_margin": (float, 0, 60),
+    "band_critical_excess": (float, 0, 30),
+    "band_throttle_critical": (int, -100, 0),
+    "band_throttle_moderate": (int, -100, 0),
+    "band_increase_moderate": (int, 0, 100),
+    "band_increase_boost": (int, 0, 100),
+    "min_period": (float, 0.01, 60),
+    "max_period": (float, 0.01, 60),
+    "near_limit_margin": (float, 0, 60),
+    "far_limit_margin": (float, 0, 60),
+    "wakeup_latency_us": (int, 0, 100000),
+}
+CONTROLLERS = ("step", "pid", "band")
+PID_KEYS = ("pid_kp", "pid_ki", "pid_kd", "pid_target_margin")
+BAND_KEYS = ("band_safe_margin", "band_critical_excess", "band_throttle_critical", "band_throttle_moderate",
+             "band_increase_moderate", "band_increase_boost")
+# built-in modes running the pid controller unless told otherwise, the rest step
+PID_MODES = ("pid",)
+
+
+class ManagerConfig(object):
+    """
+    The service config file: the startup mode and per mode poll periods, limits, temperature thresholds
+    and controller gains, user defined modes built on top of a built-in one and the fan curve.
+    Fans are left to the firmware unless there is a fans section.
+    The whole file is validated when loaded, a broken file never replaces a working config.
+    Built-in modes without a section get default settings, so every mode has an entry in modes.
+    """
+
+    def __init__(self, builtin_modes, modes=None, default_mode=DEFAULT_MODE, path=None, fan_curve=None,
+                 fan_ramp_seconds=DEFAULT_RAMP_SECONDS):
+        """
+        :param builtin_modes: names of the modes the service has a governor for
+        :param modes: mode name -> ModeSettings from the file
+        :param default_mode: mode the service starts in
+        :param path: file the config was loaded from, None for the defaults
+        :param fan_curve: FanCurve, None leaves the fans to the firmware
+        :param fan_ramp_seconds: how long throttling waits for the fans to spin up
+        """
+        compiled = {name: ModeSettings(name) for name in builtin_modes}
+        compiled.update(modes or {})
+        self.modes = MappingProxyType(compiled)
+        self.default_mode = default_mode
+        self.path = path
+        self.fan_curve = fan_curve
+        self.fan_ramp_seconds = fan_ramp_seconds
+
+    @staticmethod
+    def load(path, builtin_modes):
+        """
+        Reads and validates an INI file, e.g.
+
+            [manager]
+            mode = auto
+
+            [mode.performance]
+            max_temp = 85
+            poll_period = 0.5
+
+            [mode.quiet]
+            base = powersave
+            max_pct = 60
+            energy_profile = power
+
+            [fans]
+            enabled = yes
+            curve = 60:30, 70:60, 80:100
+
+        :param path:
+        :param builtin_modes: names of the modes the service has a governor for
+        :return: ManagerConfig
+        :raises ValueError: the file can't be parsed or a setting is invalid
+        """
+        parser = configparser.ConfigParser(interpolation=None, inline_comment_prefixes=("#", ";"))
+        try:
+            with open(path, "r") as f:
+                parser.read_file(f)
+        except configparser.Error as e:
+            raise ValueError("{:s}: {:s}".format(path, str(e).splitlines()[0]))
+
+        modes = {}
+        default_mode = DEFAULT_MODE
+        fan_curve = None
+        fan_ramp_seconds = DEFAULT_RAMP_SECONDS
+        for section in parser.sections():
+            try:
+                if section == MANAGER_SECTION:
+                    default_mode = ManagerConfig.parse_manager_section(parser[section])
+                elif section == FANS_SECTION:
+                    fan_curve, fan_ramp_seconds = ManagerConfig.parse_fans_section(parser[section])
+                elif section.startswith(MODE_SECTION_PREFIX):
+                    name = section[len(MODE_SECTION_PREFIX):]
+                    modes[name] = ManagerConfig.parse_mode_section(name, parser[section], builtin_modes)
+                else:
+                    raise ValueError("unknown section")
+            except ValueError as e:
+                raise ValueError("{:s}: [{:s}] {:s}".format(path, section, str(e)))
+
+        if default_mode not in builtin_modes and default_mode not in modes:
+            raise ValueError("{:s}: [{:s}] unknown mode '{:s}'".format(path, MANAGER_SECTION, default_mode))
+
+        return ManagerConfig(builtin_modes, modes, default_mode, path, fan_curve, fan_ramp_seconds)
+
+    @staticmethod
+    def parse_manager_section(section):
+        for key in section:
+            if key != "mode":
+                raise ValueError("unknown key '{:s}'".format(key))
+        return section.get("mode", DEFAULT_MODE)
+
+    @staticmethod
+    def parse_fans_section(section):
+        """
+        :param section: configparser section proxy
+        :return: FanCurve or None if fan control is off, ramp seconds
+        """
+        for key in section:
+            if key not in FAN_KEYS:
+                raise ValueError("unknown key '{:s}'".format(key))
+
+        hysteresis = section.getfloat("hysteresis", DEFAULT_HYSTERESIS)
+        ramp_seconds = section.getfloat("ramp_seconds", DEFAULT_RAMP_SECONDS)
+        if not 0 <= ramp_seconds <= 60:
+            raise ValueError("ramp_seconds must be between 0 and 60")
+
+        if not section.getboolean("enabled", True):
+            return None, ramp_seconds
+        if "curve" in section:
+            return FanCurve.parse(section["curve"], hysteresis), ramp_seconds
+        return FanCurve(hysteresis=hysteresis), ramp_seconds
+
+    @staticmethod
+    def parse_mode_section(name, section, builtin_modes):
+        """
+        :param name: mode name
+        :param section: configparser section proxy
+        :param builtin_modes:
+        :return: ModeSettings
+        """
+        if not MODE_NAME.match(name):
+            raise ValueError("mode names are made of lowercase letters, digits, - and _")
+
+        settings = {}
+        for key, value in section.items():
+            if key not in FIELDS:
+                raise ValueError("unknown key '{:s}'".format(key))
+
+            if key in NUMERIC_KEYS:
+                value_type, lowest, highest = NUMERIC_KEYS[key]
+                try:
+                    settings[key] = value_type(value)
+                except ValueError:
+                    raise ValueError("{:s} must be a number, not '{:s}'".format(key, value))
+                if not lowest <= settings[key] <= highest:
+                    raise ValueError("{:s} must be between {} and {}".format(key, lowest, highest))
+            elif key in ("turbo", "uncore_dynamic", "disable_idle_states"):
+                settings[key] = section.getboolean(key)
+            elif key == "energy_profile" and value not in EPP_PROFILES:
+                raise ValueError("energy_profile must be one of {:s}".format(", ".join(EPP_PROFILES)))
+            elif key == "uncore_profile" and value not in UNCORE_PROFILES:
+                raise ValueError("uncore_profile must be one of {:s}".format(", ".join(UNCORE_PROFILES)))
+            elif key == "placement" and value not in PLACEMENT_MODES:
+                raise ValueError("placement must be one of {:s}".format(", ".join(PLACEMENT_MODES)))
+            elif key == "controller" and value not in CONTROLLERS:
+                raise ValueError("controller must be one of {:s}".format(", ".join(CONTROLLERS)))
+            else:
+                settings[key] = value
+
+        base = settings.pop("base", None)
+        if name in builtin_modes:
+            if base is not None and base != name:
+                raise ValueError("built-in modes can't change their base")
+            base = name
+        elif base is None:
+            raise ValueError("new modes need a base mode")
+        elif base not in builtin_modes:
+            raise ValueError("base must be a built-in mode, not '{:s}'".format(base))
+
+        ManagerConfig.check_ranges(settings)
+
+        controller = settings.get("controller", "pid" if base in PID_MODES else "step")
+        if controller != "pid" and any(key in settings for key in PID_KEYS):
+            raise ValueError("pid gains need controller = pid")
+        if controller != "step" and "step_divisor" in settings:
+            raise ValueError("step_divisor needs controller = step")
+        if controller != "band" and any(key in settings for key in BAND_KEYS):
+            raise ValueError("band thresholds and steps need controller = band")
+
+        return ModeSettings(base, **settings)
+
+    @staticmethod
+    def check_ranges(settings):
+        for low, high in (("min_pct", "max_pct"), ("max_temp", "critical_temp"), ("min_period", "max_period"),
+                          ("near_limit_margin", "far_limit_margin")):
+            if low in settings and high in settings and settings[low] > settings[high]:
+                raise ValueError("{:s} is above {:s}".format(low, high))
+
+    def get_modes(self):
+        """
+        :return: built-in modes first, then the user defined ones
+        """
+        return list(self.modes)
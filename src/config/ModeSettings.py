@@ -0,0 +1,51 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import namedtuple
+
+# settings a mode can have in the config file, None keeps the governor's own default
+FIELDS = (
+    "base",
+    "poll_period",
+    "min_pct", "max_pct", "turbo",
+    "max_temp", "critical_temp",
+    "energy_profile", "uncore_profile", "uncore_dynamic",
+    "placement",
+    "wakeup_latency_us", "disable_idle_states",
+    "controller", "step_divisor", "pid_kp", "pid_ki", "pid_kd", "pid_target_margin",
+    "band_safe_margin", "band_critical_excess", "band_throttle_critical", "band_throttle_moderate",
+    "band_increase_moderate", "band_increase_boost",
+    "min_period", "max_period", "near_limit_margin", "far_limit_margin",
+)
+
+
+class ModeSettings(namedtuple("ModeSettings", FIELDS)):
+    """
+    Compiled settings of one mode, immutable so a reload can't change them under a running governor.
+    base is the built-in mode whose governor runs the mode, the mode itself for the built-in ones.
+    The governor copies the values into its own attributes once, the tick never looks at them.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, base, **settings):
+        """
+        :param base: built-in mode name
+        :param settings: any of FIELDS, the missing ones are None
+        :return:
+        """
+        return super().__new__(cls, base, *(settings.get(field) for field in FIELDS[1:]))
@@ -15,37 +15,115 @@
 # You should have received a copy of the GNU General Public License
 # along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import time
+
+import dbus
+import dbus.exceptions
 import dbus.service
+from gi.repository import GLib
 
+from config.ManagerConfig import CONFIG_PATH, ManagerConfig
+from drivers.DriverDetection import detect_driver
+from engine.GovernorEngine import GovernorEngine
+from fans.FanController import FanController
+from fans.FanDetection import detect_fans
+from fleet.FleetNode import FleetNode
+from modes.pstate.AutoGovernor import AutoPstateGovernor
+from modes.pstate.LowLatencyGovernor import LowLatencyPstateGovernor
+from modes.pstate.PerCoreGovernor import PerCorePstateGovernor
 from modes.pstate.PerformanceGovernor import PerformancePstateGovernor
+from modes.pstate.PidGovernor import PidPstateGovernor
+from modes.pstate.PolicyGovernor import PolicyPstateGovernor
+from modes.pstate.PowerCapGovernor import PowerCapPstateGovernor
 from modes.pstate.PowersaveGovernor import PowersavePstateGovernor
 from modes.pstate.PowersaveLockedGovernor import PowersaveLockedPstateGovernor
 from modes.pstate.StockGovernor import StockPstateGovernor
+from sensors.HwmonIndex import HwmonIndex
+from sensors.HwmonMonitor import HwmonMonitor
+from sysfs.RealSysfsBackend import RealSysfsBackend
+
+
+INTERFACE = "ee.ounapuu.LinuxCPUManager"
 
 
 class LinuxCPUManager(dbus.service.Object):
 
-    def __init__(self, bus_name):
+    def __init__(self, bus_name, config_path=CONFIG_PATH, fleet_address=None, fleet_name=None):
         super().__init__(bus_name, "/ee/ounapuu/LinuxCPUManager")
         self.current_governor = None
         self.current_governor_name = None
 
+        # single worker thread running whichever governor is active
+        self.engine = GovernorEngine()
+        self.last_mode_switch_seconds = None
+
+        # last properties sent out in PropertiesChanged, compared against on every tick
+        self.published_properties = {}
+        self.published_throttle_events = 0
+        self.publish_pending = False
+        self.engine.tick_callback = self.schedule_publish
+
+        # only the governor of the requested mode gets built, constructors open attributes and read sensors
         """
         powersavelocked: stuck at min percentage
         powersave: min to 50% of nonturbo clockspeed
         stock: min to nonturbo clockspeed
         performance: min to max
+        percore: min to max, throttled per core and per package instead of globally
+        pid: min to max, held just below the temperature limit by a PID controller
+        auto: powersave, stock or performance limits, picked by CPU utilisation and pressure
+        policy: powersave limits, raised min and turbo while a latency-critical cgroup uses the CPU
+        powercap: min to max, held within a package power budget
+        lowlatency: nonturbo clockspeed to max, cpus kept out of deep idle states
         """
-        self.controller_modes = ['powersavelocked', 'powersave', 'stock', 'performance']
+        self.governor_factories = {
+            'powersavelocked': PowersaveLockedPstateGovernor,
+            'powersave': PowersavePstateGovernor,
+            'stock': StockPstateGovernor,
+            'performance': PerformancePstateGovernor,
+            'percore': PerCorePstateGovernor,
+            'pid': PidPstateGovernor,
+            'auto': AutoPstateGovernor,
+            'policy': PolicyPstateGovernor,
+            'powercap': PowerCapPstateGovernor,
+            'lowlatency': LowLatencyPstateGovernor,
+        }
+
+        # per mode settings and user defined modes, replaced as a whole on reload
+        self.config_path = config_path
+        try:
+            self.config = self.load_config()
+        except (OSError, ValueError) as e:
+            print("Using the default config, failed to load '{}'".format(str(e)))
+            self.config = ManagerConfig(list(self.governor_factories))
+        self.controller_modes = self.config.get_modes()
 
-        self.min_perf_pct = None
-        self.max_perf_pct = None
-        self.num_pstates = None
-        self.turbo_pct = None
+        # RecordLog the tick history is flushed to, None when not recording
+        self.record_log = None
 
-        self.init_pstate_driver_info()
+        # watts for the powercap mode, None for the RAPL long term limit
+        self.power_budget_watts = None
 
-        self.start_governor('performance')
+        self.sysfs = RealSysfsBackend()
+        # intel_pstate, amd-pstate or plain cpufreq, the governors only see percentages
+        self.driver = detect_driver(self.sysfs)
+        print("Using the {:s} scaling driver".format(self.driver.name))
+
+        # hwmon numbering changes between boots, governors get their sensors from the index
+        self.sensor_index = HwmonIndex(self.sysfs)
+        self.hwmon_monitor = HwmonMonitor()
+
+        # fan curve shared by every mode, None while the firmware runs the fans
+        self.fans = self.build_fans(self.config)
+
+        # link to the fleet coordinator shared by every mode, None keeps the node under local control only
+        self.fleet = None
+        if fleet_address is not None:
+            self.fleet = FleetNode(fleet_address, fleet_name, self.sysfs)
+
+        self.engine.start()
+        self.start_governor(self.config.default_mode)
 
     @dbus.service.method("ee.ounapuu.LinuxCPUManager.setMode", in_signature='s', out_signature='s')
     def set_mode(self, mode):
@@ -53,53 +131,342 @@ class LinuxCPUManager(dbus.service.Object):
             if mode == self.current_governor_name:
                 return "Mode already set to {:s}!".format(mode)
             else:
-                self.stop_governor()
                 self.start_governor(mode)
                 return "Governor set to {:s}".format(mode)
         else:
             return "Invalid mode '{:s}'.".format(mode)
 
+    @dbus.service.method(INTERFACE, out_signature='a{sv}')
+    def GetStatus(self):
+        """
+        Current mode, limits, temperature and write counters, answered from memory without touching sysfs.
+        :return:
+        """
+        status = self.get_properties()
+        # whatever else the governor keeps track of, like the auto mode profile or the package power
+        for name, value in self.current_governor.get_status().items():
+            if isinstance(value, str):
+                status[name] = dbus.String(value)
+            elif isinstance(value, bool):
+                status[name] = dbus.Boolean(value)
+            elif isinstance(value, int):
+                status[name] = dbus.Int64(value)
+            elif isinstance(value, float):
+                status[name] = dbus.Double(value)
+        return status
+
+    @dbus.service.method(dbus.PROPERTIES_IFACE, in_signature='ss', out_signature='v')
+    def Get(self, interface_name, property_name):
+        properties = self.GetAll(interface_name)
+        if property_name not in properties:
+            self.raise_unknown_property(property_name)
+        return properties[property_name]
+
+    @dbus.service.method(dbus.PROPERTIES_IFACE, in_signature='s', out_signature='a{sv}')
+    def GetAll(self, interface_name):
+        if interface_name != INTERFACE:
+            raise dbus.exceptions.DBusException("Unknown interface {:s}".format(interface_name),
+                                                name="org.freedesktop.DBus.Error.UnknownInterface")
+        return self.get_properties()
+
+    @dbus.service.method(dbus.PROPERTIES_IFACE, in_signature='ssv')
+    def Set(self, interface_name, property_name, value):
+        properties = self.GetAll(interface_name)
+        if property_name not in properties:
+            self.raise_unknown_property(property_name)
+        if property_name == "PowerBudget":
+            self.set_power_budget(float(value))
+            return
+        if property_name != "Mode":
+            raise dbus.exceptions.DBusException("Property {:s} is read-only".format(property_name),
+                                                name="org.freedesktop.DBus.Error.PropertyReadOnly")
+        if value not in self.controller_modes:
+            raise dbus.exceptions.DBusException("Invalid mode '{:s}'".format(value),
+                                                name="org.freedesktop.DBus.Error.InvalidArgs")
+        if value != self.current_governor_name:
+            self.start_governor(value)
+
+    @dbus.service.signal(dbus.PROPERTIES_IFACE, signature='sa{sv}as')
+    def PropertiesChanged(self, interface_name, changed_properties, invalidated_properties):
+        pass
+
+    @dbus.service.signal(INTERFACE, signature='sdi')
+    def ThrottleEvent(self, mode, temperature, max_perf_pct):
+        """
+        Sent when the active governor lowered a perf limit since the last update.
+        :param mode:
+        :param temperature:
+        :param max_perf_pct:
+        :return:
+        """
+        pass
+
+    @dbus.service.method(INTERFACE, out_signature='a{sd}')
+    def GetMetrics(self):
+        """
+        Tick timing histograms, counters and gauges of the governor engine.
+        Histogram buckets and labels are kept in the Prometheus notation in the keys.
+        :return:
+        """
+        return self.engine.metrics.get_values()
+
+    @dbus.service.method(INTERFACE, out_signature='s')
+    def FlushRecords(self):
+        """
+        Writes the ticks recorded since the last flush to the record log, for a client about to read it.
+        :return: path of the record log
+        """
+        if self.record_log is None:
+            raise dbus.exceptions.DBusException("Tick recording is disabled",
+                                                name="org.freedesktop.DBus.Error.NotSupported")
+        self.flush_records()
+        return self.record_log.path
+
+    @dbus.service.method(INTERFACE, out_signature='s')
+    def Reload(self):
+        """
+        Reads the config file again, see reload_config().
+        :return: what changed
+        """
+        try:
+            return self.reload_config()
+        except (OSError, ValueError) as e:
+            raise dbus.exceptions.DBusException("Config not reloaded: {:s}".format(str(e)),
+                                                name="org.freedesktop.DBus.Error.InvalidArgs")
+
+    def load_config(self):
+        """
+        :return: the config file, the defaults if there is none
+        :raises ValueError: the file is invalid
+        """
+        if not os.path.exists(self.config_path):
+            return ManagerConfig(list(self.governor_factories))
+        return ManagerConfig.load(self.config_path, list(self.governor_factories))
+
+    def reload_config(self):
+        """
+        Replaces the config if the whole file is valid, a broken file leaves everything as it was.
+        The active mode is rebuilt with its new settings only if they changed, the swap goes through the engine
+        like a mode switch, so no tick runs with half of the new settings and the engine thread keeps running.
+        :return: what changed
+        """
+        config = self.load_config()
+        previous = self.config
+        mode = self.current_governor_name
+
+        self.config = config
+        self.controller_modes = config.get_modes()
+        try:
+            if mode not in config.modes:
+                self.start_governor(config.default_mode)
+                result = "Mode {:s} was removed, switched to {:s}".format(mode, config.default_mode)
+            elif config.modes[mode] != previous.modes[mode]:
+                self.start_governor(mode)
+                result = "Config reloaded, {:s} restarted with the new settings".format(mode)
+            else:
+                self.publish_changes()
+                result = "Config reloaded, {:s} unchanged".format(mode)
+
+            if (config.fan_curve, config.fan_ramp_seconds) != (previous.fan_curve, previous.fan_ramp_seconds):
+                self.replace_fans(self.build_fans(config))
+        except Exception:
+            self.config = previous
+            self.controller_modes = previous.get_modes()
+            raise
+
+        print(result)
+        return result
+
+    def build_fans(self, config):
+        """
+        :param config: ManagerConfig
+        :return: FanController running the configured curve, None without a curve or a fan to control
+        """
+        if config.fan_curve is None:
+            return None
+
+        fans = detect_fans(self.sysfs)
+        if not fans:
+            print("Fan control is enabled but no controllable fan was found")
+            return None
+        print("Controlling fans {:s}".format(", ".join(fan.name for fan in fans)))
+        return FanController(fans, config.fan_curve, config.fan_ramp_seconds)
+
+    def replace_fans(self, fans):
+        """
+        Swaps the fan controller of the running governor between ticks, the old one hands its fans back.
+        :param fans: FanController or None
+        :return:
+        """
+        with self.engine.lock:
+            if self.fans is not None:
+                self.fans.close()
+            self.fans = fans
+            if self.current_governor is not None:
+                self.current_governor.fans = fans
+
+    def flush_records(self):
+        """
+        Moves the recorded ticks from the ring buffer to the record log, run periodically from the main loop.
+        :return:
+        """
+        if self.record_log is None:
+            return
+
+        lost = self.engine.recorder.lost
+        self.record_log.append(self.engine.recorder.drain(), self.engine.recorder.mode_names)
+        if self.engine.recorder.lost != lost:
+            print("Tick recorder overflowed, {:d} ticks lost".format(self.engine.recorder.lost - lost))
+
     def start_governor(self, mode):
-        self.current_governor = self.get_governor_by_name(mode)
+        """
+        Swaps the running governor for the given mode, the previous one is stopped by the engine.
+        :param mode:
+        :return:
+        """
+        switch_started = time.perf_counter()
+
+        governor = self.get_governor_by_name(mode)
+        try:
+            self.engine.switch(governor, mode)
+        except Exception:
+            # the previous governor has exited already, a fresh one takes its place
+            if self.current_governor is not None:
+                previous = self.build_governor(self.current_governor.settings)
+                self.engine.switch(previous, self.current_governor_name)
+                self.current_governor = previous
+            raise
+        self.current_governor = governor
         self.current_governor_name = mode
-        self.current_governor.run_governor()
 
-    def stop_governor(self):
-        self.current_governor.stop_governor()
+        self.last_mode_switch_seconds = time.perf_counter() - switch_started
+        self.engine.metrics.observe_mode_switch(mode, self.last_mode_switch_seconds)
+        print("Switched to {:s} in {:.2f} ms".format(mode, self.last_mode_switch_seconds * 1000))
 
-    def get_governor_by_name(self, name):
-        governors = {
-            'stock': StockPstateGovernor(self.min_perf_pct, self.max_perf_pct, self.num_pstates, self.turbo_pct),
-            'powersavelocked': PowersaveLockedPstateGovernor(self.min_perf_pct, self.max_perf_pct, self.num_pstates,
-                                                             self.turbo_pct),
-            'powersave': PowersavePstateGovernor(self.min_perf_pct, self.max_perf_pct, self.num_pstates,
-                                                 self.turbo_pct),
-            'performance': PerformancePstateGovernor(self.min_perf_pct, self.max_perf_pct, self.num_pstates,
-                                                     self.turbo_pct),
+        self.publish_changes()
+
+    def get_properties(self):
+        """
+        Properties of the manager interface, read from the state the active governor keeps in memory.
+        :return:
+        """
+        status = self.current_governor.get_status()
+        return {
+            "Mode": dbus.String(self.current_governor_name),
+            "Modes": dbus.Array(self.controller_modes, signature='s'),
+            "MinPerfPct": dbus.Int32(status["min_perf_pct"]),
+            "MaxPerfPct": dbus.Int32(status["max_perf_pct"]),
+            "NoTurbo": dbus.Boolean(status["no_turbo"]),
+            "Temperature": dbus.Double(status["temperature"]),
+            "PowerBudget": dbus.Double(status.get("power_budget_watts", self.power_budget_watts or 0.0)),
         }
 
-        return governors[name]
+    def set_power_budget(self, power_budget_watts):
+        """
+        Sets the powercap mode budget, 0 or less goes back to the RAPL long term limit.
+        :param power_budget_watts:
+        :return:
+        """
+        self.power_budget_watts = power_budget_watts if power_budget_watts > 0 else None
+        if self.config.modes[self.current_governor_name].base == 'powercap':
+            if self.power_budget_watts is None:
+                # the default is worked out when the governor is built
+                self.start_governor(self.current_governor_name)
+            else:
+                with self.engine.lock:
+                    self.current_governor.set_power_budget(self.power_budget_watts)
+                self.publish_changes()
+
+    def raise_unknown_property(self, property_name):
+        raise dbus.exceptions.DBusException("Unknown property {:s}".format(property_name),
+                                            name="org.freedesktop.DBus.Error.UnknownProperty")
 
-    def init_pstate_driver_info(self):
+    def schedule_publish(self):
         """
-        Get the default min-max specs and save them for later use.
-        Run once at service start.
+        Called by the engine thread after every tick, the signals are sent from the main loop.
         :return:
         """
-        paths = {
-            "min": "min_perf_pct",
-            "max": "max_perf_pct",
-            "stepcount": "num_pstates",
-            "turbopct": "turbo_pct",
-        }
-        for level, path in paths.items():
-            with open("/sys/devices/system/cpu/intel_pstate/{:s}".format(path)) as f:
-                data = int(f.read())
-                if level == "min":
-                    self.min_perf_pct = data
-                if level == "max":
-                    self.max_perf_pct = data
-                if level == "stepcount":
-                    self.num_pstates = data
-                if level == "turbopct":
-                    self.turbo_pct = data
+        if not self.publish_pending:
+            self.publish_pending = True
+            GLib.idle_add(self.publish_changes)
+
+    def publish_changes(self):
+        """
+        Sends PropertiesChanged with the properties that differ from the last update,
+        and ThrottleEvent if the governor throttled since then.
+        :return: False, so GLib runs it only once
+        """
+        self.publish_pending = False
+
+        properties = self.get_properties()
+        changed = {name: value for name, value in properties.items() if self.published_properties.get(name) != value}
+        if changed:
+            self.published_properties = properties
+            self.PropertiesChanged(INTERFACE, changed, [])
+
+        throttle_events = self.engine.metrics.throttle_events.value
+        if throttle_events != self.published_throttle_events:
+            self.published_throttle_events = throttle_events
+            self.ThrottleEvent(properties["Mode"], properties["Temperature"], properties["MaxPerfPct"])
+
+        return False
+
+    def shutdown(self):
+        """
+        Stops the governor engine, run once when the service exits.
+        :return:
+        """
+        self.engine.stop()
+        if self.fans is not None:
+            self.fans.close()
+        self.hwmon_monitor.close()
+        if self.fleet is not None:
+            self.fleet.close()
+        self.driver.close()
+        if self.record_log is not None:
+            self.flush_records()
+            self.record_log.close()
+
+    def handle_hwmon_events(self):
+        """
+        Rebuilds the sensor index when a hwmon device was added or removed
+        and restarts the current mode on top of the new index.
+        :return:
+        """
+        if not self.hwmon_monitor.read_events():
+            return
+
+        print("hwmon devices changed, rebuilding sensor index")
+        # the running governor reads its sensors through the index, no tick may see it half rebuilt
+        with self.engine.lock:
+            self.sensor_index.rebuild()
+        try:
+            self.start_governor(self.current_governor_name)
+        except Exception as e:
+            # e.g. the package sensor went away, keep the current governor and the hwmon watch
+            print("Mode {:s} not restarted after the hwmon change: '{}'".format(self.current_governor_name, str(e)))
+
+    def get_governor_by_name(self, name):
+        """
+        Builds the governor of the given mode on top of the shared scaling driver and sensor index,
+        user defined modes get the governor of their base mode.
+        :param name:
+        :return:
+        """
+        return self.build_governor(self.config.modes[name])
+
+    def build_governor(self, settings):
+        """
+        Builds a governor running with the given mode settings.
+        :param settings: ModeSettings
+        :return:
+        """
+        options = {}
+        if settings.base == 'powercap':
+            options["power_budget_watts"] = self.power_budget_watts
+
+        governor = self.governor_factories[settings.base](self.driver, self.sensor_index, self.sysfs, **options)
+        governor.configure(settings)
+        governor.fans = self.fans
+        governor.fleet = self.fleet
+        return governor
@@ -0,0 +1,47 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from controllers.ThermalController import ThermalController
+
+
+class BandController(ThermalController):
+    """
+    The prototype thermal daemon rule: four temperature bands, each with a fixed pct step.
+    Band edges are given relative to the temperature limit, the defaults match the prototype's 80/90/95 degrees.
+    """
+
+    def __init__(self, safe_margin=10, critical_excess=5, throttle_critical=-5, throttle_moderate=-1,
+                 increase_moderate=1, increase_boost=5):
+        self.safe_margin = safe_margin
+        self.critical_excess = critical_excess
+
+        self.throttle_critical = throttle_critical
+        self.throttle_moderate = throttle_moderate
+        self.increase_moderate = increase_moderate
+        self.increase_boost = increase_boost
+
+    def get_max_pct(self, current_max_pct, temperature, max_temperature, min_pct_limit, max_pct_limit, timestamp):
+        if temperature > max_temperature + self.critical_excess:
+            step = self.throttle_critical
+        elif temperature > max_temperature:
+            step = self.throttle_moderate
+        elif temperature > max_temperature - self.safe_margin:
+            step = self.increase_moderate
+        else:
+            step = self.increase_boost
+
+        return self.clamp(current_max_pct + step, min_pct_limit, max_pct_limit)
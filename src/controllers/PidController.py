@@ -0,0 +1,86 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from controllers.ThermalController import ThermalController
+
+
+class PidController(ThermalController):
+    """
+    Holds the package at target_margin degrees below the temperature limit with the highest pct that sustains it.
+    The integral term carries the sustainable pct, it stops integrating while the output is saturated (anti-windup).
+    The derivative acts on the temperature, not on the error, so limit changes don't kick the output.
+    With a thermal model the error is taken from the temperature predicted prediction_horizon seconds ahead.
+    The derivative is off by default, coretemp only reports whole degrees and the quantization noise makes it
+    throttle more than it helps.
+    """
+
+    def __init__(self, kp=2.0, ki=1.0, kd=0.0, target_margin=1, model=None, prediction_horizon=2.0):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.target_margin = target_margin
+
+        self.model = model
+        self.prediction_horizon = prediction_horizon
+
+        self.integral = None
+        self.last_temperature = None
+        self.last_timestamp = None
+
+    def get_max_pct(self, current_max_pct, temperature, max_temperature, min_pct_limit, max_pct_limit, timestamp):
+        if self.integral is None:
+            # bumpless start from whatever is in effect now
+            self.integral = float(current_max_pct)
+
+        dt = 0
+        if self.last_timestamp is not None:
+            dt = timestamp - self.last_timestamp
+
+        derivative = 0
+        if dt > 0:
+            derivative = (temperature - self.last_temperature) / dt
+
+        self.last_temperature = temperature
+        self.last_timestamp = timestamp
+
+        controlled_temperature = temperature
+        if self.model is not None:
+            self.model.update(temperature, current_max_pct, timestamp)
+            predicted = self.model.predict(temperature, current_max_pct, self.prediction_horizon)
+            # only look ahead to catch heating up early, cooling down is left to the integral term
+            controlled_temperature = max(temperature, predicted)
+
+        error = (max_temperature - self.target_margin) - controlled_temperature
+
+        integral = self.integral + self.ki * error * dt
+        output = self.kp * error + integral - self.kd * derivative
+
+        if (output > max_pct_limit and error > 0) or (output < min_pct_limit and error < 0):
+            # saturated and the error pushes further out, keep the integral where it was
+            output = self.kp * error + self.integral - self.kd * derivative
+        else:
+            self.integral = integral
+
+        # the integral alone must stay within reach of the limits, too
+        self.integral = self.clamp(self.integral, min_pct_limit, max_pct_limit)
+
+        return int(round(self.clamp(output, min_pct_limit, max_pct_limit)))
+
+    def reset(self):
+        self.integral = None
+        self.last_temperature = None
+        self.last_timestamp = None
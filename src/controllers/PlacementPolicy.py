@@ -0,0 +1,116 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+class PlacementPolicy(object):
+    """
+    Picks busy threads to move off cores nearing the temperature limit onto clearly cooler ones,
+    so a hot spot sheds heat by moving work instead of every core losing clock speed.
+    Moves are rate limited, a thread stays put for task_cooldown seconds after being moved and only
+    max_moves go per update, caches are only thrown away where it buys headroom.
+    An idle core cools down to the heatsink within a second whatever made it hot, so a core that ran hot
+    doesn't take threads for hot_memory seconds, or the threads would be moved right back onto it.
+    Once every core is well below the limit the moved threads are handed back to the scheduler.
+    """
+
+    def __init__(self, hot_margin=5, min_gap=8, release_margin=10, busy_usage=0.5, max_moves=2,
+                 task_cooldown=10.0, hot_memory=60.0, max_cpu_load=1.0):
+        """
+        :param hot_margin: degrees below the limit a core counts as hot at
+        :param min_gap: degrees a core has to be cooler than the hottest one to take threads
+        :param release_margin: degrees below the limit every core has to be before moved threads are released
+        :param busy_usage: share of a cpu a thread has to use to be worth moving
+        :param max_moves: threads moved per update
+        :param task_cooldown: seconds a moved thread stays where it was put
+        :param hot_memory: seconds a core that was hot doesn't take threads
+        :param max_cpu_load: share of each cool cpu moved threads may fill it up to
+        """
+        self.hot_margin = hot_margin
+        self.min_gap = min_gap
+        self.release_margin = release_margin
+        self.busy_usage = busy_usage
+        self.max_moves = max_moves
+        self.task_cooldown = task_cooldown
+        self.hot_memory = hot_memory
+        self.max_cpu_load = max_cpu_load
+
+        # tid -> when it was last moved
+        self.moved = {}
+        # (package id, core id) -> when it was last hot
+        self.hot_cores = {}
+
+    def plan(self, core_temps, core_cpus, tasks, max_temp, timestamp):
+        """
+        :param core_temps: (package id, core id) -> degrees
+        :param core_cpus: (package id, core id) -> cpus of the core
+        :param tasks: busy Tasks from the TaskMonitor
+        :param max_temp: temperature limit
+        :param timestamp: seconds
+        :return: list of (Task, cpus to move it to) and list of tids to release
+        """
+        if not core_temps:
+            return [], []
+
+        hottest = max(core_temps.values())
+        if hottest < max_temp - self.release_margin:
+            releases = [tid for tid, moved_at in self.moved.items() if timestamp - moved_at >= self.task_cooldown]
+            for tid in releases:
+                del self.moved[tid]
+            return [], releases
+
+        hot_cpus = set()
+        cool_cpus = set()
+        for core, temperature in core_temps.items():
+            if temperature >= max_temp - self.hot_margin:
+                hot_cpus.update(core_cpus[core])
+                self.hot_cores[core] = timestamp
+            elif temperature <= hottest - self.min_gap and \
+                    timestamp - self.hot_cores.get(core, float("-inf")) >= self.hot_memory:
+                cool_cpus.update(core_cpus[core])
+        if not hot_cpus or not cool_cpus:
+            # nothing close to the limit, or heat spread evenly and only throttling helps
+            return [], []
+
+        load = {}
+        for task in tasks:
+            load[task.cpu] = load.get(task.cpu, 0.0) + task.usage
+        spare = sum(max(0.0, self.max_cpu_load - load.get(cpu, 0.0)) for cpu in cool_cpus)
+
+        candidates = [task for task in tasks
+                      if task.cpu in hot_cpus and task.usage >= self.busy_usage and
+                      timestamp - self.moved.get(task.tid, float("-inf")) >= self.task_cooldown]
+        candidates.sort(key=lambda task: task.usage, reverse=True)
+
+        moves = []
+        for task in candidates:
+            if len(moves) >= self.max_moves:
+                break
+            # the tick counters can make a busy thread look like it used a little more than a cpu
+            usage = min(task.usage, 1.0)
+            if usage > spare:
+                continue
+            moves.append((task, cool_cpus))
+            spare -= usage
+            self.moved[task.tid] = timestamp
+        return moves, []
+
+    def forget(self, tid):
+        """
+        Drops a thread that exited or couldn't be moved.
+        :param tid:
+        :return:
+        """
+        self.moved.pop(tid, None)
@@ -0,0 +1,31 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from controllers.ThermalController import ThermalController
+
+
+class StepController(ThermalController):
+    """
+    The original governor rule: every tick moves max perf pct by half of the distance to the temperature limit.
+    """
+
+    def __init__(self, divisor=2):
+        self.divisor = divisor
+
+    def get_max_pct(self, current_max_pct, temperature, max_temperature, min_pct_limit, max_pct_limit, timestamp):
+        pct = current_max_pct + int((max_temperature - temperature) / self.divisor)
+        return self.clamp(pct, min_pct_limit, max_pct_limit)
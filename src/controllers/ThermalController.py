@@ -0,0 +1,44 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from abc import ABCMeta, abstractmethod
+
+
+class ThermalController(object):
+    """
+    Policy that turns the package temperature into the next max perf pct.
+    Governors own one controller each and call it once per tick.
+    """
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def get_max_pct(self, current_max_pct, temperature, max_temperature, min_pct_limit, max_pct_limit, timestamp):
+        """
+        Calculates the next max perf pct.
+        :param current_max_pct: max perf pct currently in effect
+        :param temperature: current package temperature
+        :param max_temperature: package temperature limit
+        :param min_pct_limit: lowest allowed result
+        :param max_pct_limit: highest allowed result
+        :param timestamp: monotonic time of the reading in seconds
+        :return: new max perf pct within the limits
+        """
+        pass
+
+    @staticmethod
+    def clamp(pct, min_pct_limit, max_pct_limit):
+        return max(min_pct_limit, min(max_pct_limit, pct))
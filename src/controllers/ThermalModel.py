@@ -0,0 +1,90 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+
+class ThermalModel(object):
+    """
+    First order thermal model learned online: dT/dt = w0 + w1 * T + w2 * pct.
+    The weights are fitted with recursive least squares and a forgetting factor,
+    so the model follows changes in load and ambient temperature.
+    """
+
+    def __init__(self, forgetting_factor=0.995, warmup_samples=20):
+        self.forgetting_factor = forgetting_factor
+        self.warmup_samples = warmup_samples
+
+        self.weights = [0.0, 0.0, 0.0]
+        # inverse correlation matrix, starts out large so the first samples weigh in quickly
+        self.covariance = [[1000.0 if row == column else 0.0 for column in range(3)] for row in range(3)]
+        self.samples = 0
+
+        self.last_temperature = None
+        self.last_pct = None
+        self.last_timestamp = None
+
+    def update(self, temperature, pct, timestamp):
+        """
+        Feeds a new observation into the model.
+        :param temperature: current temperature
+        :param pct: max perf pct that was in effect since the previous observation
+        :param timestamp: seconds
+        :return:
+        """
+        if self.last_timestamp is not None and timestamp > self.last_timestamp:
+            slope = (temperature - self.last_temperature) / (timestamp - self.last_timestamp)
+            self.fit([1.0, self.last_temperature, self.last_pct], slope)
+
+        self.last_temperature = temperature
+        self.last_pct = pct
+        self.last_timestamp = timestamp
+
+    def fit(self, features, target):
+        p = self.covariance
+        p_x = [sum(p[row][column] * features[column] for column in range(3)) for row in range(3)]
+        denominator = self.forgetting_factor + sum(features[row] * p_x[row] for row in range(3))
+        gain = [value / denominator for value in p_x]
+
+        error = target - sum(self.weights[row] * features[row] for row in range(3))
+        self.weights = [self.weights[row] + gain[row] * error for row in range(3)]
+
+        x_p = [sum(features[row] * p[row][column] for row in range(3)) for column in range(3)]
+        self.covariance = [[(p[row][column] - gain[row] * x_p[column]) / self.forgetting_factor
+                            for column in range(3)] for row in range(3)]
+        self.samples += 1
+
+    def is_ready(self):
+        # a model that would heat up on its own forever is not trustworthy yet
+        return self.samples >= self.warmup_samples and self.weights[1] < 0
+
+    def predict(self, temperature, pct, horizon, step=0.25):
+        """
+        Predicts the temperature after holding the given pct for horizon seconds.
+        :param temperature: current temperature
+        :param pct: max perf pct to hold
+        :param horizon: seconds
+        :param step: integration step in seconds
+        :return: predicted temperature, the current one if the model isn't ready
+        """
+        if not self.is_ready():
+            return temperature
+
+        w0, w1, w2 = self.weights
+        elapsed = 0
+        while elapsed < horizon:
+            temperature += (w0 + w1 * temperature + w2 * pct) * step
+            elapsed += step
+        return temperature
@@ -0,0 +1,71 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+
+class UncorePolicy(object):
+    """
+    Caps the uncore clock while the memory controllers are close to idle and lifts the cap as soon as
+    memory traffic picks up, like the auto mode does with the core limits: up right away,
+    down only after step_down_samples low samples in a row.
+    Traffic is judged against the highest bandwidth seen recently, so no per machine tuning is needed.
+    While the governor throttles the cap stays on, the package needs the power headroom more than the uncore.
+    """
+
+    def __init__(self, high_fraction=0.3, low_fraction=0.1, step_down_samples=6, low_cap_pct=40,
+                 peak_decay=0.999, min_peak=1e9):
+        """
+        :param high_fraction: share of the peak bandwidth that lifts the cap
+        :param low_fraction: share of the peak bandwidth below which a sample counts as low
+        :param step_down_samples: low samples in a row before capping
+        :param low_cap_pct: cap in pct of the uncore range
+        :param peak_decay: per sample, so the peak follows the workload down slowly
+        :param min_peak: bytes per second, an idle machine doesn't call a trickle of traffic memory bound
+        """
+        self.high_fraction = high_fraction
+        self.low_fraction = low_fraction
+        self.step_down_samples = step_down_samples
+        self.low_cap_pct = low_cap_pct
+        self.peak_decay = peak_decay
+        self.min_peak = min_peak
+
+        self.peak = min_peak
+        self.low_samples = 0
+        self.capped = False
+
+    def update(self, bandwidth, throttled):
+        """
+        :param bandwidth: bytes per second
+        :param throttled: whether the governor is holding max perf pct below its limit
+        :return: cap in pct of the uncore range, None for no cap
+        """
+        self.peak = max(bandwidth, self.peak * self.peak_decay, self.min_peak)
+        fraction = bandwidth / self.peak
+
+        if throttled:
+            self.capped = True
+            self.low_samples = 0
+        elif fraction >= self.high_fraction:
+            self.capped = False
+            self.low_samples = 0
+        elif fraction < self.low_fraction:
+            self.low_samples += 1
+            if self.low_samples >= self.step_down_samples:
+                self.capped = True
+        else:
+            self.low_samples = 0
+
+        return self.low_cap_pct if self.capped else None
@@ -0,0 +1,84 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import dbus
+
+BUS_NAME = "ee.ounapuu.LinuxCPUManager"
+OBJECT_PATH = "/ee/ounapuu/LinuxCPUManager"
+INTERFACE = "ee.ounapuu.LinuxCPUManager"
+
+
+class ManagerClient(object):
+    """
+    Client of the service D-Bus API. Keeps one bus connection and proxy for every call it makes,
+    long running clients (dashboards, the watch command) should hold on to a single instance.
+    """
+
+    def __init__(self, bus=None):
+        self.bus = bus if bus is not None else dbus.SystemBus()
+        # the interface is known, introspecting it would cost an extra round trip
+        self.proxy = self.bus.get_object(BUS_NAME, OBJECT_PATH, introspect=False)
+        self.manager = dbus.Interface(self.proxy, INTERFACE)
+        self.properties = dbus.Interface(self.proxy, dbus.PROPERTIES_IFACE)
+
+    def set_mode(self, mode):
+        return str(self.proxy.set_mode(mode, dbus_interface="ee.ounapuu.LinuxCPUManager.setMode"))
+
+    def get_status(self):
+        return {str(name): value for name, value in self.manager.GetStatus().items()}
+
+    def get_metrics(self):
+        return {str(name): float(value) for name, value in self.manager.GetMetrics().items()}
+
+    def flush_records(self):
+        """
+        Has the service write out its recorded ticks.
+        :return: path of the record log
+        """
+        return str(self.manager.FlushRecords())
+
+    def reload(self):
+        """
+        Has the service read its config file again.
+        :return: what changed
+        """
+        return str(self.manager.Reload())
+
+    def get_modes(self):
+        return [str(mode) for mode in self.get_property("Modes")]
+
+    def get_property(self, name):
+        return self.properties.Get(INTERFACE, name)
+
+    def on_properties_changed(self, callback):
+        """
+        :param callback: called with a dict of the changed properties
+        :return:
+        """
+        def handler(interface_name, changed_properties, invalidated_properties):
+            if interface_name == INTERFACE:
+                callback({str(name): value for name, value in changed_properties.items()})
+
+        return self.bus.add_signal_receiver(handler, "PropertiesChanged", dbus.PROPERTIES_IFACE, BUS_NAME,
+                                            OBJECT_PATH)
+
+    def on_throttle_event(self, callback):
+        """
+        :param callback: called with the mode, temperature and max perf pct
+        :return:
+        """
+        return self.bus.add_signal_receiver(callback, "ThrottleEvent", INTERFACE, BUS_NAME, OBJECT_PATH)
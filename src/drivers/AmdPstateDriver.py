@@ -0,0 +1,45 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from drivers.CpufreqDriver import CpufreqDriver
+
+
+class AmdPstateDriver(CpufreqDriver):
+    """
+    amd-pstate in passive or guided mode, and amd-pstate-epp in active mode, limited like any cpufreq driver.
+    cpuinfo_max_freq drops to the nominal frequency while boost is off, so percentages are taken of
+    amd_pstate_max_freq instead and mean the same with and without turbo.
+    In active mode the driver has intel_pstate like powersave and performance governors, and like intel_pstate
+    stays on powersave to leave the bias to EPP.
+    """
+
+    def read_max_freq(self, policy_path):
+        if self.sysfs.exists(policy_path + "amd_pstate_max_freq"):
+            return self.sysfs.read_int(policy_path + "amd_pstate_max_freq")
+        return super().read_max_freq(policy_path)
+
+    def read_base_freq(self, policy_path):
+        # only tells the nominal frequency apart while boost is off
+        cpuinfo_max_freq = self.sysfs.read_int(policy_path + "cpuinfo_max_freq")
+        if cpuinfo_max_freq < self.read_max_freq(policy_path):
+            return cpuinfo_max_freq
+        return super().read_base_freq(policy_path)
+
+    def get_scaling_governor(self, performance_bias):
+        if self.name == "amd-pstate-epp" and performance_bias in ("powersave", "performance"):
+            return "powersave" if self.energy.has_epp else performance_bias
+        return None
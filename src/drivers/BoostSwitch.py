@@ -0,0 +1,62 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+class BoostSwitch(object):
+    """
+    no_turbo written as the inverted cpufreq boost attribute, a global one or one per policy depending on the driver.
+    Without any boost attribute turbo can't be switched off from here and writes do nothing.
+    Looks like a CachedSysfsAttribute holding no_turbo.
+    """
+
+    def __init__(self, sysfs, paths):
+        self.path = paths[0] if paths else None
+        self.attributes = [sysfs.cached_attribute(path) for path in paths]
+        self.shadow_value = None
+
+    def write_int(self, value):
+        """
+        :param value: no_turbo
+        :return: True if a write was issued
+        """
+        value = int(value)
+        issued = False
+        for attribute in self.attributes:
+            if attribute.write_int(0 if value else 1):
+                issued = True
+        self.shadow_value = value
+        return issued
+
+    def invalidate(self):
+        self.shadow_value = None
+        for attribute in self.attributes:
+            attribute.invalidate()
+
+    def close(self):
+        for attribute in self.attributes:
+            attribute.close()
+
+    @property
+    def writes_issued(self):
+        return sum(attribute.writes_issued for attribute in self.attributes)
+
+    @property
+    def writes_elided(self):
+        return sum(attribute.writes_elided for attribute in self.attributes)
+
+    @property
+    def external_changes(self):
+        return sum(attribute.external_changes for attribute in self.attributes)
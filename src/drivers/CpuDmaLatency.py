@@ -0,0 +1,59 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import struct
+
+CPU_DMA_LATENCY_PATH = "/dev/cpu_dma_latency"
+
+
+class CpuDmaLatency(object):
+    """
+    PM QoS CPU latency request through /dev/cpu_dma_latency. The kernel keeps every cpu out of idle states
+    slower to leave than the requested latency for as long as the file stays open, and drops the request
+    when it is closed, also when the process dies.
+    """
+
+    def __init__(self, sysfs, path=CPU_DMA_LATENCY_PATH):
+        self.sysfs = sysfs
+        self.path = path
+        self.available = sysfs.exists(path)
+
+        # kept open while the request is held
+        self.request = None
+        # microseconds requested, None while no request is held
+        self.latency_us = None
+
+    def hold(self, latency_us):
+        """
+        Opens the request or changes the latency of the one held.
+        :param latency_us: 0 keeps the cpus in the shallowest idle state
+        :return: True if the request changed
+        """
+        if latency_us == self.latency_us:
+            return False
+        if self.request is None:
+            self.request = self.sysfs.attribute(self.path, writable=True)
+        # always the 4 byte binary form, a 4 character hex string would be taken for one
+        self.request.write_bytes(struct.pack("=i", latency_us))
+        self.latency_us = latency_us
+        return True
+
+    def release(self):
+        if self.request is not None:
+            self.request.close()
+            self.request = None
+        self.latency_us = None
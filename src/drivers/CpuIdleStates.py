@@ -0,0 +1,84 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import re
+
+IDLE_STATE_PATTERN = "/sys/devices/system/cpu/cpu[0-9]*/cpuidle/state[0-9]*"
+
+
+class CpuIdleStates(object):
+    """
+    cpuidle states of every cpu, disabled by exit latency through cpuidle/stateN/disable.
+    A PM QoS request already keeps the governor out of slow states, disabling them also covers
+    idle governors and platforms that don't honour it. State 0 (POLL or C1) is never disabled.
+    Found on the first limit() and put back to what they were by restore().
+    """
+
+    def __init__(self, sysfs, writer):
+        """
+        :param sysfs:
+        :param writer: BatchWriter of the driver, one attribute per cpu and state adds up on big machines
+        """
+        self.sysfs = sysfs
+        self.writer = writer
+
+        # (state name, exit latency in us, disable attribute), read on first use
+        self.states = None
+        self.saved = None
+        # latency the states are limited to, None while the saved values are in place
+        self.max_latency_us = None
+
+    def read_states(self):
+        self.states = []
+        for path in sorted(self.sysfs.glob(IDLE_STATE_PATTERN)):
+            if int(re.search(r"state(\d+)$", path).group(1)) == 0:
+                continue
+            name = self.sysfs.read_str(os.path.join(path, "name"))
+            latency = self.sysfs.read_int(os.path.join(path, "latency"))
+            self.states.append((name, latency, self.sysfs.cached_attribute(os.path.join(path, "disable"))))
+
+    def limit(self, max_latency_us):
+        """
+        Disables the states with an exit latency above max_latency_us and enables the others.
+        :param max_latency_us:
+        :return: number of states disabled, over all cpus
+        """
+        if self.states is None:
+            self.read_states()
+        if self.saved is None:
+            self.saved = [attribute.read_int() for name, latency, attribute in self.states]
+
+        self.writer.write_all([(attribute, 1 if latency > max_latency_us else 0)
+                               for name, latency, attribute in self.states])
+        self.max_latency_us = max_latency_us
+        return sum(1 for name, latency, attribute in self.states if latency > max_latency_us)
+
+    def restore(self):
+        """
+        Puts back the disable flags found before the first limit().
+        :return:
+        """
+        if self.max_latency_us is None:
+            return
+        self.writer.write_all([(attribute, value) for (name, latency, attribute), value in
+                               zip(self.states, self.saved)])
+        self.max_latency_us = None
+
+    def close(self):
+        for name, latency, attribute in self.states or []:
+            attribute.close()
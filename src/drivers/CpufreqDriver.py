@@ -0,0 +1,103 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+import re
+
+from drivers.BoostSwitch import BoostSwitch
+from drivers.FrequencyLimit import FrequencyLimit
+from drivers.ScalingDriver import ScalingDriver
+
+CPUFREQ_PATH = "/sys/devices/system/cpu/cpufreq/"
+
+
+class CpufreqDriver(ScalingDriver):
+    """
+    Any cpufreq driver without percent limits of its own, like acpi-cpufreq or cppc_cpufreq.
+    Limits go to scaling_min_freq and scaling_max_freq of every policy as a percentage of the policy's own max
+    frequency, so policies with different ranges (hybrid CPUs) are limited alike.
+    Turbo is switched off through the cpufreq boost attribute.
+    """
+
+    def __init__(self, sysfs, name):
+        super().__init__(sysfs, name)
+        self.separate_global_limits = False
+
+        # policy path -> (cpuinfo_min_freq, max frequency 100% stands for), in policy number order
+        self.policies = {}
+        policy_paths = sysfs.glob(CPUFREQ_PATH + "policy[0-9]*")
+        for policy_path in sorted(policy_paths, key=lambda path: int(re.search(r"(\d+)$", path).group(1))):
+            policy_path += "/"
+            self.policies[policy_path] = (sysfs.read_int(policy_path + "cpuinfo_min_freq"),
+                                          self.read_max_freq(policy_path))
+        if not self.policies:
+            raise RuntimeError("No cpufreq policies found")
+
+        # the lowest pct every policy can go down to
+        self.min_perf_pct = max(math.ceil(min_freq * 100 / max_freq) for min_freq, max_freq in self.policies.values())
+        self.max_perf_pct = 100
+
+        base_freqs = [(self.read_base_freq(path), max_freq) for path, (_, max_freq) in self.policies.items()]
+        if any(base_freq is None for base_freq, _ in base_freqs):
+            # turbo can still be switched off, there is just no telling where it starts
+            self.noturbo_max_pct = self.max_perf_pct
+        else:
+            self.noturbo_max_pct = min(int(base_freq * 100 / max_freq) for base_freq, max_freq in base_freqs)
+
+        self.boost_paths = self.find_boost_paths()
+
+    def read_max_freq(self, policy_path):
+        """
+        The frequency 100% stands for.
+        :param policy_path:
+        :return: kHz
+        """
+        return self.sysfs.read_int(policy_path + "cpuinfo_max_freq")
+
+    def read_base_freq(self, policy_path):
+        """
+        The highest frequency without turbo.
+        :param policy_path:
+        :return: kHz, None if unknown
+        """
+        if self.sysfs.exists(policy_path + "base_frequency"):
+            return self.sysfs.read_int(policy_path + "base_frequency")
+
+        # acpi-cpufreq lists the whole turbo range as one frequency 1 MHz above the base
+        available_path = policy_path + "scaling_available_frequencies"
+        if self.sysfs.exists(available_path):
+            frequencies = sorted((int(value) for value in self.sysfs.read_str(available_path).split()), reverse=True)
+            if len(frequencies) > 1 and frequencies[0] - frequencies[1] == 1000:
+                return frequencies[1]
+
+        return None
+
+    def find_boost_paths(self):
+        """
+        The global boost attribute, or the per policy ones of drivers that only have those.
+        :return:
+        """
+        if self.sysfs.exists(CPUFREQ_PATH + "boost"):
+            return [CPUFREQ_PATH + "boost"]
+        return [path + "boost" for path in self.policies if self.sysfs.exists(path + "boost")]
+
+    def open_limits(self):
+        return {
+            "min_perf_pct": FrequencyLimit(self.sysfs, self.writer, self.policies, "scaling_min_freq"),
+            "max_perf_pct": FrequencyLimit(self.sysfs, self.writer, self.policies, "scaling_max_freq"),
+            "no_turbo": BoostSwitch(self.sysfs, self.boost_paths),
+        }
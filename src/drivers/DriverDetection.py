@@ -0,0 +1,42 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from drivers.AmdPstateDriver import AmdPstateDriver
+from drivers.CpufreqDriver import CpufreqDriver
+from drivers.IntelPstateDriver import IntelPstateDriver, PSTATE_PATH
+
+SCALING_DRIVER_PATH = "/sys/devices/system/cpu/cpu0/cpufreq/scaling_driver"
+
+
+def detect_driver(sysfs):
+    """
+    Picks the scaling driver implementation for the cpufreq driver the kernel runs.
+    :param sysfs:
+    :return: ScalingDriver
+    """
+    if sysfs.exists(SCALING_DRIVER_PATH):
+        name = sysfs.read_str(SCALING_DRIVER_PATH)
+    elif sysfs.exists(PSTATE_PATH):
+        name = "intel_pstate"
+    else:
+        raise RuntimeError("No CPU frequency scaling driver found")
+
+    if name in ("intel_pstate", "intel_cpufreq"):
+        return IntelPstateDriver(sysfs)
+    if name in ("amd-pstate", "amd-pstate-epp"):
+        return AmdPstateDriver(sysfs, name)
+    return CpufreqDriver(sysfs, name)
@@ -0,0 +1,142 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import errno
+
+EPP_PATTERN = "/sys/devices/system/cpu/cpufreq/policy[0-9]*/energy_performance_preference"
+EPB_PATTERN = "/sys/devices/system/cpu/cpu[0-9]*/power/energy_perf_bias"
+
+# from the most performance to the most power saving
+EPP_PROFILES = ("performance", "balance_performance", "balance_power", "power")
+# energy_perf_bias closest to each profile, 0 to 15
+EPB_VALUES = {"performance": 0, "balance_performance": 4, "balance_power": 8, "power": 15}
+# shedding heat never goes past this one, power is for the modes asking for it
+LOWEST_SHIFT_PROFILE = "balance_power"
+
+
+class EnergyPreference(object):
+    """
+    HWP energy performance preference of every cpufreq policy and energy perf bias of every cpu,
+    the hardware's own performance/power trade-off under intel_pstate and amd-pstate-epp.
+    Profiles are EPP names, EPB gets the value closest to them. The values set before the service are saved
+    on the first write and put back by restore().
+    """
+
+    def __init__(self, sysfs):
+        self.sysfs = sysfs
+
+        epp_paths = sorted(sysfs.glob(EPP_PATTERN))
+        self.epp_attributes = [sysfs.attribute(path, writable=True) for path in epp_paths]
+        self.epb_attributes = [sysfs.attribute(path, writable=True) for path in sorted(sysfs.glob(EPB_PATTERN))]
+        self.has_epp = bool(epp_paths)
+
+        self.available = EPP_PROFILES
+        if self.has_epp:
+            available_path = epp_paths[0].replace("energy_performance_preference",
+                                                  "energy_performance_available_preferences")
+            if sysfs.exists(available_path):
+                available = sysfs.read_str(available_path).split()
+                self.available = tuple(profile for profile in EPP_PROFILES if profile in available)
+
+        # last profile written, None while the saved values are in place
+        self.profile = None
+        self.saved_epp = None
+        self.saved_epb = None
+
+        self.external_changes = 0
+
+    def get_shift_profiles(self, profile):
+        """
+        Profiles a mode may shift through to shed heat, its own first.
+        :param profile:
+        :return:
+        """
+        if profile not in self.available:
+            return (profile,)
+        lowest = max(self.available.index(profile), self.available.index(LOWEST_SHIFT_PROFILE)
+                     if LOWEST_SHIFT_PROFILE in self.available else 0)
+        return self.available[self.available.index(profile):lowest + 1]
+
+    def apply(self, profile):
+        """
+        Writes the profile to every policy and cpu unless it is already set.
+        :param profile: EPP name
+        :return: True if anything was written
+        """
+        if profile == self.profile:
+            return False
+
+        if self.saved_epp is None:
+            self.saved_epp = [attribute.read_str() for attribute in self.epp_attributes]
+            self.saved_epb = [attribute.read_int() for attribute in self.epb_attributes]
+
+        if profile in self.available:
+            self.write_all(self.epp_attributes, profile)
+        self.write_all(self.epb_attributes, EPB_VALUES[profile])
+        self.profile = profile
+        return True
+
+    def verify(self):
+        """
+        Reads the preferences back and rewrites the ones changed behind our back,
+        e.g. reset by the firmware on resume or by another tool.
+        :return:
+        """
+        if self.profile is None:
+            return
+
+        changed = [(attribute, self.profile) for attribute in self.epp_attributes
+                   if self.profile in self.available and attribute.read_str() != self.profile]
+        changed.extend((attribute, EPB_VALUES[self.profile]) for attribute in self.epb_attributes
+                       if attribute.read_int() != EPB_VALUES[self.profile])
+        if changed:
+            self.external_changes += len(changed)
+            print("Energy preference changed externally on {:d} attributes, restoring {:s}".format(
+                len(changed), self.profile))
+            for attribute, value in changed:
+                self.write(attribute, value)
+
+    def restore(self):
+        """
+        Puts back what was set before the service wrote anything.
+        :return:
+        """
+        if self.profile is None:
+            return
+
+        for attribute, value in zip(self.epp_attributes, self.saved_epp):
+            self.write(attribute, value)
+        for attribute, value in zip(self.epb_attributes, self.saved_epb):
+            self.write(attribute, value)
+        self.profile = None
+
+    def write_all(self, attributes, value):
+        for attribute in attributes:
+            self.write(attribute, value)
+
+    def write(self, attribute, value):
+        try:
+            attribute.write_str(str(value))
+        except OSError as error:
+            # intel_pstate and amd-pstate-epp refuse anything but performance under the performance governor
+            if error.errno != errno.EBUSY:
+                raise
+            print("Can't set {:s} to {:s} under the performance governor".format(attribute.path, str(value)))
+
+    def close(self):
+        for attribute in self.epp_attributes + self.epb_attributes:
+            attribute.close()
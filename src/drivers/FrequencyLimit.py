@@ -0,0 +1,70 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+class FrequencyLimit(object):
+    """
+    Percent limit written as a frequency to the same attribute (scaling_min_freq or scaling_max_freq)
+    of every cpufreq policy. Each policy gets the percentage of its own max frequency.
+    Looks like a CachedSysfsAttribute holding the percentage, the policy attributes skip unchanged writes on their own
+    and the rest go out as one batch.
+    """
+
+    def __init__(self, sysfs, writer, policies, name):
+        """
+        :param sysfs:
+        :param writer: BatchWriter
+        :param policies: policy path -> (cpuinfo_min_freq, max frequency 100% stands for)
+        :param name: attribute in the policy directories
+        """
+        self.path = name
+        self.writer = writer
+        self.attributes = [(sysfs.cached_attribute(path + name), min_freq, max_freq)
+                           for path, (min_freq, max_freq) in policies.items()]
+        self.shadow_value = None
+
+    def write_int(self, value):
+        """
+        :param value: pct
+        :return: True if a write was issued to any policy
+        """
+        value = int(value)
+        writes = [(attribute, max(min_freq, min(max_freq, max_freq * value // 100)))
+                  for attribute, min_freq, max_freq in self.attributes]
+        issued = self.writer.write_all(writes)
+        self.shadow_value = value
+        return any(issued)
+
+    def invalidate(self):
+        self.shadow_value = None
+        for attribute, _, _ in self.attributes:
+            attribute.invalidate()
+
+    def close(self):
+        for attribute, _, _ in self.attributes:
+            attribute.close()
+
+    @property
+    def writes_issued(self):
+        return sum(attribute.writes_issued for attribute, _, _ in self.attributes)
+
+    @property
+    def writes_elided(self):
+        return sum(attribute.writes_elided for attribute, _, _ in self.attributes)
+
+    @property
+    def external_changes(self):
+        return sum(attribute.external_changes for attribute, _, _ in self.attributes)
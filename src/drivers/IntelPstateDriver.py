@@ -0,0 +1,71 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from drivers.ScalingDriver import ScalingDriver
+
+PSTATE_PATH = "/sys/devices/system/cpu/intel_pstate/"
+
+
+class IntelPstateDriver(ScalingDriver):
+    """
+    intel_pstate in active or passive mode. The percent limits are the driver's own global attributes in both modes.
+    Only the scaling governors differ: active mode has its own powersave and performance governors,
+    passive mode (intel_cpufreq) runs the generic ones, where powersave and performance pin the frequency
+    instead of biasing it.
+    With HWP the bias is carried by EPP instead, which the performance governor locks to performance,
+    so active mode stays on powersave.
+    """
+
+    def __init__(self, sysfs):
+        # kernels before the status attribute only had the active mode
+        status = "active"
+        if sysfs.exists(PSTATE_PATH + "status"):
+            status = sysfs.read_str(PSTATE_PATH + "status")
+        super().__init__(sysfs, "intel_pstate" if status == "active" else "intel_cpufreq")
+        self.status = status
+
+        self.min_perf_pct = sysfs.read_int(PSTATE_PATH + "min_perf_pct")
+        self.max_perf_pct = sysfs.read_int(PSTATE_PATH + "max_perf_pct")
+        self.num_pstates = sysfs.read_int(PSTATE_PATH + "num_pstates")
+        self.turbo_pct = sysfs.read_int(PSTATE_PATH + "turbo_pct")
+
+        self.noturbo_max_pct = self.calculate_noturbo_max_pct()
+
+    def calculate_noturbo_max_pct(self):
+        """
+        Calculates the performance percentage at the turbo clock speed limit.
+        Used to allow proper throttling when no_turbo is set to 1, as we need the proper percentages to perform throttling.
+        :return:
+        """
+        percentage_range = self.max_perf_pct - self.min_perf_pct
+        step_pct = percentage_range / (self.num_pstates - 1)
+        nonturbo_range_pct = (100 - self.turbo_pct) / 100
+        turbo_range_start_as_step_count = nonturbo_range_pct * self.num_pstates
+        turbo_range_as_pct = self.min_perf_pct + (turbo_range_start_as_step_count * step_pct)
+        return int(turbo_range_as_pct)
+
+    def open_limits(self):
+        # the pstate limits skip writes of values that are already set
+        return {
+            name: self.sysfs.cached_attribute(PSTATE_PATH + name)
+            for name in ("min_perf_pct", "max_perf_pct", "no_turbo")
+        }
+
+    def get_scaling_governor(self, performance_bias):
+        if self.status == "active" and performance_bias in ("powersave", "performance"):
+            return "powersave" if self.energy.has_epp else performance_bias
+        return None
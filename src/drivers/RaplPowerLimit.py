@@ -0,0 +1,75 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from sensors.RaplDomain import RaplDomain
+
+
+class RaplPowerLimit(object):
+    """
+    RAPL long term power limits of every package, lowered by the powercap mode as a backstop to its budget.
+    The limits are saved when the driver is set up, before any mode writes them, so they stay what the
+    firmware allows however many times the mode is rebuilt. restore() puts them back. Empty without RAPL.
+    """
+
+    def __init__(self, sysfs):
+        self.sysfs = sysfs
+
+        # package domain path -> long term limit attribute path and the watts it had at service start
+        self.paths = {}
+        self.saved_watts = {}
+        for domain in RaplDomain.discover(sysfs):
+            path = domain.power_limit_paths.get("long_term")
+            if domain.is_package() and path is not None:
+                self.paths[domain.path] = path
+                self.saved_watts[domain.path] = sysfs.read_int(path) / 1e6
+            domain.close()
+
+        # package domain path -> cached attribute, for the limits written since the last restore
+        self.limits = {}
+
+    def get_saved_watts(self, domain_path):
+        """
+        :param domain_path: RaplDomain path
+        :return: the long term limit the package had at service start, None without one
+        """
+        return self.saved_watts.get(domain_path)
+
+    def apply(self, domain_path, watts):
+        """
+        Writes the package's long term limit, never above the saved one.
+        :param domain_path: RaplDomain path
+        :param watts:
+        :return: True if a write was issued
+        """
+        if domain_path not in self.paths:
+            return False
+        if domain_path not in self.limits:
+            self.limits[domain_path] = self.sysfs.cached_attribute(self.paths[domain_path])
+        return self.limits[domain_path].write_int(int(min(watts, self.saved_watts[domain_path]) * 1e6))
+
+    def restore(self):
+        """
+        Puts back the limits saved at service start.
+        :return:
+        """
+        for domain_path, attribute in self.limits.items():
+            attribute.write_int(int(self.saved_watts[domain_path] * 1e6))
+            attribute.close()
+        self.limits = {}
+
+    def close(self):
+        self.restore()
@@ -0,0 +1,90 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from abc import ABCMeta, abstractmethod
+
+from drivers.CpuDmaLatency import CpuDmaLatency
+from drivers.CpuIdleStates import CpuIdleStates
+from drivers.EnergyPreference import EnergyPreference
+from drivers.RaplPowerLimit import RaplPowerLimit
+from drivers.UncoreFrequency import UncoreFrequency
+from sysfs.BatchWriter import BatchWriter
+
+
+class ScalingDriver(object):
+    """
+    CPU frequency scaling driver the governors set their limits through.
+    Governors think in min_perf_pct, max_perf_pct and no_turbo like intel_pstate has them, percentages of the
+    highest frequency the CPU can run at, and every driver translates those into its own attributes.
+    The platform limits don't change while the system runs, so they are read once at service start
+    and shared by every governor.
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self, sysfs, name):
+        self.sysfs = sysfs
+        # scaling_driver as the kernel reports it
+        self.name = name
+
+        self.min_perf_pct = None
+        self.max_perf_pct = None
+        # highest pct reachable without turbo
+        self.noturbo_max_pct = None
+
+        # False where the global limits are the per cpu scaling_min_freq/scaling_max_freq attributes themselves
+        self.separate_global_limits = True
+
+        # limits spread over many policies are written through it
+        self.writer = BatchWriter()
+
+        # EPP and EPB, empty where the hardware has neither
+        self.energy = EnergyPreference(sysfs)
+        # uncore clock range, empty without intel_uncore_frequency
+        self.uncore = UncoreFrequency(sysfs)
+        # PM QoS latency request and the cpuidle states, for the modes keeping the cpus out of deep idle
+        self.latency = CpuDmaLatency(sysfs)
+        self.idle = CpuIdleStates(sysfs, self.writer)
+        # RAPL long term limits, saved before any mode lowers them
+        self.power_limit = RaplPowerLimit(sysfs)
+
+    @abstractmethod
+    def open_limits(self):
+        """
+        Opens the attributes the governors write their limits to, kept open until closed.
+        :return: min_perf_pct, max_perf_pct and no_turbo -> limit with write_int, shadow_value, close
+                 and the write counters of a CachedSysfsAttribute
+        """
+        pass
+
+    def close(self):
+        """
+        Releases what the driver holds for the modes, run once when the service exits.
+        :return:
+        """
+        self.latency.release()
+        self.idle.close()
+        self.energy.close()
+        self.uncore.close()
+        self.power_limit.close()
+
+    def get_scaling_governor(self, performance_bias):
+        """
+        Maps a performance bias ("powersave" or "performance") to the scaling_governor carrying it.
+        :param performance_bias:
+        :return: governor name, None where the driver has no biasing governors
+        """
+        return None
@@ -0,0 +1,141 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from sensors.MemoryBandwidthMonitor import MemoryBandwidthMonitor
+
+UNCORE_PATTERN = "/sys/devices/system/cpu/intel_uncore_frequency/package_[0-9]*_die_[0-9]*"
+
+# profile -> lowest and highest uncore clock, in pct of the range the firmware started with,
+# named like the EPP profiles they go with
+UNCORE_PROFILES = {
+    "performance": (50, 100),
+    "balance_performance": (0, 100),
+    "balance_power": (0, 60),
+    "power": (0, 25),
+}
+# the uncore clock moves in 100 MHz ratio steps
+UNCORE_STEP_KHZ = 100000
+
+
+class UncoreDomain(object):
+    """
+    Uncore (ring, LLC, memory controller) clock limits of one package die.
+    """
+
+    def __init__(self, sysfs, path):
+        self.path = path
+        self.initial_min_khz = sysfs.read_int(os.path.join(path, "initial_min_freq_khz"))
+        self.initial_max_khz = sysfs.read_int(os.path.join(path, "initial_max_freq_khz"))
+        self.min_freq = sysfs.cached_attribute(os.path.join(path, "min_freq_khz"))
+        self.max_freq = sysfs.cached_attribute(os.path.join(path, "max_freq_khz"))
+
+    def get_khz(self, pct):
+        khz = self.initial_min_khz + (self.initial_max_khz - self.initial_min_khz) * pct / 100
+        return max(self.initial_min_khz, min(self.initial_max_khz, int(khz) // UNCORE_STEP_KHZ * UNCORE_STEP_KHZ))
+
+    def write(self, min_khz, max_khz):
+        """
+        :return: number of writes issued
+        """
+        # the driver refuses a min above the max, a raised min has to wait for the max
+        if self.max_freq.shadow_value is not None and min_khz > self.max_freq.shadow_value:
+            writes = [(self.max_freq, max_khz), (self.min_freq, min_khz)]
+        else:
+            writes = [(self.min_freq, min_khz), (self.max_freq, max_khz)]
+        return sum(1 for attribute, value in writes if attribute.write_int(value))
+
+    def close(self):
+        self.min_freq.close()
+        self.max_freq.close()
+
+
+class UncoreFrequency(object):
+    """
+    Intel uncore frequency limits of every package die, set from per mode profiles.
+    The uncore clock matters as much as the core clocks for memory bound work and burns power when the work
+    is compute bound, so the modes give it a range like they give the cores one.
+    A cap in pct of the range can be laid over the profile by the dynamic policy.
+    The limits found on the first write are put back by restore(). Empty where intel_uncore_frequency isn't loaded.
+    """
+
+    def __init__(self, sysfs):
+        self.domains = [UncoreDomain(sysfs, path) for path in sorted(sysfs.glob(UNCORE_PATTERN))]
+        self.available = bool(self.domains)
+
+        self.sysfs = sysfs
+        # memory controller traffic for the dynamic policy, opened by get_bandwidth() on first use
+        self.bandwidth = None
+
+        # profile and cap last written, None while the saved limits are in place
+        self.profile = None
+        self.cap_pct = None
+        self.saved = None
+
+    def get_bandwidth(self):
+        """
+        Opens the memory controller counters the first time a mode asks for them, they stay open after that.
+        :return: MemoryBandwidthMonitor, None where there is no uncore to scale
+        """
+        if self.bandwidth is None and self.available:
+            self.bandwidth = MemoryBandwidthMonitor(self.sysfs)
+        return self.bandwidth
+
+    def apply(self, profile, cap_pct=None):
+        """
+        Writes the profile's limits to every die unless they are already set.
+        :param profile: UNCORE_PROFILES name
+        :param cap_pct: highest pct of the range allowed on top of the profile, None for no cap
+        :return: number of writes issued
+        """
+        if not self.available or (profile, cap_pct) == (self.profile, self.cap_pct):
+            return 0
+
+        if self.saved is None:
+            self.saved = [(domain.min_freq.read_int(), domain.max_freq.read_int()) for domain in self.domains]
+
+        min_pct, max_pct = UNCORE_PROFILES[profile]
+        if cap_pct is not None:
+            max_pct = min(max_pct, cap_pct)
+            min_pct = min(min_pct, max_pct)
+
+        writes = 0
+        for domain in self.domains:
+            writes += domain.write(domain.get_khz(min_pct), domain.get_khz(max_pct))
+        self.profile = profile
+        self.cap_pct = cap_pct
+        return writes
+
+    def restore(self):
+        """
+        Puts back the limits found before the service wrote anything.
+        :return:
+        """
+        if self.profile is None:
+            return
+
+        for domain, (min_khz, max_khz) in zip(self.domains, self.saved):
+            domain.write(min_khz, max_khz)
+        self.profile = None
+        self.cap_pct = None
+
+    def close(self):
+        for domain in self.domains:
+            domain.close()
+        if self.bandwidth is not None:
+            self.bandwidth.close()
@@ -0,0 +1,168 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import select
+import threading
+
+from metrics.GovernorMetrics import GovernorMetrics
+from recorder.TickRecorder import TickRecorder
+
+# seconds between ticks when the governor cannot tell its own poll period
+DEFAULT_POLL_PERIOD = 1.0
+
+
+class GovernorEngine(object):
+    """
+    Runs the active governor on a single worker thread inside the service process.
+    Switching modes swaps the governor object under a lock, so a switch never lands in the middle of a tick
+    and the previous governor gets to clean up after itself.
+    """
+
+    def __init__(self):
+        self.governor = None
+        self.lock = threading.Lock()
+
+        # outlive the governors, so the counters and the history cover the whole service lifetime
+        self.metrics = GovernorMetrics()
+        self.recorder = TickRecorder()
+        self.mode_index = None
+        self.recorded_writes = 0
+
+        # called on the worker thread after every tick, must return quickly
+        self.tick_callback = None
+
+        self.thread = None
+        self.running = False
+
+        # written to whenever the worker should stop sleeping and look at its state again
+        self.wakeup_read_fd, self.wakeup_write_fd = os.pipe()
+        os.set_blocking(self.wakeup_read_fd, False)
+
+    def start(self):
+        """
+        Starts the worker thread.
+        :return:
+        """
+        if self.thread is not None:
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="governor-engine", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the worker thread and lets the active governor clean up.
+        :return:
+        """
+        if self.thread is not None:
+            self.running = False
+            self.wake()
+            self.thread.join()
+            self.thread = None
+
+        with self.lock:
+            if self.governor is not None:
+                self.governor.exit()
+                self.governor = None
+
+    def switch(self, governor, mode=None):
+        """
+        Replaces the active governor.
+        :param governor: the governor to run from the next tick on
+        :param mode: name the ticks are recorded under, the governor name if omitted
+        :return: the previous governor
+        :raises Exception: whatever the new governor's enter() raised, no governor runs until the next switch
+        """
+        with self.lock:
+            previous = self.governor
+            if previous is not None:
+                previous.exit()
+                # never tick a governor that has let go of its state
+                self.governor = None
+
+            governor.metrics = self.metrics
+            governor.scheduler.watch_wakeup_fd(self.wakeup_read_fd)
+            try:
+                governor.enter()
+            except Exception:
+                # put back whatever it got to set before failing
+                try:
+                    governor.exit()
+                except Exception as e:
+                    print("Governor {:s} failed to clean up: '{}'".format(governor.governor_name, str(e)))
+                raise
+            self.governor = governor
+            self.mode_index = self.recorder.get_mode_index(mode if mode is not None else governor.governor_name)
+            self.metrics.mode_switches.inc()
+
+        self.wake()
+        return previous
+
+    def wake(self):
+        os.write(self.wakeup_write_fd, b"\0")
+
+    def drain_wakeups(self):
+        try:
+            while os.read(self.wakeup_read_fd, 64):
+                pass
+        except BlockingIOError:
+            pass
+
+    def run(self):
+        """
+        The main loop: one governor tick, then sleep for as long as the governor asks or until woken up.
+        :return:
+        """
+        while self.running:
+            self.drain_wakeups()
+
+            with self.lock:
+                governor = self.governor
+                if governor is not None:
+                    try:
+                        governor.tick()
+                    except Exception as e:
+                        print("Governor {:s} tick failed: '{}'".format(governor.governor_name, str(e)))
+                    # nothing past the tick may end the worker thread either, the service would keep running
+                    # with the limits of the last tick and nobody watching the temperature
+                    try:
+                        writes = self.metrics.sysfs_writes.value
+                        self.recorder.record(self.mode_index, governor, writes - self.recorded_writes)
+                        self.recorded_writes = writes
+                    except Exception as e:
+                        print("Governor {:s} tick not recorded: '{}'".format(governor.governor_name, str(e)))
+                    try:
+                        period = governor.get_poll_period()
+                    except Exception as e:
+                        period = governor.governor_poll_period_in_seconds or DEFAULT_POLL_PERIOD
+                        print("Governor {:s} poll period failed, polling every {:.2f} s: '{}'".format(
+                            governor.governor_name, period, str(e)))
+
+            if governor is None:
+                # nothing to run until the first switch
+                select.select([self.wakeup_read_fd], [], [])
+                continue
+
+            try:
+                if self.tick_callback is not None:
+                    self.tick_callback()
+                governor.scheduler.wait(period)
+            except Exception as e:
+                print("Governor {:s} wait failed: '{}'".format(governor.governor_name, str(e)))
+                select.select([self.wakeup_read_fd], [], [], period)
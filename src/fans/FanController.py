@@ -0,0 +1,118 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from fans.FanCurve import FanCurve
+from fans.FanDevice import FULL_DUTY
+
+# seconds a governor holds its perf limit for the fans to spin up before throttling
+DEFAULT_RAMP_SECONDS = 3
+
+
+class FanController(object):
+    """
+    Runs the fans on a fan curve and ramps them to full speed before the governors throttle.
+    Shared by every governor and updated from their ticks, the fans are written only when their level changes.
+    Governors call boost() when the package gets close to its limit or they are about to lower max perf pct,
+    the fans go to full speed and is_ramping() tells for ramp_seconds that they are still spinning up.
+    The boost lasts until the temperature has dropped hysteresis degrees below where it started,
+    then the curve takes over again.
+    """
+
+    def __init__(self, fans, curve=None, ramp_seconds=DEFAULT_RAMP_SECONDS):
+        """
+        :param fans: list of FanDevice
+        :param curve: FanCurve, the default one if omitted
+        :param ramp_seconds: 0 throttles right away, the fans still get boosted
+        """
+        self.fans = list(fans)
+        self.curve = curve if curve is not None else FanCurve()
+        self.ramp_seconds = ramp_seconds
+
+        # curve point, -1 while the firmware is in control
+        self.level = -1
+        self.duty = None
+
+        self.boost_started = None
+        self.boost_temperature = None
+
+    def update(self, temperature, timestamp):
+        """
+        Follows the curve, called on every governor tick.
+        :param temperature: package temperature
+        :param timestamp: seconds
+        :return:
+        """
+        if self.boost_started is not None:
+            if temperature > self.boost_temperature - self.curve.hysteresis:
+                return
+            self.boost_started = None
+            self.boost_temperature = None
+
+        self.level = self.curve.get_level(temperature, self.level)
+        self.set_duty(self.curve.get_duty(self.level))
+
+    def boost(self, temperature, timestamp):
+        """
+        Sets the fans to full speed ahead of throttling.
+        :param temperature: package temperature
+        :param timestamp: seconds
+        :return:
+        """
+        if not self.fans or self.boost_started is not None or self.duty == FULL_DUTY:
+            # already there, nothing left to ramp up
+            return
+
+        print("Fans to full speed before throttling at {:.1f} C".format(temperature))
+        self.boost_started = timestamp
+        self.boost_temperature = temperature
+        self.set_duty(FULL_DUTY)
+
+    def is_ramping(self, timestamp):
+        """
+        :param timestamp: seconds
+        :return: True while boosted fans are still spinning up
+        """
+        return self.boost_started is not None and timestamp - self.boost_started < self.ramp_seconds
+
+    def set_duty(self, duty):
+        if duty == self.duty:
+            return
+        self.duty = duty
+
+        for fan in list(self.fans):
+            try:
+                fan.set_duty(duty)
+            except OSError as e:
+                # e.g. thinkpad_acpi without fan_control=1, leave that fan to the firmware
+                print("Giving up on fan {:s}: '{}'".format(fan.name, str(e)))
+                self.fans.remove(fan)
+
+    def get_writes(self):
+        return sum(fan.writes for fan in self.fans)
+
+    def close(self):
+        """
+        Hands the fans back to the firmware, run when the service exits or the fan settings change.
+        :return:
+        """
+        for fan in self.fans:
+            try:
+                fan.restore()
+            except OSError as e:
+                print("Failed to restore fan {:s}: '{}'".format(fan.name, str(e)))
+            fan.close()
+        self.fans = []
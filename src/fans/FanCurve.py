@@ -0,0 +1,93 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import bisect
+
+# temperature -> duty pct, full speed well below the usual 90-100 degree package limits
+DEFAULT_FAN_CURVE = ((55, 25), (65, 40), (72, 60), (78, 80), (84, 100))
+DEFAULT_HYSTERESIS = 3
+
+
+class FanCurve(object):
+    """
+    Fan duty by temperature as a step function of (temperature, duty pct) points.
+    Below the first point the firmware keeps control of the fans.
+    A point is left downwards only once the temperature is hysteresis degrees below it,
+    so a temperature hovering around a point doesn't make the fans hunt.
+    """
+
+    def __init__(self, points=DEFAULT_FAN_CURVE, hysteresis=DEFAULT_HYSTERESIS):
+        """
+        :param points: (temperature, duty pct) pairs, rising in both
+        :param hysteresis: degrees
+        """
+        points = tuple((float(temperature), int(duty)) for temperature, duty in points)
+        if not points:
+            raise ValueError("A fan curve needs at least one point")
+        for (temperature, duty), (next_temperature, next_duty) in zip(points, points[1:]):
+            if next_temperature <= temperature or next_duty < duty:
+                raise ValueError("Fan curve points must rise in temperature and not fall in duty")
+        if any(not 0 <= duty <= 100 for _, duty in points):
+            raise ValueError("Fan duty must be between 0 and 100")
+        if hysteresis < 0:
+            raise ValueError("Fan curve hysteresis can't be negative")
+
+        self.points = points
+        self.temperatures = [temperature for temperature, _ in points]
+        self.hysteresis = hysteresis
+
+    def __eq__(self, other):
+        return isinstance(other, FanCurve) and (self.points, self.hysteresis) == (other.points, other.hysteresis)
+
+    def __hash__(self):
+        return hash((self.points, self.hysteresis))
+
+    @staticmethod
+    def parse(text, hysteresis=DEFAULT_HYSTERESIS):
+        """
+        :param text: "temperature:duty" pairs separated by commas or spaces, e.g. "60:30, 70:60, 80:100"
+        :param hysteresis:
+        :return: FanCurve
+        """
+        points = []
+        for pair in text.replace(",", " ").split():
+            temperature, separator, duty = pair.partition(":")
+            if not separator:
+                raise ValueError("Fan curve points are temperature:duty, not '{:s}'".format(pair))
+            points.append((float(temperature), int(duty)))
+        return FanCurve(points, hysteresis)
+
+    def get_level(self, temperature, level):
+        """
+        :param temperature:
+        :param level: index of the current point, -1 for the firmware
+        :return: index of the point to run at
+        """
+        target = bisect.bisect_right(self.temperatures, temperature) - 1
+        if target >= level:
+            return target
+
+        while level > target and temperature <= self.temperatures[level] - self.hysteresis:
+            level -= 1
+        return level
+
+    def get_duty(self, level):
+        """
+        :param level: point index
+        :return: duty pct, None for the firmware
+        """
+        return None if level < 0 else self.points[level][1]
@@ -0,0 +1,47 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from fans.HwmonPwmFan import HwmonPwmFan
+from fans.ThinkpadFan import ThinkpadFan
+
+# graphics cards run their own fan control
+IGNORED_CHIPS = ("amdgpu", "radeon", "nouveau")
+
+
+def detect_fans(sysfs, hwmon_class_path="/sys/class/hwmon/"):
+    """
+    Finds the fans the service can control: the thinkpad_acpi interface where it accepts commands,
+    every hwmon pwm channel with an enable attribute otherwise.
+    :param sysfs:
+    :param hwmon_class_path:
+    :return: list of FanDevice
+    """
+    if ThinkpadFan.is_controllable(sysfs):
+        # thinkpad_acpi also has a hwmon pwm1 for the same fan
+        return [ThinkpadFan(sysfs)]
+
+    fans = []
+    for enable_path in sorted(sysfs.glob(os.path.join(hwmon_class_path, "hwmon*", "pwm[0-9]*_enable"))):
+        hwmon_path = os.path.dirname(enable_path)
+        name_path = os.path.join(hwmon_path, "name")
+        chip = sysfs.read_str(name_path) if sysfs.exists(name_path) else os.path.basename(hwmon_path)
+        if chip in IGNORED_CHIPS:
+            continue
+        fans.append(HwmonPwmFan(sysfs, enable_path[:-len("_enable")], chip))
+    return fans
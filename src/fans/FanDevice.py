@@ -0,0 +1,72 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from abc import ABCMeta, abstractmethod
+
+# duty pct of a fan at full speed
+FULL_DUTY = 100
+
+
+class FanDevice(object):
+    """
+    A fan the service can take over from the firmware.
+    Speeds are duty pcts from 0 to 100, each device rounds them to the levels it has and only writes when
+    the level changes. Whatever the firmware had is read on the first write and put back by restore().
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self, name):
+        self.name = name
+        # level last written, None while the firmware is in control
+        self.level = None
+        self.writes = 0
+
+    @abstractmethod
+    def get_level(self, duty):
+        """
+        :param duty: pct
+        :return: the device level closest to the duty, at least as fast
+        """
+        pass
+
+    @abstractmethod
+    def write_level(self, level):
+        """
+        :param level: device level, None to hand the fan back to the firmware
+        :return:
+        """
+        pass
+
+    def set_duty(self, duty):
+        """
+        :param duty: pct, None hands the fan back to the firmware
+        :return: True if a write was issued
+        """
+        level = None if duty is None else self.get_level(duty)
+        if level == self.level:
+            return False
+
+        self.write_level(level)
+        self.level = level
+        self.writes += 1
+        return True
+
+    def restore(self):
+        self.set_duty(None)
+
+    def close(self):
+        pass
@@ -0,0 +1,61 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from fans.FanDevice import FanDevice, FULL_DUTY
+
+# pwmN_enable values
+MANUAL_CONTROL = 1
+# pwmN range
+MAX_PWM = 255
+
+
+class HwmonPwmFan(FanDevice):
+    """
+    A generic hwmon fan channel: pwmN_enable switched to manual control, pwmN set from 0 to 255.
+    The enable value found on the first write is restored, along with pwmN if it was already manual.
+    """
+
+    def __init__(self, sysfs, pwm_path, chip):
+        super().__init__("{:s}/{:s}".format(chip, pwm_path.rsplit("/", 1)[-1]))
+        self.pwm = sysfs.attribute(pwm_path, writable=True)
+        self.enable = sysfs.attribute(pwm_path + "_enable", writable=True)
+
+        # firmware settings, saved when the fan is taken over
+        self.firmware_enable = None
+        self.firmware_pwm = None
+
+    def get_level(self, duty):
+        return int(round(min(duty, FULL_DUTY) * MAX_PWM / FULL_DUTY))
+
+    def write_level(self, level):
+        if level is None:
+            if self.firmware_enable is not None:
+                if self.firmware_enable == MANUAL_CONTROL:
+                    self.pwm.write_int(self.firmware_pwm)
+                self.enable.write_int(self.firmware_enable)
+            return
+
+        if self.firmware_enable is None:
+            self.firmware_enable = self.enable.read_int()
+            self.firmware_pwm = self.pwm.read_int()
+        if self.level is None:
+            self.enable.write_int(MANUAL_CONTROL)
+        self.pwm.write_int(level)
+
+    def close(self):
+        self.pwm.close()
+        self.enable.close()
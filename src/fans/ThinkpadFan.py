@@ -0,0 +1,70 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+
+from fans.FanDevice import FanDevice, FULL_DUTY
+
+THINKPAD_FAN_PATH = "/proc/acpi/ibm/fan"
+# level 7 is the fastest the firmware regulates, full-speed runs the fan unregulated
+HIGHEST_LEVEL = 7
+
+
+class ThinkpadFan(FanDevice):
+    """
+    The thinkpad_acpi fan interface, levels auto, 0 to 7 and full-speed written as "level X".
+    Only writable with the fan_control=1 module option, is_controllable() tells.
+    """
+
+    def __init__(self, sysfs):
+        super().__init__("thinkpad_acpi")
+        self.attribute = sysfs.attribute(THINKPAD_FAN_PATH, writable=True)
+        # usually auto, written back on restore
+        self.firmware_level = self.read_status().get("level", "auto")
+
+    @staticmethod
+    def is_controllable(sysfs):
+        """
+        :param sysfs:
+        :return: True if the fan interface exists and accepts level commands
+        """
+        if not sysfs.exists(THINKPAD_FAN_PATH):
+            return False
+        # without fan_control=1 the file lists no commands
+        return any(line.startswith("commands:") and "level" in line
+                   for line in sysfs.read_str(THINKPAD_FAN_PATH).splitlines())
+
+    def read_status(self):
+        """
+        :return: dict of the "name: value" lines
+        """
+        status = {}
+        for line in self.attribute.read_str().splitlines():
+            name, _, value = line.partition(":")
+            status.setdefault(name.strip(), value.strip())
+        return status
+
+    def get_level(self, duty):
+        if duty >= FULL_DUTY:
+            return "full-speed"
+        return str(min(HIGHEST_LEVEL, int(math.ceil(duty * HIGHEST_LEVEL / FULL_DUTY))))
+
+    def write_level(self, level):
+        self.attribute.write_str("level {:s}".format(self.firmware_level if level is None else level))
+
+    def close(self):
+        self.attribute.close()
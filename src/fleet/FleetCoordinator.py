@@ -0,0 +1,301 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+import os
+import selectors
+import socket
+import time
+
+from fleet.FleetProtocol import HELLO, REPORT, FleetProtocol
+
+# package watts at 100 pct assumed for nodes without RAPL, when no node has it either
+DEFAULT_FULL_POWER_WATTS = 100.0
+# package power is taken to grow with the square of the pct, dynamic power alone grows faster
+# but the idle power doesn't grow at all
+POWER_EXPONENT = 2.0
+# utilisation a node needs to be given its whole range
+BUSY_UTILISATION = 0.8
+# pct above its own limit a thermally throttled node gets, more would go unused
+THROTTLED_HEADROOM_PCT = 5
+# a node that can't keep up with this much unsent data is dropped
+MAX_PENDING_BYTES = 65536
+
+
+class FleetNodeState(object):
+    """
+    A connected node as the coordinator sees it, from the samples of its last report.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.protocol = FleetProtocol()
+        self.name = None
+        self.pending = b""
+
+        self.last_report = None
+        self.samples = []
+        self.ceiling = None
+
+    def get_utilisation(self):
+        return sum(sample.utilisation for sample in self.samples) / len(self.samples)
+
+    def get_full_power(self):
+        """
+        Package watts the node would draw at 100 pct with its current load, extrapolated from the last sample.
+        :return: None without RAPL
+        """
+        last = self.samples[-1]
+        if not math.isfinite(last.power) or last.power <= 0 or last.max_perf_pct <= 0:
+            return None
+        return last.power * (100 / last.max_perf_pct) ** POWER_EXPONENT
+
+    def get_target(self, min_pct):
+        """
+        :param min_pct:
+        :return: the pct the node's load needs and the most it can use
+        """
+        last = self.samples[-1]
+        need = min_pct + (100 - min_pct) * min(1.0, self.get_utilisation() / BUSY_UTILISATION)
+        most = 100
+        if last.throttled:
+            # held below the ceiling by its own thermal control
+            most = max(min_pct, last.max_perf_pct + THROTTLED_HEADROOM_PCT)
+        return int(min(need, most)), most
+
+
+class FleetCoordinator(object):
+    """
+    Shares a power budget between the nodes of a fleet by handing each of them a max perf pct ceiling.
+    Every interval the nodes that reported within the lease get at least min_pct, then the busiest of them
+    get the pct their load needs first and whatever is left goes to all of them, busiest first.
+    The power of a ceiling is extrapolated from the power and pct each node reported last, a node that is
+    thermally throttled only gets a little above its own limit. Below the ceiling the nodes still run
+    their own thermal control. Ceilings are leased, a node that stops hearing from the coordinator
+    goes back to local control once its lease runs out.
+    Single threaded and non-blocking, run from a main loop through fileno() and poll(), or with run().
+    """
+
+    def __init__(self, address, budget_watts, min_pct=20, interval=1.0, lease_seconds=5.0, clock=time.monotonic):
+        """
+        :param address: unix:PATH or HOST:PORT to listen on
+        :param budget_watts: package power the fleet may draw in total
+        :param min_pct: ceiling every node gets whatever the budget
+        :param interval: seconds between allocations
+        :param lease_seconds: how long a ceiling holds on a node without being renewed
+        :param clock: time source, simulations replace it
+        """
+        self.budget_watts = budget_watts
+        self.min_pct = min_pct
+        self.interval = interval
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+
+        family, self.address = FleetProtocol.parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        if family != socket.AF_UNIX:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(self.address)
+        self.listener.listen(64)
+        self.listener.setblocking(False)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+
+        # socket -> FleetNodeState
+        self.nodes = {}
+        self.last_allocation = None
+        self.allocations = 0
+
+    def fileno(self):
+        """
+        :return: a file descriptor readable whenever poll() has something to do
+        """
+        return self.selector.fileno()
+
+    def run(self):
+        while True:
+            self.poll(self.interval / 4)
+
+    def poll(self, timeout=0):
+        """
+        Handles the pending connections and messages and allocates when the interval is up.
+        :param timeout: seconds to wait for events
+        :return:
+        """
+        for key, events in self.selector.select(timeout):
+            if key.fileobj is self.listener:
+                self.accept()
+                continue
+            node = self.nodes.get(key.fileobj)
+            if node is None:
+                continue
+            try:
+                if events & selectors.EVENT_WRITE:
+                    self.send(node, b"")
+                if events & selectors.EVENT_READ and node.connection in self.nodes:
+                    self.receive(node)
+            except Exception as e:
+                # one node must never take the coordinator down for the rest of the fleet
+                if node.connection in self.nodes:
+                    self.drop(node, "failed: {}".format(str(e)))
+
+        timestamp = self.clock()
+        if self.last_allocation is None or timestamp - self.last_allocation >= self.interval:
+            self.last_allocation = timestamp
+            try:
+                ceilings = self.allocate(timestamp)
+            except Exception as e:
+                print("Fleet allocation failed, the nodes keep their ceilings until the lease runs out: '{}'".format(
+                    str(e)))
+                ceilings = {}
+            for node, ceiling in ceilings.items():
+                node.ceiling = ceiling
+                self.send(node, FleetProtocol.encode_ceiling(ceiling, self.lease_seconds))
+
+    def accept(self):
+        try:
+            connection, _ = self.listener.accept()
+        except BlockingIOError:
+            return
+        connection.setblocking(False)
+        if connection.family != socket.AF_UNIX:
+            # ceilings are a few bytes and shouldn't wait for more
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.nodes[connection] = FleetNodeState(connection)
+        self.selector.register(connection, selectors.EVENT_READ)
+
+    def receive(self, node):
+        try:
+            data = node.connection.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.drop(node, str(e))
+            return
+        if not data:
+            self.drop(node, "disconnected")
+            return
+
+        try:
+            messages = node.protocol.feed(data)
+        except ValueError as e:
+            self.drop(node, str(e))
+            return
+
+        for message_type, value in messages:
+            if message_type == HELLO:
+                node.name = value
+                print("Fleet node {:s} connected".format(node.name))
+            elif message_type == REPORT and value:
+                node.samples = value
+                node.last_report = self.clock()
+
+    def send(self, node, data):
+        """
+        Queues data and writes as much of it as the socket takes without blocking.
+        :param node:
+        :param data:
+        :return:
+        """
+        node.pending += data
+        try:
+            sent = node.connection.send(node.pending) if node.pending else 0
+        except BlockingIOError:
+            sent = 0
+        except OSError as e:
+            self.drop(node, str(e))
+            return
+        node.pending = node.pending[sent:]
+
+        if len(node.pending) > MAX_PENDING_BYTES:
+            self.drop(node, "not reading its ceilings")
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if node.pending else 0)
+        self.selector.modify(node.connection, events)
+
+    def drop(self, node, reason):
+        print("Fleet node {:s} dropped: {:s}".format(node.name or "(unnamed)", reason))
+        self.selector.unregister(node.connection)
+        node.connection.close()
+        del self.nodes[node.connection]
+
+    def allocate(self, timestamp):
+        """
+        Splits the budget between the nodes that reported within the lease.
+        :param timestamp: seconds
+        :return: FleetNodeState -> max perf pct
+        """
+        nodes = [node for node in self.nodes.values()
+                 if node.name is not None and node.last_report is not None and
+                 timestamp - node.last_report <= self.lease_seconds]
+        if not nodes:
+            return {}
+        self.allocations += 1
+
+        known = [power for power in (node.get_full_power() for node in nodes) if power is not None and power > 0]
+        default_power = sum(known) / len(known) if known else DEFAULT_FULL_POWER_WATTS
+        full_power = {}
+        for node in nodes:
+            power = node.get_full_power()
+            full_power[node] = power if power is not None and power > 0 else default_power
+
+        def get_power(node, pct):
+            return full_power[node] * (pct / 100) ** POWER_EXPONENT
+
+        ceilings = {node: self.min_pct for node in nodes}
+        remaining = self.budget_watts - sum(get_power(node, self.min_pct) for node in nodes)
+
+        # busiest first, up to what their load needs, then up to what they can use in the same order
+        order = sorted(nodes, key=lambda node: node.get_utilisation(), reverse=True)
+        targets = {node: node.get_target(self.min_pct) for node in nodes}
+        for stage in range(2):
+            for node in order:
+                target = targets[node][stage]
+                if target <= ceilings[node] or remaining <= 0:
+                    continue
+                power = get_power(node, ceilings[node])
+                # the highest pct the rest of the budget pays for
+                affordable = 100 * ((power + remaining) / full_power[node]) ** (1 / POWER_EXPONENT)
+                pct = min(target, int(affordable))
+                if pct > ceilings[node]:
+                    remaining -= get_power(node, pct) - power
+                    ceilings[node] = pct
+        return ceilings
+
+    def get_status(self):
+        """
+        :return: node name -> (utilisation, max perf pct, package watts, ceiling) of the last report
+        """
+        status = {}
+        for node in self.nodes.values():
+            if node.name is not None and node.samples:
+                last = node.samples[-1]
+                status[node.name] = (node.get_utilisation(), last.max_perf_pct, last.power, node.ceiling)
+        return status
+
+    def close(self):
+        for node in list(self.nodes.values()):
+            node.connection.close()
+        self.nodes = {}
+        self.selector.close()
+        is_unix = self.listener.family == socket.AF_UNIX
+        self.listener.close()
+        if is_unix and os.path.exists(self.address):
+            os.unlink(self.address)
@@ -0,0 +1,227 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import errno
+import socket
+
+from fleet.FleetProtocol import CEILING, FleetProtocol, NodeSample
+from sensors.PowerMeter import PowerMeter
+from sensors.RaplDomain import RaplDomain
+from sensors.WorkloadMonitor import WorkloadMonitor
+
+# samples kept while the coordinator can't be reached, the oldest go first
+MAX_BATCH_SAMPLES = 256
+# seconds between connection attempts, doubled after every failure up to the highest
+RECONNECT_SECONDS = (1.0, 30.0)
+
+
+class FleetNode(object):
+    """
+    The link of a daemon to the fleet coordinator, one persistent connection shared by every mode.
+    Updated from the governor ticks on the engine thread and never blocks it: the socket is non-blocking,
+    samples are taken every sample_interval and sent in one report every report_interval.
+    The ceiling the coordinator hands out caps max perf pct until its lease runs out. Without a coordinator,
+    or once the lease is over, the governors are back to their own limits.
+    """
+
+    def __init__(self, address, name, sysfs, sample_interval=0.25, report_interval=1.0):
+        """
+        :param address: unix:PATH or HOST:PORT of the coordinator, a host name is resolved once here
+        :raises ValueError: the address is malformed or the host can't be resolved
+        :param name: node name the coordinator knows this daemon by
+        :param sysfs:
+        :param sample_interval: seconds between samples
+        :param report_interval: seconds between reports
+        """
+        self.family, self.address = FleetProtocol.parse_address(address)
+        if self.family != socket.AF_UNIX:
+            # connect() would look the name up again on every reconnect, blocking the engine thread
+            try:
+                self.family, _, _, _, self.address = socket.getaddrinfo(*self.address, type=socket.SOCK_STREAM)[0]
+            except socket.gaierror as e:
+                raise ValueError("Can't resolve the fleet coordinator {:s}: {:s}".format(address, str(e)))
+        self.name = name
+        self.sample_interval = sample_interval
+        self.report_interval = report_interval
+
+        self.workload = WorkloadMonitor(sysfs)
+        domains = [domain for domain in RaplDomain.discover(sysfs) if domain.is_package()]
+        self.power_meter = PowerMeter(domains) if domains else None
+
+        self.connection = None
+        self.connected = False
+        self.protocol = None
+        self.pending = b""
+        self.next_connect = None
+        self.reconnect_seconds = RECONNECT_SECONDS[0]
+
+        self.samples = []
+        self.last_sample = None
+        self.last_report = None
+
+        self.ceiling = None
+        self.ceiling_expires = None
+
+        self.reports = 0
+        self.connects = 0
+
+    def update(self, timestamp, temperature, max_perf_pct, throttled):
+        """
+        Samples, reports and picks up new ceilings, called on every governor tick.
+        :param timestamp: seconds
+        :param temperature: package temperature
+        :param max_perf_pct: as set by the governor
+        :param throttled: whether the governor holds max perf pct below its limit
+        :return:
+        """
+        if self.last_sample is None or timestamp - self.last_sample >= self.sample_interval:
+            self.last_sample = timestamp
+            self.take_sample(timestamp, temperature, max_perf_pct, throttled)
+
+        if self.connection is None:
+            if self.next_connect is None or timestamp >= self.next_connect:
+                self.connect(timestamp)
+            return
+        if not self.connected and not self.finish_connect(timestamp):
+            return
+
+        if self.last_report is None or timestamp - self.last_report >= self.report_interval:
+            self.last_report = timestamp
+            self.send(FleetProtocol.encode_report(self.samples), timestamp)
+            self.samples = []
+            self.reports += 1
+        elif self.pending:
+            self.send(b"", timestamp)
+
+        if self.connection is not None:
+            self.receive(timestamp)
+
+    def take_sample(self, timestamp, temperature, max_perf_pct, throttled):
+        utilisation, _ = self.workload.sample(timestamp)
+        power = float("nan")
+        if self.power_meter is not None:
+            power = self.power_meter.sample(timestamp).get("package", float("nan"))
+        self.samples.append(NodeSample(timestamp, temperature, power, utilisation, max_perf_pct, throttled))
+        del self.samples[:-MAX_BATCH_SAMPLES]
+
+    def get_ceiling(self, timestamp):
+        """
+        :param timestamp: seconds
+        :return: max perf pct the coordinator allows, None under local control
+        """
+        if self.ceiling is not None and timestamp >= self.ceiling_expires:
+            print("Fleet ceiling lease over, back to local control")
+            self.ceiling = None
+        return self.ceiling
+
+    def connect(self, timestamp):
+        self.connection = socket.socket(self.family, socket.SOCK_STREAM)
+        self.connection.setblocking(False)
+        error = self.connection.connect_ex(self.address)
+        if error not in (0, errno.EINPROGRESS, errno.EAGAIN):
+            self.disconnect(timestamp, "can't connect: {:s}".format(errno.errorcode.get(error, str(error))))
+            return
+        self.connected = False
+        self.finish_connect(timestamp)
+
+    def finish_connect(self, timestamp):
+        """
+        Completes a non-blocking connect once the socket is writable.
+        :param timestamp:
+        :return: True once connected
+        """
+        try:
+            self.connection.getpeername()
+        except OSError as e:
+            if e.errno != errno.ENOTCONN:
+                self.disconnect(timestamp, str(e))
+                return False
+            error = self.connection.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error:
+                self.disconnect(timestamp, "can't connect: {:s}".format(errno.errorcode.get(error, str(error))))
+            return False
+
+        if self.family != socket.AF_UNIX:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connected = True
+        self.connects += 1
+        self.protocol = FleetProtocol()
+        self.pending = FleetProtocol.encode_hello(self.name)
+        self.reconnect_seconds = RECONNECT_SECONDS[0]
+        self.last_report = None
+        print("Connected to the fleet coordinator as {:s}".format(self.name))
+        return True
+
+    def send(self, data, timestamp):
+        self.pending += data
+        try:
+            sent = self.connection.send(self.pending)
+        except BlockingIOError:
+            sent = 0
+        except OSError as e:
+            self.disconnect(timestamp, str(e))
+            return
+        self.pending = self.pending[sent:]
+
+    def receive(self, timestamp):
+        try:
+            data = self.connection.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.disconnect(timestamp, str(e))
+            return
+        if not data:
+            self.disconnect(timestamp, "closed by the coordinator")
+            return
+
+        try:
+            messages = self.protocol.feed(data)
+        except ValueError as e:
+            self.disconnect(timestamp, str(e))
+            return
+        for message_type, value in messages:
+            if message_type == CEILING:
+                max_perf_pct, lease_seconds = value
+                if max_perf_pct != self.ceiling:
+                    print("Fleet ceiling set to {:d}%".format(max_perf_pct))
+                self.ceiling = max_perf_pct
+                self.ceiling_expires = timestamp + lease_seconds
+
+    def disconnect(self, timestamp, reason):
+        """
+        Drops the connection and schedules the next attempt, the ceiling lasts until its lease is over.
+        :param timestamp:
+        :param reason:
+        :return:
+        """
+        if self.connected:
+            print("Lost the fleet coordinator: {:s}".format(reason))
+        self.connection.close()
+        self.connection = None
+        self.connected = False
+        self.pending = b""
+        self.next_connect = timestamp + self.reconnect_seconds
+        self.reconnect_seconds = min(self.reconnect_seconds * 2, RECONNECT_SECONDS[1])
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        self.workload.close()
+        if self.power_meter is not None:
+            self.power_meter.close()
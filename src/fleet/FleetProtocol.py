@@ -0,0 +1,151 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+import socket
+import struct
+from collections import namedtuple
+
+# magic, version, message type, payload length
+HEADER = struct.Struct("!2sBBI")
+MAGIC = b"LF"
+VERSION = 1
+# a report of a few hundred samples is a few kB, anything far bigger is not from a node
+MAX_PAYLOAD = 65536
+
+# node name, utf-8
+HELLO = 1
+# sample count, then the samples
+REPORT = 2
+# max perf pct, seconds it holds for unless renewed
+CEILING = 3
+
+COUNT = struct.Struct("!H")
+# timestamp, temperature, package watts (NaN without RAPL), utilisation 0..1, max perf pct, flags
+SAMPLE = struct.Struct("!dfffBB")
+CEILING_PAYLOAD = struct.Struct("!Bf")
+# the governor is holding max perf pct below its limit
+FLAG_THROTTLED = 0x01
+
+NodeSample = namedtuple("NodeSample", ("timestamp", "temperature", "power", "utilisation", "max_perf_pct",
+                                       "throttled"))
+
+
+class FleetProtocol(object):
+    """
+    Framing of the messages between the fleet nodes and the coordinator, length prefixed binary frames on
+    a persistent stream socket, TCP or Unix. Nodes send HELLO once per connection and then REPORTs with
+    every sample taken since the previous one, the coordinator answers with CEILINGs.
+    One instance per connection decodes the bytes received on it, frames may arrive in any number of pieces.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """
+        Decodes every complete frame received so far.
+        :param data: bytes read from the socket
+        :return: list of (message type, value): node name, list of NodeSample or (max perf pct, lease seconds)
+        :raises ValueError: not a fleet peer, or a malformed frame
+        """
+        self.buffer.extend(data)
+        messages = []
+        while len(self.buffer) >= HEADER.size:
+            magic, version, message_type, length = HEADER.unpack_from(self.buffer)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Not a version {:d} fleet frame".format(VERSION))
+            if length > MAX_PAYLOAD:
+                raise ValueError("Fleet frame of {:d} bytes is too big".format(length))
+            if len(self.buffer) < HEADER.size + length:
+                break
+
+            payload = bytes(self.buffer[HEADER.size:HEADER.size + length])
+            del self.buffer[:HEADER.size + length]
+            messages.append((message_type, self.decode(message_type, payload)))
+        return messages
+
+    @staticmethod
+    def decode(message_type, payload):
+        try:
+            if message_type == HELLO:
+                return payload.decode()
+            if message_type == REPORT:
+                count, = COUNT.unpack_from(payload)
+                if len(payload) != COUNT.size + count * SAMPLE.size:
+                    raise ValueError("Report of {:d} samples has {:d} bytes".format(count, len(payload)))
+                samples = []
+                for offset in range(COUNT.size, len(payload), SAMPLE.size):
+                    timestamp, temperature, power, utilisation, max_perf_pct, flags = \
+                        SAMPLE.unpack_from(payload, offset)
+                    if not 1 <= max_perf_pct <= 100 or not 0 <= utilisation <= 1:
+                        raise ValueError("Sample with max perf pct {:d} and utilisation {:f}".format(
+                            max_perf_pct, utilisation))
+                    if not math.isfinite(power) or power <= 0:
+                        # the allocation divides by it, a node without a sensible reading has no RAPL to it
+                        power = float("nan")
+                    samples.append(NodeSample(timestamp, temperature, power, utilisation, max_perf_pct,
+                                              bool(flags & FLAG_THROTTLED)))
+                return samples
+            if message_type == CEILING:
+                max_perf_pct, lease_seconds = CEILING_PAYLOAD.unpack(payload)
+                if not 1 <= max_perf_pct <= 100 or not 0 < lease_seconds < math.inf:
+                    raise ValueError("Ceiling of {:d}% for {:f} s".format(max_perf_pct, lease_seconds))
+                return max_perf_pct, lease_seconds
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError("Malformed fleet message {:d}: {:s}".format(message_type, str(e)))
+        raise ValueError("Unknown fleet message {:d}".format(message_type))
+
+    @staticmethod
+    def encode(message_type, payload):
+        return HEADER.pack(MAGIC, VERSION, message_type, len(payload)) + payload
+
+    @staticmethod
+    def encode_hello(name):
+        return FleetProtocol.encode(HELLO, name.encode())
+
+    @staticmethod
+    def encode_report(samples):
+        """
+        :param samples: list of NodeSample, sent as one frame
+        :return:
+        """
+        payload = [COUNT.pack(len(samples))]
+        for sample in samples:
+            payload.append(SAMPLE.pack(sample.timestamp, sample.temperature, sample.power, sample.utilisation,
+                                       int(sample.max_perf_pct), FLAG_THROTTLED if sample.throttled else 0))
+        return FleetProtocol.encode(REPORT, b"".join(payload))
+
+    @staticmethod
+    def encode_ceiling(max_perf_pct, lease_seconds):
+        return FleetProtocol.encode(CEILING, CEILING_PAYLOAD.pack(int(max_perf_pct), lease_seconds))
+
+    @staticmethod
+    def parse_address(address):
+        """
+        :param address: unix:PATH, or HOST:PORT for TCP
+        :return: socket family and address
+        :raises ValueError:
+        """
+        if address.startswith("unix:"):
+            return socket.AF_UNIX, address[len("unix:"):]
+
+        host, _, port = address.rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError("Fleet address must be unix:PATH or HOST:PORT, not '{:s}'".format(address))
+        family = socket.AF_INET6 if ":" in host.strip("[]") else socket.AF_INET
+        return family, (host.strip("[]"), int(port))
@@ -0,0 +1,132 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+import threading
+
+from metrics.Counter import Counter
+from metrics.Gauge import Gauge
+from metrics.Histogram import Histogram
+
+PREFIX = "linux_cpu_manager_"
+
+# a mode switch builds a governor, opening its attributes and reading its sensors
+MODE_SWITCH_BUCKETS = (1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 0.1, 1.0)
+
+
+class GovernorMetrics(object):
+    """
+    Instrumentation of the governor hot path, shared by every governor the engine runs.
+    Updated by the engine thread, read by D-Bus and the metrics socket.
+    """
+
+    def __init__(self):
+        # keeps readers from seeing half of a tick
+        self.lock = threading.Lock()
+
+        self.tick_seconds = Histogram(PREFIX + "tick_seconds", "Time spent in each phase of a governor tick",
+                                      "phase")
+        self.throttle_events = Counter(PREFIX + "throttle_events_total", "Times a governor lowered a perf limit")
+        self.sysfs_writes = Counter(PREFIX + "sysfs_writes_total", "Sysfs writes issued by governors")
+        self.energy_shifts = Counter(PREFIX + "energy_shifts_total",
+                                     "Times a governor moved to a more efficient EPP instead of lowering a perf limit")
+        self.fan_holds = Counter(PREFIX + "fan_holds_total",
+                                 "Ticks a governor held its perf limit while the fans ramped up")
+        self.thread_migrations = Counter(PREFIX + "thread_migrations_total",
+                                         "Threads moved off hot cores by the thermal placement")
+        self.mode_switches = Counter(PREFIX + "mode_switches_total", "Governor switches")
+        self.mode_switch_seconds = Histogram(PREFIX + "mode_switch_seconds",
+                                             "Time to build and activate the governor of a mode", "mode",
+                                             MODE_SWITCH_BUCKETS)
+        self.startup_seconds = Gauge(PREFIX + "startup_seconds", "Time from service process start to first governor")
+        self.temperature = Gauge(PREFIX + "temperature_celsius", "Temperature the active governor acts on")
+        self.max_perf_pct = Gauge(PREFIX + "max_perf_pct", "Max perf pct set by the active governor")
+        self.fan_duty = Gauge(PREFIX + "fan_duty_pct", "Fan duty set by the fan curve, NaN under firmware control")
+        self.memory_bandwidth = Gauge(PREFIX + "memory_bandwidth_bytes",
+                                      "Memory controller traffic per second seen by the dynamic uncore policy")
+        self.fleet_ceiling = Gauge(PREFIX + "fleet_ceiling_pct",
+                                   "Max perf pct ceiling from the fleet coordinator, NaN under local control")
+        self.package_power = Gauge(PREFIX + "package_power_watts", "Rolling RAPL package power, all packages")
+        self.core_power = Gauge(PREFIX + "core_power_watts", "Rolling RAPL core power, all packages")
+        self.package_energy = Counter(PREFIX + "package_energy_joules_total", "RAPL package energy used")
+
+        self.metrics = (self.tick_seconds, self.throttle_events, self.sysfs_writes, self.energy_shifts,
+                        self.fan_holds, self.thread_migrations, self.mode_switches, self.mode_switch_seconds, self.startup_seconds,
+                        self.temperature, self.max_perf_pct, self.fan_duty, self.memory_bandwidth,
+                        self.fleet_ceiling, self.package_power, self.core_power, self.package_energy)
+
+    def observe_tick(self, started, read_done, decided, written):
+        """
+        Records the phases of one tick from perf_counter timestamps.
+        :param started:
+        :param read_done: sensors read
+        :param decided: controller done
+        :param written: sysfs writes done
+        :return:
+        """
+        with self.lock:
+            self.tick_seconds.observe("read", read_done - started)
+            self.tick_seconds.observe("decide", decided - read_done)
+            self.tick_seconds.observe("write", written - decided)
+            self.tick_seconds.observe("total", written - started)
+
+    def observe_mode_switch(self, mode, seconds):
+        with self.lock:
+            self.mode_switch_seconds.observe(mode, seconds)
+
+    def get_samples(self):
+        """
+        :return: list of (sample name, labels, value)
+        """
+        with self.lock:
+            samples = []
+            for metric in self.metrics:
+                samples.extend(metric.get_samples())
+            return samples
+
+    def get_values(self):
+        """
+        Flat name -> value mapping, labels are kept in Prometheus notation in the name.
+        :return:
+        """
+        values = {}
+        for name, labels, value in self.get_samples():
+            values[name + ("{" + labels + "}" if labels else "")] = float(value)
+        return values
+
+    def format_prometheus(self):
+        """
+        Renders every metric in the Prometheus text exposition format.
+        :return:
+        """
+        with self.lock:
+            lines = []
+            for metric in self.metrics:
+                kind = type(metric).__name__.lower()
+                lines.append("# HELP {:s} {:s}".format(metric.name, metric.help_text))
+                lines.append("# TYPE {:s} {:s}".format(metric.name, kind))
+                for name, labels, value in metric.get_samples():
+                    if labels:
+                        name += "{" + labels + "}"
+                    lines.append("{:s} {:s}".format(name, format_value(value)))
+            return "\n".join(lines) + "\n"
+
+
+def format_value(value):
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    return repr(value) if isinstance(value, float) else str(value)
@@ -0,0 +1,65 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import bisect
+
+# tick phases take microseconds when all is well and milliseconds when sysfs is slow
+DEFAULT_BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 1e-2, 0.1)
+
+
+class Histogram(object):
+    """
+    Fixed bucket histogram of durations in seconds, one series per label value.
+    Observing is a bisect and a few increments, cheap enough for every tick.
+    """
+
+    def __init__(self, name, help_text, label_name, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_name = label_name
+        self.buckets = buckets
+
+        # label value -> [bucket counts..., +Inf count], sum
+        self.counts = {}
+        self.sums = {}
+
+    def observe(self, label_value, value):
+        counts = self.counts.get(label_value)
+        if counts is None:
+            counts = self.counts[label_value] = [0] * (len(self.buckets) + 1)
+            self.sums[label_value] = 0.0
+
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[label_value] += value
+
+    def get_samples(self):
+        """
+        Buckets are cumulative, as Prometheus expects them.
+        :return: list of (sample name, labels, value)
+        """
+        samples = []
+        for label_value, counts in self.counts.items():
+            label = '{:s}="{:s}"'.format(self.label_name, label_value)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append((self.name + "_bucket", '{:s},le="{:g}"'.format(label, bound), cumulative))
+            cumulative += counts[-1]
+            samples.append((self.name + "_bucket", '{:s},le="+Inf"'.format(label), cumulative))
+            samples.append((self.name + "_sum", label, self.sums[label_value]))
+            samples.append((self.name + "_count", label, cumulative))
+        return samples
@@ -0,0 +1,83 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import socket
+
+
+class MetricsSocket(object):
+    """
+    Local Unix socket serving the metrics in the Prometheus text format.
+    Answers plain HTTP GET requests (curl --unix-socket) as well as bare connections (socat, nc -U).
+    Connections are handled one at a time from the service main loop.
+    """
+
+    # how long a client gets to send its request before the metrics are sent without waiting for it
+    REQUEST_TIMEOUT = 0.1
+
+    def __init__(self, path, metrics):
+        self.path = path
+        self.metrics = metrics
+
+        if os.path.exists(path):
+            os.unlink(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.bind(path)
+        # read-only data, any local user may scrape it
+        os.chmod(path, 0o666)
+        self.socket.listen(4)
+        self.socket.setblocking(False)
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def handle_connection(self):
+        """
+        Accepts one pending connection and writes the metrics to it.
+        :return:
+        """
+        try:
+            connection, _ = self.socket.accept()
+        except BlockingIOError:
+            return
+
+        with connection:
+            connection.settimeout(self.REQUEST_TIMEOUT)
+            try:
+                request = connection.recv(4096)
+            except socket.timeout:
+                request = b""
+
+            body = self.metrics.format_prometheus().encode()
+            if request.startswith(b"GET "):
+                header = ("HTTP/1.0 200 OK\r\n"
+                          "Content-Type: text/plain; version=0.0.4\r\n"
+                          "Content-Length: {:d}\r\n\r\n").format(len(body)).encode()
+                body = header + body
+
+            try:
+                connection.sendall(body)
+            except OSError:
+                # the client went away, nothing to do about it
+                pass
+
+    def close(self):
+        self.socket.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
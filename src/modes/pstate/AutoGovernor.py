@@ -0,0 +1,162 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from modes.pstate.PstateGovernor import PstateGovernor
+from sensors.WorkloadMonitor import WorkloadMonitor
+
+# from the least to the most performance
+PROFILES = ("powersave", "stock", "performance")
+
+
+class AutoPstateGovernor(PstateGovernor):
+    """
+    Switches between the powersave, stock and performance limits by how busy the CPU is.
+    Moves up as soon as a sample calls for it and only moves down after the load has stayed low for a while,
+    so bursty load gets performance within one sampling interval without flapping in between bursts.
+    Throttling is enabled at default package temperature, within the limits of the current profile.
+    """
+
+    def __init__(self, driver, sensor_index, sysfs):
+        super().__init__(driver, sensor_index, sysfs)
+
+        self.governor_name = "AUTO_GOVERNOR"
+        self.governor_poll_period_in_seconds = 0.25
+
+        # profile -> min pct, max pct, no turbo, performance bias, energy profile, uncore profile,
+        # same limits as the governors of the same name
+        self.profiles = {
+            "powersave": (driver.min_perf_pct,
+                          self.calculate_powersave_max_pct(),
+                          1, "powersave", "balance_power", "balance_power"),
+            "stock": (driver.min_perf_pct,
+                      self.calculate_noturbo_max_pct(),
+                      1, "powersave", "balance_performance", "balance_performance"),
+            "performance": (driver.min_perf_pct, driver.max_perf_pct, 0, "performance", "performance",
+                            "performance"),
+        }
+
+        # utilisation needed to move up to a profile and to stay in it, the gap is the hysteresis
+        self.enter_utilisation = {"stock": 0.25, "performance": 0.6}
+        self.stay_utilisation = {"stock": 0.15, "performance": 0.4}
+        # share of time tasks wait for a cpu that calls for performance whatever the utilisation
+        self.performance_pressure = 0.1
+        # consecutive samples calling for a lower profile before moving down
+        self.step_down_samples = 10
+
+        self.sampling_interval = 0.5
+        self.last_sample_timestamp = None
+        self.low_samples = 0
+
+        self.workload = WorkloadMonitor(sysfs)
+
+        self.profile = None
+        self.apply_profile("stock")
+
+    def exit(self):
+        self.workload.close()
+        super().exit()
+
+    def get_status(self):
+        status = super().get_status()
+        status["profile"] = self.profile
+        status["utilisation"] = self.workload.utilisation
+        status["pressure"] = self.workload.pressure_fraction
+        return status
+
+    def read_current_temps(self):
+        """
+        Reads the package temperature and, once per sampling interval, the workload.
+        :return:
+        """
+        super().read_current_temps()
+
+        timestamp = self.clock()
+        if self.last_sample_timestamp is not None and \
+                timestamp - self.last_sample_timestamp < self.sampling_interval * 0.9:
+            return
+        self.last_sample_timestamp = timestamp
+
+        utilisation, pressure = self.workload.sample(timestamp)
+        self.update_profile(self.choose_profile(utilisation, pressure))
+
+    def get_poll_period(self):
+        # the adaptive period backs off to seconds when cool, load spikes still have to be seen in time
+        return min(super().get_poll_period(), self.sampling_interval)
+
+    def choose_profile(self, utilisation, pressure):
+        """
+        Picks the profile the workload calls for, the current one is kept at a lower utilisation than entering it takes.
+        :param utilisation:
+        :param pressure:
+        :return:
+        """
+        current_rank = PROFILES.index(self.profile)
+        if pressure >= self.performance_pressure:
+            return "performance"
+
+        for rank in range(len(PROFILES) - 1, 0, -1):
+            profile = PROFILES[rank]
+            threshold = self.stay_utilisation[profile] if rank <= current_rank else self.enter_utilisation[profile]
+            if utilisation >= threshold:
+                return profile
+
+        return PROFILES[0]
+
+    def update_profile(self, profile):
+        """
+        Moves up right away, moves down after step_down_samples samples in a row asked for less.
+        :param profile:
+        :return:
+        """
+        rank = PROFILES.index(profile)
+        current_rank = PROFILES.index(self.profile)
+
+        if rank > current_rank:
+            self.low_samples = 0
+        elif rank < current_rank:
+            self.low_samples += 1
+            if self.low_samples < self.step_down_samples:
+                return
+            self.low_samples = 0
+        else:
+            self.low_samples = 0
+            return
+
+        print("Auto mode switching from {:s} to {:s}".format(self.profile, profile))
+        self.apply_profile(profile)
+        self.set_performance_bias(self.performance_bias)
+        self.set_energy_profile(self.energy_profile)
+        self.set_uncore_profile(self.uncore_profile)
+
+    def apply_profile(self, profile):
+        """
+        Sets the limits of the profile, the pstate attributes get written on the same tick.
+        :param profile:
+        :return:
+        """
+        moving_up = self.profile is None or PROFILES.index(profile) > PROFILES.index(self.profile)
+        self.profile = profile
+        (self.min_pct_limit, self.max_pct_limit, self.no_turbo, self.performance_bias,
+         self.energy_profile, self.uncore_profile) = self.profiles[profile]
+
+        self.current_min_pct = self.min_pct_limit
+        if moving_up:
+            # straight to the new ceiling, the controller pulls it back down if the package is hot
+            self.current_max_pct = self.max_pct_limit
+        else:
+            self.current_max_pct = min(self.current_max_pct, self.max_pct_limit)
+        self.apply_settings_limits()
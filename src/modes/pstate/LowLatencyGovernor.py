@@ -0,0 +1,60 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from modes.pstate.PstateGovernor import PstateGovernor
+
+# PM QoS latency the mode holds: C1 and C1E are fine, package C-states and core C6 take 100 us and more to leave
+DEFAULT_WAKEUP_LATENCY_US = 20
+
+
+class LowLatencyPstateGovernor(PstateGovernor):
+    """
+    Runs the CPU at the stock speeds with turbo range enabled, for hosts serving requests where waking up
+    from deep idle states and ramping the clock back up dominate the tail latency.
+    Min pct is pinned at the highest non turbo pct and a PM QoS latency request is held for as long as
+    the mode is active. Throttling is enabled at default package temperature and lowers the pinned min
+    along with the max, heat still wins over latency.
+    """
+
+    def __init__(self, driver, sensor_index, sysfs):
+        super().__init__(driver, sensor_index, sysfs)
+
+        self.governor_name = "LOW_LATENCY_GOVERNOR"
+        self.governor_poll_period_in_seconds = 0.25
+
+        self.min_pct_limit = driver.min_perf_pct
+        self.max_pct_limit = driver.max_perf_pct
+
+        self.no_turbo = 0
+
+        # min pct while the package is within its limit
+        self.pinned_min_pct = self.calculate_noturbo_max_pct()
+
+        self.current_min_pct = self.pinned_min_pct
+        self.current_max_pct = driver.max_perf_pct
+
+        self.performance_bias = "performance"
+        self.energy_profile = "performance"
+        self.uncore_profile = "performance"
+        self.wakeup_latency_us = DEFAULT_WAKEUP_LATENCY_US
+
+    def get_action(self):
+        settings = super().get_action()
+        # the min follows a throttled max down, a min above it would keep the clocks up
+        self.current_min_pct = max(self.min_pct_limit, min(self.pinned_min_pct, self.current_max_pct))
+        settings["min_perf_pct"] = self.current_min_pct
+        return settings
@@ -0,0 +1,179 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+
+from modes.pstate.PstateGovernor import PstateGovernor
+from sensors.CoreTemperatureSensors import CoreTemperatureSensor, CoreTemperatureSensors
+from topology.CpuTopology import CpuTopology
+
+
+class PerCorePstateGovernor(PstateGovernor):
+    """
+    Runs the CPU at the stock speeds with turbo range enabled.
+    Throttling is done per core and per package through cpufreq scaling_max_freq,
+    so one hot core only slows down itself instead of every core in the machine.
+    Cpus sharing a cpufreq policy are written once, at the limit of the hottest of them.
+    """
+
+    def __init__(self, driver, sensor_index, sysfs):
+        super().__init__(driver, sensor_index, sysfs)
+
+        self.governor_name = "PER_CORE_GOVERNOR"
+        self.governor_poll_period_in_seconds = 0.25
+
+        self.min_pct_limit = driver.min_perf_pct
+        self.max_pct_limit = driver.max_perf_pct
+
+        self.no_turbo = 0
+
+        self.current_min_pct = driver.min_perf_pct
+        self.current_max_pct = driver.max_perf_pct
+
+        self.topology = CpuTopology(sysfs)
+        self.sensors = CoreTemperatureSensors(sensor_index)
+        if not self.sensors.package_sensors and not self.sensors.core_sensors:
+            # no coretemp (k10temp, zenpower), the package sensor becomes the one zone of every socket
+            for package_id in sorted(set(package_id for package_id, core_id in self.topology.cpus.values())):
+                self.sensors.package_sensors[package_id] = CoreTemperatureSensor(sysfs, self.package_sensor,
+                                                                                 package_id)
+
+        # throttle zone -> current max pct, a zone is either a core or a whole package
+        self.zone_max_pct = {}
+        # throttle zone -> its own copy of the configured controller, the stateful ones track each zone apart
+        self.zone_controllers = {}
+
+        # keyed by the first cpu of each policy
+        self.scaling_max_freq = {}
+        # only without separate global limits, otherwise the global min_perf_pct holds the floor
+        self.scaling_min_freq = {}
+        self.cpuinfo_min_freq = {}
+        self.cpuinfo_max_freq = {}
+        for cpu in self.topology.policies:
+            cpufreq_path = self.topology.get_cpufreq_path(cpu)
+            self.scaling_max_freq[cpu] = sysfs.cached_attribute(cpufreq_path + "scaling_max_freq")
+            if not driver.separate_global_limits:
+                self.scaling_min_freq[cpu] = sysfs.cached_attribute(cpufreq_path + "scaling_min_freq")
+            self.cpuinfo_min_freq[cpu] = sysfs.read_int(cpufreq_path + "cpuinfo_min_freq")
+            self.cpuinfo_max_freq[cpu] = sysfs.read_int(cpufreq_path + "cpuinfo_max_freq")
+
+        self.performance_bias = "performance"
+        self.energy_profile = "performance"
+        self.uncore_profile = "performance"
+
+    def exit(self):
+        # give the cores back their full range, other modes only manage the global limits
+        self.driver.writer.write_all([(attribute, self.cpuinfo_max_freq[cpu])
+                                      for cpu, attribute in self.scaling_max_freq.items()])
+        for attribute in list(self.scaling_max_freq.values()) + list(self.scaling_min_freq.values()):
+            attribute.close()
+
+        self.sensors.close()
+        super().exit()
+
+    def read_current_temps(self):
+        """
+        Reads every core and package sensor on every socket.
+        The hottest one drives the poll period.
+        :return:
+        """
+        self.current_temperature = self.sensors.read_all()
+
+    def get_action(self):
+        # global limits stay wide open, throttling happens per cpu
+        settings = {
+            "min_perf_pct": self.current_min_pct,
+            "max_perf_pct": self.max_pct_limit,
+            "no_turbo": self.no_turbo,
+            "scaling_max_freq": self.get_per_cpu_action(),
+        }
+        if not self.driver.separate_global_limits:
+            # the driver's global limits are the per cpu attributes, writing both would undo the throttling,
+            # the floor goes out per policy in apply_per_cpu_action() instead
+            del settings["min_perf_pct"]
+            del settings["max_perf_pct"]
+        return settings
+
+    def apply_action(self, settings):
+        settings = dict(settings)
+        self.apply_per_cpu_action(settings.pop("scaling_max_freq"))
+        super().apply_action(settings)
+
+    def get_zone_max_pct(self, zone, sensor):
+        """
+        Same controller as the package wide governors, applied to a single zone.
+        :param zone:
+        :param sensor:
+        :return:
+        """
+        max_temp = sensor.max_temp if sensor.max_temp is not None else self.package_max_temp
+
+        controller = self.zone_controllers.get(zone)
+        if controller is None:
+            controller = self.zone_controllers[zone] = copy.deepcopy(self.controller)
+
+        pct = controller.get_max_pct(self.zone_max_pct.get(zone, self.max_pct_limit), sensor.current_temperature,
+                                     max_temp, self.min_pct_limit, self.max_pct_limit, self.clock())
+
+        self.zone_max_pct[zone] = pct
+        return pct
+
+    def get_per_cpu_action(self):
+        """
+        Calculates the scaling_max_freq of every policy, the lowest core or package limit of its cpus.
+        :return: first cpu of the policy -> frequency in kHz
+        """
+        package_pct = {}
+        for package_id, sensor in self.sensors.package_sensors.items():
+            package_pct[package_id] = self.get_zone_max_pct(("package", package_id), sensor)
+
+        core_pct = {}
+        for (package_id, core_id), sensor in self.sensors.core_sensors.items():
+            core_pct[(package_id, core_id)] = self.get_zone_max_pct(("core", package_id, core_id), sensor)
+
+        settings = {}
+        # reported as the governor's max pct, the global limit itself stays at max_pct_limit
+        self.current_max_pct = self.max_pct_limit
+        # the fleet ceiling caps every cpu without winding the zones down, they come back as soon as it lifts
+        max_pct_limit = self.get_max_pct_limit()
+        if self.current_temperature >= self.package_critical_temp:
+            max_pct_limit = self.min_pct_limit
+        for policy_cpu, cpus in self.topology.policies.items():
+            pct = max_pct_limit
+            for cpu in cpus:
+                package_id, core_id = self.topology.cpus[cpu]
+                pct = min(pct, package_pct.get(package_id, self.max_pct_limit),
+                          core_pct.get((package_id, core_id), self.max_pct_limit))
+            self.current_max_pct = min(self.current_max_pct, pct)
+            frequency = int(self.cpuinfo_max_freq[policy_cpu] * pct / 100)
+            settings[policy_cpu] = max(self.cpuinfo_min_freq[policy_cpu], frequency)
+
+        return settings
+
+    def get_write_counters(self):
+        counters = super().get_write_counters()
+        for attribute in list(self.scaling_max_freq.values()) + list(self.scaling_min_freq.values()):
+            counters["issued"] += attribute.writes_issued
+            counters["elided"] += attribute.writes_elided
+            counters["external"] += attribute.external_changes
+        return counters
+
+    def apply_per_cpu_action(self, settings):
+        # a min pinned by the previous mode (lowlatency) would hold the cores above their throttled max,
+        # the floor is below every max so it can go out first
+        self.write_limits([(attribute, self.cpuinfo_min_freq[cpu]) for cpu, attribute in self.scaling_min_freq.items()])
+        self.write_limits([(self.scaling_max_freq[cpu], frequency) for cpu, frequency in settings.items()], True)
@@ -0,0 +1,48 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from controllers.PidController import PidController
+from controllers.ThermalModel import ThermalModel
+from modes.pstate.PstateGovernor import PstateGovernor
+
+
+class PidPstateGovernor(PstateGovernor):
+    """
+    Runs the CPU at the stock speeds with turbo range enabled.
+    Instead of stepping max pct up and down, a PID controller with a learned thermal model holds the package
+    just below its temperature limit at the highest pct that can be sustained.
+    """
+
+    def __init__(self, driver, sensor_index, sysfs):
+        super().__init__(driver, sensor_index, sysfs)
+
+        self.governor_name = "PID_GOVERNOR"
+        self.governor_poll_period_in_seconds = 0.25
+
+        self.min_pct_limit = driver.min_perf_pct
+        self.max_pct_limit = driver.max_perf_pct
+
+        self.no_turbo = 0
+
+        self.current_min_pct = driver.min_perf_pct
+        self.current_max_pct = driver.max_perf_pct
+
+        self.controller = PidController(model=ThermalModel())
+
+        self.performance_bias = "performance"
+        self.energy_profile = "performance"
+        self.uncore_profile = "performance"
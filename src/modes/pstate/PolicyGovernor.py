@@ -0,0 +1,175 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from cgroups.CgroupPolicy import CgroupPolicy, LATENCY_CLASS
+from cgroups.CgroupWatcher import CgroupWatcher
+from modes.pstate.PstateGovernor import PstateGovernor
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+POLICY_PATH = "/etc/linux-cpu-manager/cgroup-policy"
+
+
+class PolicyPstateGovernor(PstateGovernor):
+    """
+    Runs the CPU at the powersave limits unless a latency-critical cgroup is using the CPU,
+    then min_perf_pct is raised to the nonturbo max and turbo is enabled.
+    Cgroups come from an inotify watch on the cgroup v2 hierarchy, activity from their cpu.stat,
+    so a tick reads one attribute per latency-critical cgroup however many processes there are.
+    Throttling is enabled at default package temperature.
+    """
+
+    def __init__(self, driver, sensor_index, sysfs, policy=None):
+        super().__init__(driver, sensor_index, sysfs)
+
+        self.governor_name = "POLICY_GOVERNOR"
+        self.governor_poll_period_in_seconds = 0.25
+
+        if policy is None:
+            policy = CgroupPolicy.load(POLICY_PATH) if os.path.exists(POLICY_PATH) else CgroupPolicy()
+        self.policy = policy
+
+        # performance class -> min pct, max pct, no turbo, performance bias, energy profile, uncore profile
+        self.profiles = {
+            "powersave": (driver.min_perf_pct,
+                          self.calculate_powersave_max_pct(),
+                          1, "powersave", "balance_power", "balance_power"),
+            LATENCY_CLASS: (self.calculate_noturbo_max_pct(),
+                            driver.max_perf_pct, 0, "performance", "performance", "performance"),
+        }
+        self.profile = None
+
+        # latency limits are held this long after the last activity, short idle gaps don't drop them
+        self.linger_seconds = 2.0
+        self.last_active_timestamp = None
+
+        if not hasattr(sysfs, "get_path"):
+            raise RuntimeError("The policy governor needs a sysfs backend backed by a directory tree")
+        self.watcher = CgroupWatcher(sysfs.get_path(CGROUP_ROOT))
+        # cgroups appearing wake the governor up
+        self.scheduler.watch_wakeup_fd(self.watcher.fileno())
+
+        # latency-critical cgroup -> cpu.stat attribute, usage_usec at the last tick
+        self.latency_cgroups = {}
+        self.refresh_latency_cgroups()
+
+        self.apply_profile("powersave")
+
+    def exit(self):
+        for attribute, _ in self.latency_cgroups.values():
+            attribute.close()
+        self.watcher.close()
+        super().exit()
+
+    def get_status(self):
+        status = super().get_status()
+        status["profile"] = self.profile
+        status["latency_cgroups"] = len(self.latency_cgroups)
+        return status
+
+    def get_poll_period(self):
+        # latency-critical work has to be noticed in time however cool the package is
+        return min(super().get_poll_period(), self.governor_poll_period_in_seconds)
+
+    def read_current_temps(self):
+        """
+        Reads the package temperature and whether any latency-critical cgroup used the CPU since the last tick.
+        :return:
+        """
+        super().read_current_temps()
+
+        if self.watcher.read_events():
+            self.refresh_latency_cgroups()
+
+        timestamp = self.clock()
+        if self.read_latency_activity():
+            self.last_active_timestamp = timestamp
+
+        if self.last_active_timestamp is not None and timestamp - self.last_active_timestamp < self.linger_seconds:
+            self.apply_profile(LATENCY_CLASS)
+        else:
+            self.apply_profile("powersave")
+
+    def get_action(self):
+        settings = super().get_action()
+        # throttling may take max below the raised min, intel_pstate needs min <= max
+        settings["min_perf_pct"] = min(settings["min_perf_pct"], settings["max_perf_pct"])
+        return settings
+
+    def refresh_latency_cgroups(self):
+        """
+        Opens cpu.stat of the latency-critical cgroups that appeared and closes the ones that went away.
+        :return:
+        """
+        wanted = {cgroup for cgroup in self.watcher.cgroups if self.policy.classify(cgroup) == LATENCY_CLASS}
+
+        for cgroup in set(self.latency_cgroups) - wanted:
+            self.latency_cgroups.pop(cgroup)[0].close()
+
+        for cgroup in wanted - set(self.latency_cgroups):
+            try:
+                attribute = self.sysfs.attribute(os.path.join(CGROUP_ROOT, cgroup, "cpu.stat"))
+                self.latency_cgroups[cgroup] = [attribute, self.read_usage(attribute)]
+            except FileNotFoundError:
+                # removed again before we got to it
+                pass
+
+    def read_latency_activity(self):
+        """
+        :return: True if any latency-critical cgroup used cpu time since the last tick
+        """
+        active = False
+        for cgroup, entry in list(self.latency_cgroups.items()):
+            try:
+                usage = self.read_usage(entry[0])
+            except FileNotFoundError:
+                # the removal event is on its way
+                continue
+            if usage > entry[1]:
+                active = True
+            entry[1] = usage
+        return active
+
+    def read_usage(self, attribute):
+        # first line of cpu.stat is "usage_usec N"
+        line = bytes(attribute.read_bytes()).split(b"\n", 1)[0]
+        return int(line.split()[1])
+
+    def apply_profile(self, profile):
+        if profile == self.profile:
+            return
+
+        switching = self.profile is not None
+        if switching:
+            print("Policy mode switching from {:s} to {:s}".format(self.profile, profile))
+        self.profile = profile
+        (self.min_pct_limit, self.max_pct_limit, self.no_turbo, self.performance_bias,
+         self.energy_profile, self.uncore_profile) = self.profiles[profile]
+
+        self.current_min_pct = self.min_pct_limit
+        if profile == LATENCY_CLASS:
+            # straight to the new ceiling, the controller pulls it back down if the package is hot
+            self.current_max_pct = self.max_pct_limit
+        else:
+            self.current_max_pct = min(self.current_max_pct, self.max_pct_limit)
+        self.apply_settings_limits()
+
+        if switching:
+            self.set_performance_bias(self.performance_bias)
+            self.set_energy_profile(self.energy_profile)
+            self.set_uncore_profile(self.uncore_profile)
@@ -0,0 +1,141 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from controllers.PidController import PidController
+from modes.pstate.PstateGovernor import PstateGovernor
+from sensors.PowerMeter import PowerMeter
+from sensors.RaplDomain import RaplDomain
+
+
+class PowerCapPstateGovernor(PstateGovernor):
+    """
+    Runs the CPU at the stock speeds with turbo range enabled, within a package power budget.
+    Package power comes from the RAPL energy counters, a PID controller finds the highest max pct that stays
+    within the budget. Throttling is enabled at default package temperature, the lower of the two limits wins.
+    Budgets below the RAPL long term limit are also written to the hardware as a backstop, restored on exit.
+    """
+
+    def __init__(self, driver, sensor_index, sysfs,
+                 power_budget_watts=None):
+        super().__init__(driver, sensor_index, sysfs)
+
+        self.governor_name = "POWER_CAP_GOVERNOR"
+        self.governor_poll_period_in_seconds = 0.25
+
+        self.min_pct_limit = driver.min_perf_pct
+        self.max_pct_limit = driver.max_perf_pct
+
+        self.no_turbo = 0
+
+        self.current_min_pct = driver.min_perf_pct
+        self.current_max_pct = driver.max_perf_pct
+
+        self.performance_bias = "performance"
+        self.energy_profile = "performance"
+        self.uncore_profile = "balance_performance"
+
+        domains = RaplDomain.discover(sysfs)
+        self.packages = [domain for domain in domains if domain.is_package()]
+        if not self.packages:
+            raise RuntimeError("No RAPL package power domain found")
+
+        # the long term limits the firmware had when the service started, not what a previous mode left
+        self.hardware_limits = {domain.path: driver.power_limit.get_saved_watts(domain.path)
+                                for domain in self.packages}
+
+        if power_budget_watts is None:
+            limits = list(self.hardware_limits.values())
+            if None in limits:
+                raise RuntimeError("No power budget given and no RAPL long term limit to default to")
+            power_budget_watts = sum(limits)
+        self.power_budget_watts = power_budget_watts
+
+        # package watts instead of degrees, the margin keeps the average just under the budget
+        self.power_controller = PidController(kp=0.5, ki=1.0, target_margin=0.5)
+
+        self.power_meter = PowerMeter(domains)
+        # power follows the load much faster than the temperature, don't back off as far as the thermal loop
+        self.power_poll_period = 1.0
+        self.package_power = 0.0
+
+        self.active = False
+
+    def enter(self):
+        super().enter()
+        self.active = True
+        self.apply_hardware_limits()
+
+    def exit(self):
+        self.active = False
+        self.driver.power_limit.restore()
+        self.power_meter.close()
+        super().exit()
+
+    def get_status(self):
+        status = super().get_status()
+        status["power_budget_watts"] = self.power_budget_watts
+        status["package_power_watts"] = self.package_power
+        status["package_energy_joules"] = self.power_meter.energy_joules.get("package", 0.0)
+        return status
+
+    def set_power_budget(self, power_budget_watts):
+        """
+        Changes the budget of the running governor.
+        :param power_budget_watts:
+        :return:
+        """
+        self.power_budget_watts = power_budget_watts
+        if self.active:
+            self.apply_hardware_limits()
+
+    def apply_hardware_limits(self):
+        """
+        Writes each package its share of the budget as its long term limit, if that is below what it had.
+        :return:
+        """
+        share = self.power_budget_watts / len(self.packages)
+        for domain in self.packages:
+            # clamped to the saved limit by the driver
+            self.driver.power_limit.apply(domain.path, share)
+
+    def get_poll_period(self):
+        return min(super().get_poll_period(), self.power_poll_period)
+
+    def read_current_temps(self):
+        """
+        Reads the package temperature and the package power.
+        :return:
+        """
+        super().read_current_temps()
+
+        power = self.power_meter.sample(self.clock())
+        self.package_power = power.get("package", 0.0)
+
+        self.metrics.package_power.set(self.package_power)
+        if "core" in power:
+            self.metrics.core_power.set(power["core"])
+        self.metrics.package_energy.inc(self.power_meter.interval_joules.get("package", 0.0))
+
+    def get_action(self):
+        power_max_pct = self.power_controller.get_max_pct(self.current_max_pct, self.package_power,
+                                                          self.power_budget_watts, self.min_pct_limit,
+                                                          self.max_pct_limit, self.clock())
+        settings = super().get_action()
+
+        self.current_max_pct = min(self.current_max_pct, power_max_pct)
+        settings["max_perf_pct"] = self.current_max_pct
+        return settings
@@ -15,8 +15,6 @@
 # You should have received a copy of the GNU General Public License
 # along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
 
-import time
-
 from modes.pstate.PstateGovernor import PstateGovernor
 
 
@@ -26,35 +24,25 @@ class PowersaveLockedPstateGovernor(PstateGovernor):
     Throttling is enabled at default package temperature.
     """
 
-    def __init__(self, min_perf_pct, max_perf_pct, num_pstates, turbo_pct):
-        super().__init__(min_perf_pct, max_perf_pct, num_pstates, turbo_pct)
+    def __init__(self, driver, sensor_index, sysfs):
+        super().__init__(driver, sensor_index, sysfs)
 
         self.governor_name = "POWERSAVE_LOCKED_GOVERNOR"
 
-        self.min_pct_limit = min_perf_pct
-        self.max_pct_limit = min_perf_pct
+        self.min_pct_limit = driver.min_perf_pct
+        self.max_pct_limit = driver.min_perf_pct
 
         self.no_turbo = 1
 
         self.governor_poll_period_in_seconds = 5
 
-        self.set_intel_pstate_performance_bias("powersave")
-
+        self.performance_bias = "powersave"
+        self.energy_profile = "power"
+        self.uncore_profile = "power"
 
-    def start(self):
+    def get_poll_period(self):
         """
-        Starts the governor main loop.
+        The limits never change in this mode, no point in adapting to the temperature.
         :return:
         """
-
-        print("Starting governor {:s}...".format(self.governor_name))
-
-        # main loop
-        while True:
-            self.apply_action(self.get_action())
-
-            # print status
-            self.get_status()
-
-            # sleep... I need some, too
-            time.sleep(self.governor_poll_period_in_seconds)
+        return self.governor_poll_period_in_seconds
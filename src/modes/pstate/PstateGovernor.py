@@ -15,95 +15,324 @@
 # You should have received a copy of the GNU General Public License
 # along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
 
-import multiprocessing
-from abc import ABCMeta, abstractmethod
+import time
+from abc import ABCMeta
+
+from controllers.BandController import BandController
+from controllers.PidController import PidController
+from controllers.StepController import StepController
+from controllers.ThermalModel import ThermalModel
+from controllers.UncorePolicy import UncorePolicy
+from metrics.GovernorMetrics import GovernorMetrics
+from scheduler.AdaptiveScheduler import AdaptiveScheduler
+from scheduler.ThermalPlacement import ThermalPlacement
+
+# used when the package sensor doesn't report its own thresholds (k10temp, acpitz)
+DEFAULT_PACKAGE_MAX_TEMP = 90
+DEFAULT_PACKAGE_CRITICAL_TEMP = 95
+
+# degrees below the limit the package has to cool to before a shifted EPP moves back towards performance
+ENERGY_RECOVERY_MARGIN = 5
+# ticks between reading the energy preferences back
+ENERGY_VERIFY_TICKS = 20
+# degrees below the limit the fans go to full speed at, ahead of any throttling
+FAN_BOOST_MARGIN = 3
+# seconds between memory bandwidth samples of the dynamic uncore policy
+UNCORE_SAMPLE_SECONDS = 0.5
 
 
 class PstateGovernor(object):
     __metaclass__ = ABCMeta
 
-    def __init__(self, min_perf_pct, max_perf_pct, num_pstates, turbo_pct):
+    def __init__(self, driver, sensor_index, sysfs):
         """
         Init shared components.
         Other governors may want to use multiple temperature levels or different MHz steppings
         or aggressive polling, thus we don't set these here.
         """
-        self.pstate_path = "/sys/devices/system/cpu/intel_pstate/"
         self.pstate_governor_path = "/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor"  # cpu0 safe bet, applies same governor to all cores
-        self.package_temperature_path = "/sys/devices/platform/coretemp.0/hwmon/hwmon2/temp1_input"
-        self.package_max_temp_path = "/sys/devices/platform/coretemp.0/hwmon/hwmon2/temp1_max"
-        self.package_critical_temp_path = "/sys/devices/platform/coretemp.0/hwmon/hwmon2/temp1_crit"
+
+        self.driver = driver
+        self.sysfs = sysfs
+        # time source for the controller, simulations replace it
+        self.clock = time.monotonic
+
+        self.sensor_index = sensor_index
+        self.package_sensor = sensor_index.get_package_sensor()
+        if self.package_sensor is None:
+            raise RuntimeError("No CPU package temperature sensor found")
+        self.package_temperature_path = self.package_sensor.input_path
 
         self.governor_name = None
 
-        self.current_min_pct = min_perf_pct
-        self.current_max_pct = max_perf_pct
+        self.current_min_pct = driver.min_perf_pct
+        self.current_max_pct = driver.max_perf_pct
 
         self.min_pct_limit = None
         self.max_pct_limit = None
 
         self.no_turbo = None
 
-        self.governor_thread = None
+        # powersave or performance, the driver maps it to a scaling governor when the governor becomes active
+        self.performance_bias = None
+
+        # EPP profile of the mode, applied on entry and restored on exit, None leaves EPP and EPB alone
+        self.energy_profile = None
+        # the mode's profile or a more efficient one while shedding heat
+        self.current_energy_profile = None
+        self.ticks_since_energy_verify = 0
+
+        # uncore clock range of the mode, None leaves it alone
+        self.uncore_profile = None
+        # lowers the uncore clock while memory traffic is low, set up by configure() where the counters are there
+        self.uncore_policy = None
+        self.uncore_cap_pct = None
+        self.last_uncore_sample = None
+
+        # moves busy threads off hot cores ahead of throttling, set up by configure() if the mode asks for it
+        self.placement = None
+
+        # PM QoS cpu latency held while the mode is active, None holds no request
+        self.wakeup_latency_us = None
+        # also disables the cpuidle states slower to leave than wakeup_latency_us
+        self.disable_idle_states = False
+
+        # policy deciding the next max pct from the temperature, governors may swap in their own
+        self.controller = StepController()
+
+        # FanController shared by the modes, set by the service, None leaves the fans to the firmware
+        self.fans = None
+
+        # FleetNode shared by the modes, set by the service, None leaves max pct to the mode's own limits
+        self.fleet = None
+
+        # config file settings of the mode, applied by configure()
+        self.settings = None
+
+        # the engine hands every governor its own shared instance
+        self.metrics = GovernorMetrics()
+
+        # attributes touched on every tick are opened once and kept open for the governor lifetime,
+        # the limits also skip writes of values that are already set
+        self.package_temperature = sysfs.attribute(self.package_temperature_path)
+        self.limits = driver.open_limits()
+        self.pstate_governor = sysfs.attribute(self.pstate_governor_path, writable=True)
+
+        self.scheduler = AdaptiveScheduler()
+        self.scheduler.watch_alarms(sysfs, self.package_sensor.alarm_paths)
 
         self.read_initial_temps()
 
-    @abstractmethod
-    def start(self):
+    def configure(self, settings):
         """
-        Method containing main loop. Gets called via multiprocess API.
+        Applies the config file settings of the mode on top of the governor's defaults.
+        Called once on a new governor before it becomes active, a reload builds a new governor.
+        :param settings: ModeSettings
         :return:
         """
-        pass
+        self.settings = settings
 
-    def get_status(self):
+        if settings.poll_period is not None:
+            self.governor_poll_period_in_seconds = settings.poll_period
+        if settings.max_temp is not None:
+            self.package_max_temp = settings.max_temp
+        if settings.critical_temp is not None:
+            self.package_critical_temp = settings.critical_temp
+
+        if settings.controller == "step":
+            self.controller = StepController()
+        elif settings.controller == "pid" and not isinstance(self.controller, PidController):
+            self.controller = PidController(model=ThermalModel())
+        elif settings.controller == "band":
+            self.controller = BandController()
+
+        gains = {
+            "divisor": settings.step_divisor,
+            "kp": settings.pid_kp,
+            "ki": settings.pid_ki,
+            "kd": settings.pid_kd,
+            "target_margin": settings.pid_target_margin,
+            "safe_margin": settings.band_safe_margin,
+            "critical_excess": settings.band_critical_excess,
+            "throttle_critical": settings.band_throttle_critical,
+            "throttle_moderate": settings.band_throttle_moderate,
+            "increase_moderate": settings.band_increase_moderate,
+            "increase_boost": settings.band_increase_boost,
+        }
+        for name, value in gains.items():
+            if value is not None and hasattr(self.controller, name):
+                setattr(self.controller, name, value)
+
+        thresholds = {
+            "min_period": settings.min_period,
+            "max_period": settings.max_period,
+            "near_limit_margin": settings.near_limit_margin,
+            "far_limit_margin": settings.far_limit_margin,
+        }
+        for name, value in thresholds.items():
+            if value is not None:
+                setattr(self.scheduler, name, value)
+
+        if settings.uncore_dynamic:
+            bandwidth = self.driver.uncore.get_bandwidth()
+            if bandwidth is not None and bandwidth.available:
+                self.uncore_policy = UncorePolicy()
+            else:
+                print("No memory bandwidth counters, the uncore stays at its profile")
+
+        if settings.placement in ("suggest", "apply"):
+            placement = ThermalPlacement(self.sysfs, self.sensor_index, settings.placement)
+            if placement.available:
+                self.placement = placement
+            else:
+                print("No per core temperature sensors, threads stay where the scheduler puts them")
+                placement.close()
+
+        self.apply_settings_limits()
+
+    def apply_settings_limits(self):
         """
-        Returns the current state (min perf pct, max perf pct, no turbo status)
+        Narrows the limits down to the configured min and max pct and applies the configured turbo and
+        energy profile. Governors that change their limits on the fly call it again after every change.
         :return:
         """
-        stats = {
-            "min_perf_pct": "min_perf_pct",
-            "max_perf_pct ": "max_perf_pct",
-            "no_turbo": "no_turbo"
-        }
+        settings = self.settings
+        if settings is None:
+            return
 
-        for stat, path in stats.items():
-            with open("/sys/devices/system/cpu/intel_pstate/{:s}".format(path)) as f:
-                print("{:s}:\t{:s}".format(stat, f.read()), end='')
+        if settings.min_pct is not None:
+            self.min_pct_limit = max(self.min_pct_limit, settings.min_pct)
+        if settings.max_pct is not None:
+            self.max_pct_limit = min(self.max_pct_limit, settings.max_pct)
+        self.min_pct_limit = min(self.min_pct_limit, self.max_pct_limit)
 
-        print(str(self.current_temperature))
-        print()
+        self.current_min_pct = max(self.min_pct_limit, min(self.current_min_pct, self.max_pct_limit))
+        self.current_max_pct = max(self.min_pct_limit, min(self.current_max_pct, self.max_pct_limit))
 
-    def run_governor(self):
+        if settings.turbo is not None:
+            self.no_turbo = 0 if settings.turbo else 1
+        if settings.energy_profile is not None:
+            self.energy_profile = settings.energy_profile
+        if settings.uncore_profile is not None:
+            self.uncore_profile = settings.uncore_profile
+        if settings.wakeup_latency_us is not None:
+            self.wakeup_latency_us = settings.wakeup_latency_us
+        if settings.disable_idle_states is not None:
+            self.disable_idle_states = settings.disable_idle_states
+
+    def tick(self):
+        """
+        Runs a single iteration of the governor: read the sensors, decide, write. Gets called by the governor engine.
+        :return:
         """
-        Starts the governor process.
+        started = time.perf_counter()
+        self.read_current_temps()
+        read_done = time.perf_counter()
+        action = self.get_action()
+        decided = time.perf_counter()
+        self.apply_action(action)
+        self.metrics.observe_tick(started, read_done, decided, time.perf_counter())
+
+        self.metrics.temperature.set(self.current_temperature)
+        self.metrics.max_perf_pct.set(self.current_max_pct)
+
+    def enter(self):
+        """
+        Gets called by the governor engine when the governor becomes active.
+        :return:
         """
-        self.governor_thread = multiprocessing.Process(target=self.start)
-        self.governor_thread.start()
+        print("Starting governor {:s}...".format(self.governor_name))
+        self.set_performance_bias(self.performance_bias)
+        self.set_energy_profile(self.energy_profile)
+        self.set_uncore_profile(self.uncore_profile)
+        self.hold_wakeup_latency()
 
-    def stop_governor(self):
+    def exit(self):
         """
-        Stops the governor main loop from running.
+        Gets called by the governor engine when the governor is replaced or the service stops.
+        Never runs in the middle of a tick.
         :return:
         """
         print("Stopping governor {:s}...".format(self.governor_name))
-        self.governor_thread.terminate()
-        self.governor_thread = None
+        self.driver.energy.restore()
+        self.driver.uncore.restore()
+        self.driver.latency.release()
+        self.driver.idle.restore()
+        if self.placement is not None:
+            self.placement.close()
+        self.close_sysfs_attributes()
+
+    def get_status(self):
+        """
+        Returns the current state (min perf pct, max perf pct, no turbo status) as last set by the governor,
+        without touching sysfs.
+        :return:
+        """
+        status = {
+            "min_perf_pct": self.current_min_pct,
+            "max_perf_pct": self.current_max_pct,
+            "no_turbo": self.no_turbo,
+            "temperature": self.current_temperature,
+            "driver": self.driver.name,
+        }
+        if self.current_energy_profile is not None:
+            status["energy_profile"] = self.current_energy_profile
+        if self.uncore_profile is not None and self.driver.uncore.available:
+            status["uncore_profile"] = self.uncore_profile
+        if self.uncore_policy is not None:
+            status["memory_bandwidth"] = self.driver.uncore.bandwidth.bandwidth
+        if self.driver.latency.latency_us is not None:
+            status["wakeup_latency_us"] = self.driver.latency.latency_us
+        if self.placement is not None:
+            status["thread_migrations"] = self.placement.migrations
+        if self.fans is not None and self.fans.duty is not None:
+            status["fan_duty"] = self.fans.duty
+        if self.fleet is not None and self.fleet.ceiling is not None:
+            status["fleet_ceiling"] = self.fleet.ceiling
+        status.update(("writes_" + name, value) for name, value in self.get_write_counters().items())
+        return status
+
+    def get_write_counters(self):
+        """
+        Sums up the write elision counters of the limits.
+        :return:
+        """
+        counters = {"issued": 0, "elided": 0, "external": 0}
+        for attribute in self.limits.values():
+            counters["issued"] += attribute.writes_issued
+            counters["elided"] += attribute.writes_elided
+            counters["external"] += attribute.external_changes
+        return counters
+
+    def close_sysfs_attributes(self):
+        """
+        Releases the file descriptors held by the governor.
+        :return:
+        """
+        self.package_temperature.close()
+        self.pstate_governor.close()
+        self.scheduler.close()
+        for attribute in self.limits.values():
+            attribute.close()
 
     def read_initial_temps(self):
         """
-        Reads the max and critical temperatures in order to determine the default
+        Reads the max and critical temperatures in order to determine the default,
+        the config file settings of the mode override them in configure().
+        Max perf pct drops straight to the mode's min at the critical temperature.
         :return:
         """
 
-        with open(self.package_temperature_path, "r") as f:
-            self.current_temperature = int(f.read()) / 1000
+        self.current_temperature = self.package_temperature.read_int() / 1000
 
-        with open(self.package_max_temp_path, "r") as f:
-            self.package_max_temp = int(f.read()) / 1000
+        # thresholds were read when the sensor index was built
+        self.package_max_temp = self.package_sensor.max_temp
+        if self.package_max_temp is None:
+            self.package_max_temp = DEFAULT_PACKAGE_MAX_TEMP
 
-        with open(self.package_critical_temp_path, "r") as f:
-            self.package_critical_temp = int(f.read()) / 1000
+        self.package_critical_temp = self.package_sensor.crit_temp
+        if self.package_critical_temp is None:
+            self.package_critical_temp = DEFAULT_PACKAGE_CRITICAL_TEMP
 
     def read_current_temps(self):
         """
@@ -112,34 +341,92 @@ class PstateGovernor(object):
         Through basic observation the package temperature seems to be the maximum of the individual cores.
         :return:
         """
-        with open(self.package_temperature_path, "r") as f:
-            self.current_temperature = int(f.read()) / 1000
+        self.current_temperature = self.package_temperature.read_int() / 1000
+
+    def get_poll_period(self):
+        """
+        How long to sleep until the next tick, adapts to how close the package is to its temperature limit.
+        :return: seconds
+        """
+        return self.scheduler.next_period(self.current_temperature, self.package_max_temp,
+                                          self.governor_poll_period_in_seconds)
 
-    def calculate_noturbo_max_pct(self, min_perf_pct, max_perf_pct, num_pstates, turbo_pct):
+    def calculate_noturbo_max_pct(self):
         """
-        Calculates the performance percentage at the turbo clock speed limit.
+        Performance percentage at the turbo clock speed limit, as the driver translates it.
         Used to allow proper throttling when no_turbo is set to 1, as we need the proper percentages to perform throttling.
-        :param min_perf_pct:
-        :param max_perf_pct:
-        :param num_pstates:
-        :param turbo_pct:
         :return:
         """
-        percentage_range = max_perf_pct - min_perf_pct
-        step_pct = percentage_range / (num_pstates - 1)
-        nonturbo_range_pct = (100 - turbo_pct) / 100
-        turbo_range_start_as_step_count = nonturbo_range_pct * num_pstates
-        turbo_range_as_pct = min_perf_pct + (turbo_range_start_as_step_count * step_pct)
-        return int(turbo_range_as_pct)
+        return self.driver.noturbo_max_pct
 
-    def get_action_pct(self):
-        return int((self.package_max_temp - self.current_temperature) / 2)
+    def calculate_powersave_max_pct(self):
+        """
+        Gets max pct in order to create powersavings-ish mode for CPU.
+        Takes min pct and turbo pct and pretty much gets the centermost pct as the ceiling.
+        :return:
+        """
+        min_perf_pct = self.driver.min_perf_pct
+        turbo_pct = self.calculate_noturbo_max_pct()
+        return int(min_perf_pct + ((turbo_pct - min_perf_pct) / 2))
 
     def apply_action(self, settings):
-        for setting, value in settings.items():
-            with open(self.pstate_path + str(setting), "w") as f:
-                print("Setting {:s} to {:d}".format(setting, int(value)))
-                f.write(str(int(value)))
+        self.ticks_since_energy_verify += 1
+        if self.ticks_since_energy_verify >= ENERGY_VERIFY_TICKS:
+            self.ticks_since_energy_verify = 0
+            self.driver.energy.verify()
+
+        self.update_uncore()
+        self.update_placement()
+        self.update_fleet()
+
+        if self.fans is not None:
+            self.fans.update(self.current_temperature, self.clock())
+            if self.current_temperature >= self.package_max_temp - FAN_BOOST_MARGIN:
+                self.fans.boost(self.current_temperature, self.clock())
+            self.metrics.fan_duty.set(self.fans.duty if self.fans.duty is not None else float("nan"))
+
+        # the drivers clamp or refuse a min above the current max, a raised max has to go in before the min
+        order = list(settings)
+        max_perf_pct = self.limits["max_perf_pct"].shadow_value
+        if "max_perf_pct" in settings and (max_perf_pct is None or settings["max_perf_pct"] > max_perf_pct):
+            order.remove("max_perf_pct")
+            order.insert(0, "max_perf_pct")
+
+        for setting in order:
+            self.write_limit(self.limits[setting], settings[setting], setting == "max_perf_pct")
+
+    def write_limit(self, attribute, value, is_upper_limit=False):
+        """
+        Writes through a cached attribute and counts the writes issued and the limits lowered.
+        :param attribute: CachedSysfsAttribute or a driver limit
+        :param value:
+        :param is_upper_limit: lowering it counts as a throttle event
+        :return:
+        """
+        previous = attribute.shadow_value
+        if not attribute.write_int(value):
+            return
+
+        self.metrics.sysfs_writes.inc()
+        if is_upper_limit and previous is not None and int(value) < previous:
+            self.metrics.throttle_events.inc()
+
+    def write_limits(self, writes, is_upper_limit=False):
+        """
+        Writes a batch of cached attributes through the driver's batch writer, counted like write_limit().
+        :param writes: list of (CachedSysfsAttribute, value)
+        :param is_upper_limit: lowering them counts as throttle events
+        :return:
+        """
+        previous = [attribute.shadow_value for attribute, _ in writes]
+        issued = self.driver.writer.write_all(writes)
+
+        for (attribute, value), previous_value, was_issued in zip(writes, previous, issued):
+            if not was_issued:
+                continue
+            self.metrics.sysfs_writes.inc()
+            if is_upper_limit and previous_value is not None and int(value) < previous_value:
+                self.metrics.throttle_events.inc()
 
     def get_action(self):
         """
@@ -150,14 +437,14 @@ class PstateGovernor(object):
         :return:
         """
 
-        self.current_max_pct = self.current_max_pct + self.get_action_pct()
-
-        if self.current_max_pct < self.min_pct_limit:
+        max_pct = self.controller.get_max_pct(self.current_max_pct, self.current_temperature, self.package_max_temp,
+                                              self.min_pct_limit, self.get_max_pct_limit(), self.clock())
+        max_pct = self.hold_for_fans(max_pct)
+        self.current_max_pct = self.shift_energy_profile(max_pct)
+        if self.current_temperature >= self.package_critical_temp:
+            # no time left for steps, fans or EPP shifts
             self.current_max_pct = self.min_pct_limit
 
-        if self.current_max_pct > self.max_pct_limit:
-            self.current_max_pct = self.max_pct_limit
-
         # min, max, boost
         settings = {
             "min_perf_pct": self.current_min_pct,
@@ -167,8 +454,142 @@ class PstateGovernor(object):
 
         return settings
 
-    def set_intel_pstate_performance_bias(self, bias):
-        if bias in ("powersave", "performance"):
-            with open(self.pstate_governor_path, "w") as f:
-                print("Setting pstate governor to {:s}".format(bias))
-                f.write(bias)
+    def hold_for_fans(self, max_pct):
+        """
+        Ramps the fans up before cutting max pct, clocks stay up while they spin up.
+        Fans cost noise, a more efficient EPP costs a little throughput and a lower max pct a lot more,
+        so they go in that order. Cuts are only held while the package is within its limit.
+        :param max_pct: what the controller asks for
+        :return: max pct to set
+        """
+        if self.fans is None or max_pct >= self.current_max_pct or self.current_max_pct > self.get_max_pct_limit():
+            # not a thermal cut, e.g. pulled into the mode's limits
+            return max_pct
+
+        timestamp = self.clock()
+        self.fans.boost(self.current_temperature, timestamp)
+        if self.current_temperature <= self.package_max_temp and self.fans.is_ramping(timestamp):
+            self.metrics.fan_holds.inc()
+            return self.current_max_pct
+        return max_pct
+
+    def shift_energy_profile(self, max_pct):
+        """
+        Sheds heat with a more efficient EPP before cutting max pct, one profile per tick,
+        the hardware gives up less throughput for the same power that way.
+        Moves back towards the mode's profile once the limit is fully open and the package has cooled down.
+        :param max_pct: what the controller asks for
+        :return: max pct to set
+        """
+        if self.current_energy_profile is None or not self.driver.energy.has_epp:
+            return max_pct
+
+        profiles = self.driver.energy.get_shift_profiles(self.energy_profile)
+        index = profiles.index(self.current_energy_profile)
+
+        if max_pct < self.current_max_pct and index + 1 < len(profiles):
+            self.set_energy_profile(profiles[index + 1])
+            self.metrics.energy_shifts.inc()
+            return self.current_max_pct
+
+        if index > 0 and max_pct >= self.get_max_pct_limit() and \
+                self.current_temperature < self.package_max_temp - ENERGY_RECOVERY_MARGIN:
+            self.set_energy_profile(profiles[index - 1])
+
+        return max_pct
+
+    def set_energy_profile(self, profile):
+        if profile is None:
+            return
+        if self.driver.energy.apply(profile):
+            print("Setting energy preference to {:s}".format(profile))
+        self.current_energy_profile = profile
+
+    def update_uncore(self):
+        """
+        Samples the memory bandwidth every UNCORE_SAMPLE_SECONDS and caps the uncore clock while it is low.
+        :return:
+        """
+        if self.uncore_policy is None or self.uncore_profile is None:
+            return
+
+        timestamp = self.clock()
+        if self.last_uncore_sample is not None and timestamp - self.last_uncore_sample < UNCORE_SAMPLE_SECONDS:
+            return
+        self.last_uncore_sample = timestamp
+
+        bandwidth = self.driver.uncore.bandwidth.sample(timestamp)
+        self.metrics.memory_bandwidth.set(bandwidth)
+        cap_pct = self.uncore_policy.update(bandwidth, self.current_max_pct < self.max_pct_limit)
+        if cap_pct != self.uncore_cap_pct:
+            self.uncore_cap_pct = cap_pct
+            self.set_uncore_profile(self.uncore_profile)
+
+    def update_placement(self):
+        """
+        Moves work off the hottest cores before the controller has to lower the limits of all of them.
+        :return:
+        """
+        if self.placement is None:
+            return
+        moved = self.placement.update(self.clock(), self.package_max_temp)
+        if moved:
+            self.metrics.thread_migrations.inc(moved)
+
+    def get_max_pct_limit(self):
+        """
+        :return: max pct limit of the mode, lowered to the fleet coordinator's ceiling while it holds one
+        """
+        if self.fleet is None:
+            return self.max_pct_limit
+        ceiling = self.fleet.get_ceiling(self.clock())
+        if ceiling is None:
+            return self.max_pct_limit
+        return max(self.min_pct_limit, min(self.max_pct_limit, ceiling))
+
+    def update_fleet(self):
+        """
+        Reports to the fleet coordinator and picks up its ceiling, used from the next tick on.
+        :return:
+        """
+        if self.fleet is None:
+            return
+        # throttled by its own thermal control, not just held at the ceiling
+        self.fleet.update(self.clock(), self.current_temperature, self.current_max_pct,
+                          self.current_max_pct < self.get_max_pct_limit())
+        ceiling = self.fleet.get_ceiling(self.clock())
+        self.metrics.fleet_ceiling.set(ceiling if ceiling is not None else float("nan"))
+
+    def set_uncore_profile(self, profile):
+        if profile is None:
+            return
+        if self.driver.uncore.apply(profile, self.uncore_cap_pct):
+            print("Setting uncore profile to {:s}{:s}".format(
+                profile, "" if self.uncore_cap_pct is None else ", capped at {:d}%".format(self.uncore_cap_pct)))
+
+    def hold_wakeup_latency(self):
+        """
+        Keeps the cpus out of idle states slower to leave than wakeup_latency_us until the mode exits.
+        :return:
+        """
+        if self.wakeup_latency_us is None:
+            return
+
+        if not self.driver.latency.available:
+            print("No {:s}, the cpus may still enter deep idle states".format(self.driver.latency.path))
+        else:
+            try:
+                if self.driver.latency.hold(self.wakeup_latency_us):
+                    print("Holding a {:d} us CPU latency request".format(self.wakeup_latency_us))
+            except OSError as e:
+                print("Failed to hold a CPU latency request: '{}'".format(str(e)))
+
+        if self.disable_idle_states:
+            disabled = self.driver.idle.limit(self.wakeup_latency_us)
+            print("Disabled {:d} idle states slower than {:d} us".format(disabled, self.wakeup_latency_us))
+
+    def set_performance_bias(self, bias):
+        governor = self.driver.get_scaling_governor(bias)
+        if governor is not None and self.pstate_governor.read_str() != governor:
+            print("Setting pstate governor to {:s}".format(governor))
+            self.pstate_governor.write_str(governor)
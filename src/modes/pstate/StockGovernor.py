@@ -15,8 +15,6 @@
 # You should have received a copy of the GNU General Public License
 # along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
 
-import time
-
 from modes.pstate.PstateGovernor import PstateGovernor
 
 
@@ -26,39 +24,21 @@ class StockPstateGovernor(PstateGovernor):
     Throttling is enabled at default package temperature.
     """
 
-    def __init__(self, min_perf_pct, max_perf_pct, num_pstates, turbo_pct):
-        super().__init__(min_perf_pct, max_perf_pct, num_pstates, turbo_pct)
+    def __init__(self, driver, sensor_index, sysfs):
+        super().__init__(driver, sensor_index, sysfs)
 
         self.governor_name = "STOCK_GOVERNOR"
 
-        self.min_pct_limit = min_perf_pct
-        self.max_pct_limit = self.calculate_noturbo_max_pct(min_perf_pct, max_perf_pct, num_pstates, turbo_pct)
+        self.min_pct_limit = driver.min_perf_pct
+        self.max_pct_limit = self.calculate_noturbo_max_pct()
 
         self.no_turbo = 1
 
-        self.current_min_pct = min_perf_pct
-        self.current_max_pct = min_perf_pct
+        self.current_min_pct = driver.min_perf_pct
+        self.current_max_pct = driver.min_perf_pct
 
         self.governor_poll_period_in_seconds = 0.25
 
-        self.set_intel_pstate_performance_bias("powersave")
-
-    def start(self):
-        """
-        Starts the governor main loop.
-        :return:
-        """
-
-        print("Starting governor {:s}...".format(self.governor_name))
-
-        # main loop
-        while True:
-            self.read_current_temps()
-
-            self.apply_action(self.get_action())
-
-            # print status
-            self.get_status()
-
-            # sleep... I need some, too
-            time.sleep(self.governor_poll_period_in_seconds)
+        self.performance_bias = "powersave"
+        self.energy_profile = "balance_performance"
+        self.uncore_profile = "balance_performance"
@@ -15,6 +15,8 @@
 # You should have received a copy of the GNU General Public License
 # along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
 
+import glob
+import os
 import time
 
 RUN_CYCLE_LENGTH_IN_SECONDS = 1.0
@@ -37,10 +39,20 @@ INCREASE_BOOST = 5
 
 NO_TURBO_STATE_FILE = "/sys/devices/system/cpu/intel_pstate/no_turbo"
 MAX_CLOCK_PCT_FILE = "/sys/devices/system/cpu/intel_pstate/max_perf_pct"
-PACKAGE_TEMPERATURE_FILE = "/sys/class/hwmon/hwmon2/temp1_input"
+PACKAGE_TEMPERATURE_FILE = None
 IBM_FAN_FILE = "/proc/acpi/ibm/fan"
 
 
+def find_package_temperature_file():
+    # hwmonN numbering isn't stable between boots, look the chip up by name
+    for hwmon_path in sorted(glob.glob("/sys/class/hwmon/hwmon*")):
+        with open(os.path.join(hwmon_path, "name"), 'r') as f:
+            if f.readline().strip() == "coretemp":
+                return os.path.join(hwmon_path, "temp1_input")
+
+    raise RuntimeError("coretemp hwmon device not found")
+
+
 def get_package_temp():
     with open(PACKAGE_TEMPERATURE_FILE, 'r') as f:
         return int(f.readline()) / 1000
@@ -115,4 +127,5 @@ def start_thermal_daemon():
 
 
 if __name__ == '__main__':
+    PACKAGE_TEMPERATURE_FILE = find_package_temperature_file()
     start_thermal_daemon()
@@ -0,0 +1,116 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import struct
+import time
+
+# monotonic timestamp, temperature, min pct, max pct, no turbo (-1 unknown), mode index, energy profile index (255 none),
+# flags, sysfs writes of the tick, padded to 24 bytes so records stay aligned in a memory map
+RECORD = struct.Struct("<dfBBbBBBH4x")
+FLAG_THROTTLED = 1
+
+# magic, format version, header size, record size, unix time minus monotonic time when the log was started,
+# then the comma separated mode names
+HEADER = struct.Struct("<8sHHH2xd")
+HEADER_SIZE = 512
+MAGIC = b"LCMTICKS"
+VERSION = 2
+
+
+class RecordLog(object):
+    """
+    Append-only file of tick records: a fixed size header followed by fixed size records in time order,
+    so it can be memory-mapped and searched by timestamp without parsing.
+    Records carry monotonic time, which never goes backwards when the wall clock is stepped. The header holds
+    the offset to unix time taken when the log was started and the mode names the records' mode index
+    refers to, the names are rewritten in place when a mode shows up for the first time.
+    Once the file grows past max_bytes, or holds records of an earlier boot, it is moved to path + ".1" and
+    a new one is started, so at most two files' worth of disk is used.
+    """
+
+    def __init__(self, path, max_bytes=16 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        self.fd = None
+        self.size = 0
+        self.mode_names = []
+        self.wall_offset = None
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.open()
+
+    def open(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        self.size = os.fstat(self.fd).st_size
+
+        header = os.pread(self.fd, HEADER.size, 0) if self.size >= HEADER_SIZE else b""
+        if len(header) == HEADER.size and HEADER.unpack(header)[:4] == (MAGIC, VERSION, HEADER_SIZE, RECORD.size):
+            self.wall_offset = HEADER.unpack(header)[4]
+            names = os.pread(self.fd, HEADER_SIZE - HEADER.size, HEADER.size).rstrip(b"\0").decode()
+            self.mode_names = names.split(",") if names else []
+            # a record cut short by a crash is dropped
+            self.size -= (self.size - HEADER_SIZE) % RECORD.size
+            if self.size > HEADER_SIZE and self.read_last_timestamp() > time.monotonic():
+                # monotonic time started over with a reboot, the new records would go before the old ones
+                self.rotate()
+        else:
+            # not ours or an older format, start over
+            os.ftruncate(self.fd, 0)
+            self.mode_names = []
+            self.wall_offset = time.time() - time.monotonic()
+            self.write_header()
+            self.size = HEADER_SIZE
+
+    def read_last_timestamp(self):
+        return RECORD.unpack(os.pread(self.fd, RECORD.size, self.size - RECORD.size))[0]
+
+    def write_header(self):
+        names = ",".join(self.mode_names).encode()
+        if len(names) > HEADER_SIZE - HEADER.size:
+            raise ValueError("Too many mode names for the record log header")
+        header = HEADER.pack(MAGIC, VERSION, HEADER_SIZE, RECORD.size, self.wall_offset) + names
+        os.pwrite(self.fd, header.ljust(HEADER_SIZE, b"\0"), 0)
+
+    def append(self, records, mode_names):
+        """
+        :param records: packed RECORD bytes
+        :param mode_names: names the mode indexes of the records refer to
+        :return:
+        """
+        if self.size + len(records) > self.max_bytes:
+            self.rotate()
+
+        if list(mode_names) != self.mode_names:
+            # the recorder only ever appends names, indexes already on disk stay valid
+            self.mode_names = list(mode_names)
+            self.write_header()
+
+        if records:
+            os.pwrite(self.fd, records, self.size)
+            self.size += len(records)
+
+    def rotate(self):
+        os.close(self.fd)
+        os.replace(self.path, self.path + ".1")
+        self.open()
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
@@ -0,0 +1,113 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import mmap
+import os
+
+from drivers.EnergyPreference import EPP_PROFILES
+from recorder.RecordLog import FLAG_THROTTLED, HEADER, HEADER_SIZE, MAGIC, RECORD, VERSION
+
+FIELDS = ("timestamp", "mode", "temperature", "min_perf_pct", "max_perf_pct", "no_turbo", "energy_profile",
+          "throttled", "writes")
+
+
+class RecordReader(object):
+    """
+    Memory-maps a record log and finds the records of a time window by binary search on the timestamps.
+    Windows and the timestamps read back are unix time, converted with the offset of the log's header.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER_SIZE:
+                raise ValueError("{:s} is not a record log".format(path))
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = HEADER.unpack_from(self.map, 0)
+        if header[:4] != (MAGIC, VERSION, HEADER_SIZE, RECORD.size):
+            self.map.close()
+            raise ValueError("{:s} is not a record log of this version".format(path))
+        self.wall_offset = header[4]
+
+        names = self.map[HEADER.size:HEADER_SIZE].rstrip(b"\0").decode()
+        self.mode_names = names.split(",") if names else []
+        self.count = (size - HEADER_SIZE) // RECORD.size
+
+    def get_timestamp(self, index):
+        return RECORD.unpack_from(self.map, HEADER_SIZE + index * RECORD.size)[0]
+
+    def find(self, timestamp):
+        """
+        :param timestamp: monotonic time of the log
+        :return: index of the first record at or after the timestamp
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_timestamp(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def read_window(self, start, end):
+        """
+        :param start: unix time
+        :param end: unix time
+        :return: list of dicts with FIELDS
+        """
+        records = []
+        for index in range(self.find(start - self.wall_offset), self.find(end - self.wall_offset)):
+            (timestamp, temperature, min_perf_pct, max_perf_pct, no_turbo, mode, energy_profile, flags,
+             writes) = RECORD.unpack_from(self.map, HEADER_SIZE + index * RECORD.size)
+            records.append({
+                "timestamp": timestamp + self.wall_offset,
+                "mode": self.mode_names[mode] if mode < len(self.mode_names) else str(mode),
+                "temperature": temperature,
+                "min_perf_pct": min_perf_pct,
+                "max_perf_pct": max_perf_pct,
+                "no_turbo": None if no_turbo < 0 else no_turbo,
+                "energy_profile": EPP_PROFILES[energy_profile] if energy_profile < len(EPP_PROFILES) else None,
+                "throttled": bool(flags & FLAG_THROTTLED),
+                "writes": writes,
+            })
+        return records
+
+    def close(self):
+        self.map.close()
+
+    @staticmethod
+    def read_logs(path, start, end):
+        """
+        Reads the window from the rotated log and the current one.
+        :param path: current log
+        :param start:
+        :param end:
+        :return:
+        """
+        records = []
+        for log_path in (path + ".1", path):
+            if not os.path.exists(log_path):
+                continue
+            reader = RecordReader(log_path)
+            try:
+                records.extend(reader.read_window(start, end))
+            finally:
+                reader.close()
+        return records
@@ -0,0 +1,93 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+
+from drivers.EnergyPreference import EPP_PROFILES
+from recorder.RecordLog import FLAG_THROTTLED, RECORD
+
+NO_ENERGY_PROFILE = 255
+
+
+class TickRecorder(object):
+    """
+    Keeps the last capacity ticks in a preallocated ring buffer of packed records, memory stays bounded
+    whatever the uptime. Written by the engine thread after every tick, drained to a RecordLog from the main loop.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        # the ring is only held for a copy, never for file I/O
+        self.lock = threading.Lock()
+
+        # records ever written and ever drained, the ring holds the ones in between
+        self.written = 0
+        self.drained = 0
+        self.lost = 0
+
+        # a record's mode index points into this list, names are only ever appended
+        self.mode_names = []
+
+    def get_mode_index(self, name):
+        if name not in self.mode_names:
+            self.mode_names.append(name)
+        return self.mode_names.index(name)
+
+    def record(self, mode_index, governor, writes):
+        """
+        :param mode_index: from get_mode_index()
+        :param governor: governor that just ticked
+        :param writes: sysfs writes of the tick
+        :return:
+        """
+        no_turbo = -1 if governor.no_turbo is None else int(governor.no_turbo)
+        energy_profile = governor.current_energy_profile
+        energy_index = EPP_PROFILES.index(energy_profile) if energy_profile in EPP_PROFILES else NO_ENERGY_PROFILE
+        throttled = governor.max_pct_limit is not None and governor.current_max_pct < governor.max_pct_limit
+
+        with self.lock:
+            RECORD.pack_into(self.buffer, (self.written % self.capacity) * RECORD.size, time.monotonic(),
+                             governor.current_temperature, int(governor.current_min_pct),
+                             int(governor.current_max_pct),
+                             no_turbo, mode_index, energy_index, FLAG_THROTTLED if throttled else 0,
+                             min(writes, 0xffff))
+            self.written += 1
+
+    def drain(self):
+        """
+        Takes the records written since the last drain, oldest first.
+        Records overwritten before they were drained are counted in lost.
+        :return: packed records
+        """
+        with self.lock:
+            pending = self.written - self.drained
+            if pending > self.capacity:
+                self.lost += pending - self.capacity
+                pending = self.capacity
+
+            start = (self.written - pending) % self.capacity * RECORD.size
+            end = self.written % self.capacity * RECORD.size
+            if pending == 0:
+                records = b""
+            elif start < end:
+                records = bytes(self.buffer[start:end])
+            else:
+                records = bytes(self.buffer[start:]) + bytes(self.buffer[:end])
+            self.drained = self.written
+        return records
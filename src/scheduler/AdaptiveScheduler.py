@@ -0,0 +1,158 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import select
+import time
+
+
+class AdaptiveScheduler(object):
+    """
+    Decides how long the governor loop sleeps between ticks.
+    Far below the temperature limit with a flat temperature the period backs off up to max_period,
+    close to the limit it tightens down to min_period.
+    Sleeping is done with poll() on the hwmon alarm attributes, so a raised alarm wakes the loop immediately.
+    """
+
+    def __init__(self, min_period=0.05, max_period=4.0, near_limit_margin=5, far_limit_margin=20,
+                 flat_slope=0.5, backoff_factor=1.5, clock=time.monotonic):
+        """
+        :param min_period: shortest sleep in seconds, used at or near the temperature limit
+        :param max_period: longest sleep in seconds, used when the temperature is flat and far from the limit
+        :param near_limit_margin: degrees below the limit where the shortest period is used
+        :param far_limit_margin: degrees below the limit where backing off is allowed
+        :param flat_slope: temperature change in degrees per second that still counts as flat
+        :param backoff_factor: how much the period grows per tick while backing off
+        :param clock: time source, simulations replace it
+        """
+        self.min_period = min_period
+        self.max_period = max_period
+        self.near_limit_margin = near_limit_margin
+        self.far_limit_margin = far_limit_margin
+        self.flat_slope = flat_slope
+        self.backoff_factor = backoff_factor
+        self.clock = clock
+
+        self.period = None
+        self.last_temperature = None
+        self.last_time = None
+
+        self.alarms = []
+        self.wakeup_fds = []
+        self.poller = select.poll()
+
+        self.wakeups = 0
+        self.alarm_wakeups = 0
+
+    def watch_alarms(self, sysfs, alarm_paths):
+        """
+        Registers hwmon alarm attributes (tempN_max_alarm, tempN_crit_alarm) to wake up on.
+        :param sysfs:
+        :param alarm_paths:
+        :return:
+        """
+        for path in alarm_paths:
+            attribute = sysfs.attribute(path)
+            # sysfs only notifies pollers that have read the attribute since the last event
+            attribute.read_bytes()
+            if attribute.fd is None:
+                # backends without file descriptors can't be polled, the poll period still applies
+                continue
+            self.poller.register(attribute.fd, select.POLLPRI | select.POLLERR)
+            self.alarms.append(attribute)
+
+    def watch_wakeup_fd(self, fd):
+        """
+        Registers a file descriptor that interrupts the sleep when it becomes readable.
+        Draining it is up to the owner.
+        :param fd:
+        :return:
+        """
+        self.poller.register(fd, select.POLLIN)
+        self.wakeup_fds.append(fd)
+
+    def next_period(self, temperature, max_temperature, base_period):
+        """
+        Calculates the next sleep period from the current temperature and its rate of change.
+        :param temperature: current temperature
+        :param max_temperature: temperature limit
+        :param base_period: the governor's regular poll period
+        :return: period in seconds
+        """
+        now = self.clock()
+        slope = 0
+        if self.last_time is not None and now > self.last_time:
+            slope = (temperature - self.last_temperature) / (now - self.last_time)
+        self.last_temperature = temperature
+        self.last_time = now
+
+        headroom = max_temperature - temperature
+
+        if headroom <= self.near_limit_margin:
+            period = self.min_period
+        elif headroom < self.far_limit_margin:
+            fraction = (headroom - self.near_limit_margin) / (self.far_limit_margin - self.near_limit_margin)
+            period = self.min_period + fraction * (base_period - self.min_period)
+        elif abs(slope) < self.flat_slope:
+            period = min(max(self.period or base_period, base_period) * self.backoff_factor, self.max_period)
+        else:
+            period = base_period
+
+        if slope > 0:
+            # wake up at least a few times before the temperature can reach the limit
+            period = min(period, max(headroom, 0) / slope / 4)
+
+        self.period = max(period, self.min_period)
+        return self.period
+
+    def wait(self, period):
+        """
+        Sleeps for the given period, until a temperature alarm is raised or until a wakeup fd becomes readable.
+        :param period: seconds
+        :return: True if woken up by an alarm
+        """
+        self.wakeups += 1
+
+        if not self.alarms and not self.wakeup_fds:
+            time.sleep(period)
+            return False
+
+        events = self.poller.poll(period * 1000)
+        if not events:
+            return False
+
+        if any(fd in self.wakeup_fds for fd, event in events):
+            return False
+
+        for alarm in self.alarms:
+            # rearm the notification, re-registering if the handle had to be reopened
+            fd = alarm.fd
+            alarm.read_bytes()
+            if alarm.fd != fd:
+                self.poller.unregister(fd)
+                self.poller.register(alarm.fd, select.POLLPRI | select.POLLERR)
+
+        # an alarm means the temperature is at the limit, don't back off from here
+        self.period = self.min_period
+        self.alarm_wakeups += 1
+        return True
+
+    def close(self):
+        for alarm in self.alarms:
+            alarm.close()
+        self.alarms = []
+        self.wakeup_fds = []
+        self.poller = select.poll()
@@ -0,0 +1,153 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from controllers.PlacementPolicy import PlacementPolicy
+from sensors.CoreTemperatureSensors import CoreTemperatureSensors
+from sensors.TaskMonitor import TaskMonitor
+from topology.CpuTopology import CpuTopology
+
+PLACEMENT_MODES = ("off", "suggest", "apply")
+
+
+class ThermalPlacement(object):
+    """
+    Steers the busiest threads away from the hottest cores with sched_setaffinity, ahead of the governor
+    lowering the limits of every core. Runs every period seconds from the governor tick.
+    A moved thread is allowed the cool cores out of the cpus it had, the scheduler picks among them.
+    Its own affinity is put back on release and on close(), unless something else changed it in the meantime.
+    With suggest, the moves are only logged.
+    Needs per core sensors (coretemp), not available with a single core sensor or none.
+    """
+
+    def __init__(self, sysfs, sensor_index, mode="apply", period=1.0):
+        """
+        :param sysfs:
+        :param sensor_index: HwmonIndex
+        :param mode: suggest or apply
+        :param period: seconds between updates
+        """
+        if mode not in PLACEMENT_MODES[1:]:
+            raise ValueError("Unknown placement mode {:s}".format(mode))
+
+        self.mode = mode
+        self.period = period
+
+        self.topology = CpuTopology(sysfs)
+        self.sensors = CoreTemperatureSensors(sensor_index)
+        # (package id, core id) -> cpus, cores with a sensor and online cpus
+        self.core_cpus = {}
+        for core in self.sensors.core_sensors:
+            cpus = self.topology.get_cpus_of_core(*core)
+            if cpus:
+                self.core_cpus[core] = cpus
+        self.available = len(self.core_cpus) > 1
+
+        self.monitor = TaskMonitor(sysfs)
+        self.policy = PlacementPolicy()
+
+        # simulations replace them
+        self.get_affinity = os.sched_getaffinity
+        self.set_affinity = os.sched_setaffinity
+
+        # tid -> (affinity before the first move, affinity set)
+        self.affinities = {}
+        self.last_update = None
+
+        self.migrations = 0
+        # (tid, comm, cpu, cpus) of the last moves decided
+        self.suggestions = []
+
+    def update(self, timestamp, max_temp):
+        """
+        :param timestamp: seconds
+        :param max_temp: temperature limit of the governor
+        :return: number of threads moved
+        """
+        if not self.available or (self.last_update is not None and timestamp - self.last_update < self.period):
+            return 0
+        self.last_update = timestamp
+
+        core_temps = {core: self.sensors.core_sensors[core].read() for core in self.core_cpus}
+        tasks = self.monitor.sample(timestamp)
+        moves, releases = self.policy.plan(core_temps, self.core_cpus, tasks, max_temp, timestamp)
+
+        for tid in releases:
+            self.release(tid)
+
+        moved = 0
+        for task, cpus in moves:
+            if self.move(task, cpus):
+                moved += 1
+        self.migrations += moved
+        return moved
+
+    def move(self, task, cpus):
+        """
+        :param task:
+        :param cpus: cool cpus
+        :return: whether the thread was moved
+        """
+        if self.mode == "suggest":
+            self.suggestions = self.suggestions[-7:] + [(task.tid, task.comm, task.cpu, sorted(cpus))]
+            print("Thread {:d} ({:s}) could move off cpu {:d} to cpus {}".format(task.tid, task.comm, task.cpu,
+                                                                                sorted(cpus)))
+            return True
+
+        try:
+            if task.tid in self.affinities:
+                original = self.affinities[task.tid][0]
+            else:
+                original = self.get_affinity(task.tid)
+            target = set(cpus) & set(original)
+            if not target:
+                # pinned away from the cool cores by someone else
+                self.policy.forget(task.tid)
+                return False
+            self.set_affinity(task.tid, target)
+        except OSError:
+            # exited, or not ours to move
+            self.policy.forget(task.tid)
+            return False
+
+        self.affinities[task.tid] = (original, target)
+        self.suggestions = self.suggestions[-7:] + [(task.tid, task.comm, task.cpu, sorted(target))]
+        print("Moving thread {:d} ({:s}) off cpu {:d} to cpus {}".format(task.tid, task.comm, task.cpu,
+                                                                         sorted(target)))
+        return True
+
+    def release(self, tid):
+        """
+        Hands a moved thread its own affinity back.
+        :param tid:
+        :return:
+        """
+        if tid not in self.affinities:
+            return
+        original, target = self.affinities.pop(tid)
+        try:
+            if set(self.get_affinity(tid)) == target:
+                self.set_affinity(tid, original)
+        except OSError:
+            pass
+
+    def close(self):
+        for tid in list(self.affinities):
+            self.release(tid)
+        self.monitor.close()
+        self.sensors.close()
@@ -0,0 +1,96 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+
+
+class CoreTemperatureSensor(object):
+    """
+    One coretemp channel from the hwmon index, either a package or a core sensor.
+    """
+
+    def __init__(self, sysfs, hwmon_sensor, package_id, core_id=None):
+        self.label = hwmon_sensor.label
+        self.package_id = package_id
+        self.core_id = core_id
+        self.max_temp = hwmon_sensor.max_temp
+
+        self.temperature = sysfs.attribute(hwmon_sensor.input_path)
+        self.current_temperature = None
+
+    def read(self):
+        self.current_temperature = self.temperature.read_int() / 1000
+        return self.current_temperature
+
+    def close(self):
+        self.temperature.close()
+
+
+class CoreTemperatureSensors(object):
+    """
+    All coretemp package and core sensors of the machine, one coretemp.N platform device per socket.
+    """
+
+    def __init__(self, sensor_index):
+        # package id -> sensor
+        self.package_sensors = {}
+        # (package id, core id) -> sensor
+        self.core_sensors = {}
+
+        self.build(sensor_index)
+
+    def build(self, sensor_index):
+        devices = {}
+        for sensor in sensor_index.get_chip_sensors("coretemp"):
+            devices.setdefault(sensor.device, []).append(sensor)
+
+        for device, sensors in sorted(devices.items()):
+            # the package sensor tells which socket this is, fall back to the device number
+            package_id = int(device.rsplit(".", 1)[1])
+            for sensor in sensors:
+                match = re.match(r"Package id (\d+)", sensor.label or "")
+                if match:
+                    package_id = int(match.group(1))
+
+            for sensor in sensors:
+                label = sensor.label or ""
+                if label.startswith("Package id"):
+                    self.package_sensors[package_id] = CoreTemperatureSensor(sensor_index.sysfs, sensor, package_id)
+                    continue
+
+                match = re.match(r"Core (\d+)", label)
+                if match:
+                    core_id = int(match.group(1))
+                    self.core_sensors[(package_id, core_id)] = CoreTemperatureSensor(sensor_index.sysfs, sensor,
+                                                                                     package_id, core_id)
+
+    def read_all(self):
+        """
+        Reads every sensor.
+        :return: the hottest temperature seen
+        """
+        hottest = None
+        for sensor in list(self.package_sensors.values()) + list(self.core_sensors.values()):
+            temperature = sensor.read()
+            if hottest is None or temperature > hottest:
+                hottest = temperature
+
+        return hottest
+
+    def close(self):
+        for sensor in list(self.package_sensors.values()) + list(self.core_sensors.values()):
+            sensor.close()
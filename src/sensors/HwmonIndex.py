@@ -0,0 +1,113 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import re
+
+# hwmon chips we know how to use, everything else is left out of the index
+SUPPORTED_CHIPS = ("coretemp", "k10temp", "zenpower", "acpitz", "nvme")
+
+# which sensor to treat as the CPU package temperature, in order of preference (chip, label prefix)
+PACKAGE_SENSORS = (
+    ("coretemp", "Package id"),
+    ("zenpower", "Tdie"),
+    ("k10temp", "Tdie"),
+    ("k10temp", "Tctl"),
+    ("acpitz", None),
+)
+
+
+def read_optional_str(sysfs, path):
+    if not sysfs.exists(path):
+        return None
+    return sysfs.read_str(path)
+
+
+def read_optional_temp(sysfs, path):
+    value = read_optional_str(sysfs, path)
+    if value is None:
+        return None
+    return int(value) / 1000
+
+
+class HwmonSensor(object):
+    """
+    A single hwmon temperature channel (tempN_*) with the thresholds it had when the index was built.
+    """
+
+    def __init__(self, sysfs, chip, device, hwmon_path, index):
+        self.chip = chip
+        self.device = device
+        self.hwmon_path = hwmon_path
+        self.index = index
+
+        prefix = os.path.join(hwmon_path, "temp{:d}_".format(index))
+        self.input_path = prefix + "input"
+        self.label = read_optional_str(sysfs, prefix + "label")
+        self.max_temp = read_optional_temp(sysfs, prefix + "max")
+        self.crit_temp = read_optional_temp(sysfs, prefix + "crit")
+        self.alarm_paths = [prefix + alarm for alarm in ("max_alarm", "crit_alarm")
+                            if sysfs.exists(prefix + alarm)]
+
+
+class HwmonIndex(object):
+    """
+    Index of the temperature sensors under /sys/class/hwmon, built once at startup.
+    hwmonN numbering is not stable between boots, so chips are matched by their name attribute.
+    Call rebuild() when hwmon devices come or go.
+    """
+
+    def __init__(self, sysfs, hwmon_class_path="/sys/class/hwmon/"):
+        self.sysfs = sysfs
+        self.hwmon_class_path = hwmon_class_path
+        self.sensors = []
+
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Rescans every hwmon device.
+        :return:
+        """
+        sensors = []
+        for hwmon_path in sorted(self.sysfs.glob(os.path.join(self.hwmon_class_path, "hwmon*")),
+                                 key=lambda path: int(re.search(r"(\d+)$", path).group(1))):
+            chip = read_optional_str(self.sysfs, os.path.join(hwmon_path, "name"))
+            if chip not in SUPPORTED_CHIPS:
+                continue
+
+            device = self.sysfs.get_link_name(os.path.join(hwmon_path, "device"))
+            inputs = self.sysfs.glob(os.path.join(hwmon_path, "temp*_input"))
+            for index in sorted(int(re.search(r"temp(\d+)_input$", path).group(1)) for path in inputs):
+                sensors.append(HwmonSensor(self.sysfs, chip, device, hwmon_path, index))
+
+        # swap in one go, readers never see a half built index
+        self.sensors = sensors
+
+    def get_chip_sensors(self, chip):
+        return [sensor for sensor in self.sensors if sensor.chip == chip]
+
+    def get_package_sensor(self):
+        """
+        Picks the sensor that best represents the CPU package temperature.
+        :return: HwmonSensor or None
+        """
+        for chip, label_prefix in PACKAGE_SENSORS:
+            for sensor in self.get_chip_sensors(chip):
+                if label_prefix is None or (sensor.label or "").startswith(label_prefix):
+                    return sensor
+        return None
@@ -0,0 +1,56 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import socket
+
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+
+
+class HwmonMonitor(object):
+    """
+    Listens to kernel uevents and reports hwmon devices being added or removed.
+    Uses the uevent netlink socket directly, the same events udev itself gets.
+    """
+
+    def __init__(self):
+        self.socket = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        self.socket.bind((0, UEVENT_KERNEL_GROUP))
+        self.socket.setblocking(False)
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def read_events(self):
+        """
+        Drains the pending uevents.
+        :return: True if any of them added or removed a hwmon device
+        """
+        changed = False
+        while True:
+            try:
+                message = self.socket.recv(8192)
+            except BlockingIOError:
+                return changed
+
+            fields = message.split(b"\0")
+            properties = dict(field.split(b"=", 1) for field in fields[1:] if b"=" in field)
+            if properties.get(b"SUBSYSTEM") == b"hwmon" and properties.get(b"ACTION") in (b"add", b"remove"):
+                changed = True
+
+    def close(self):
+        self.socket.close()
@@ -0,0 +1,113 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from sensors.PerfCounter import PerfCounter
+
+PMU_PATTERN = "/sys/bus/event_source/devices/uncore_imc*"
+# read and write event names, servers first, then the client parts
+EVENT_NAMES = (("cas_count_read", "cas_count_write"), ("data_read", "data_write"), ("data_reads", "data_writes"))
+UNIT_BYTES = {"": 1, "B": 1, "KiB": 1 << 10, "MiB": 1 << 20, "GiB": 1 << 30}
+
+
+def parse_config(event, formats):
+    """
+    Encodes an event like "event=0x04,umask=0x03" with the PMU's format fields like "config:0-7".
+    :param event: event string
+    :param formats: field name -> format string
+    :return: config value
+    """
+    config = 0
+    for term in event.split(","):
+        name, _, value = term.strip().partition("=")
+        value = int(value, 0) if value else 1
+
+        target, _, ranges = formats[name].partition(":")
+        if target != "config":
+            raise ValueError("Unsupported perf format {:s}".format(formats[name]))
+
+        shift = 0
+        for bit_range in ranges.split(","):
+            low, _, high = bit_range.partition("-")
+            low = int(low)
+            width = int(high) - low + 1 if high else 1
+            config |= ((value >> shift) & ((1 << width) - 1)) << low
+            shift += width
+    return config
+
+
+class MemoryBandwidthMonitor(object):
+    """
+    Memory controller traffic from the uncore IMC perf counters, cas_count_read/write on servers and
+    data_read(s)/data_write(s) on client parts. A sample costs one read() per counter.
+    Not available without those PMUs or without the permission to open them (perf_event_paranoid, CAP_PERFMON).
+    """
+
+    def __init__(self, sysfs):
+        # (PerfCounter, bytes per count)
+        self.counters = []
+        try:
+            for pmu_path in sorted(sysfs.glob(PMU_PATTERN)):
+                self.open_pmu(sysfs, pmu_path)
+        except (OSError, ValueError, KeyError) as e:
+            print("Memory bandwidth counters not available: '{}'".format(str(e)))
+            self.close()
+        self.available = bool(self.counters)
+
+        self.last_bytes = None
+        self.last_timestamp = None
+        # bytes per second between the last two samples
+        self.bandwidth = 0.0
+
+    def open_pmu(self, sysfs, pmu_path):
+        events_path = os.path.join(pmu_path, "events")
+        for names in EVENT_NAMES:
+            if all(sysfs.exists(os.path.join(events_path, name)) for name in names):
+                break
+        else:
+            return
+
+        formats = {os.path.basename(path): sysfs.read_str(path)
+                   for path in sysfs.glob(os.path.join(pmu_path, "format", "*"))}
+        pmu_type = sysfs.read_int(os.path.join(pmu_path, "type"))
+        cpus = [int(cpu) for cpu in sysfs.read_str(os.path.join(pmu_path, "cpumask")).split(",") if "-" not in cpu]
+
+        for name in names:
+            path = os.path.join(events_path, name)
+            config = parse_config(sysfs.read_str(path), formats)
+            scale = float(sysfs.read_str(path + ".scale")) if sysfs.exists(path + ".scale") else 1.0
+            unit = sysfs.read_str(path + ".unit") if sysfs.exists(path + ".unit") else ""
+            for cpu in cpus:
+                self.counters.append((PerfCounter(pmu_type, config, cpu), scale * UNIT_BYTES.get(unit, 1)))
+
+    def sample(self, timestamp):
+        """
+        :param timestamp: seconds
+        :return: bytes per second since the previous sample, 0 on the first one
+        """
+        total = sum(counter.read() * bytes_per_count for counter, bytes_per_count in self.counters)
+        if self.last_timestamp is not None and timestamp > self.last_timestamp:
+            self.bandwidth = (total - self.last_bytes) / (timestamp - self.last_timestamp)
+        self.last_bytes = total
+        self.last_timestamp = timestamp
+        return self.bandwidth
+
+    def close(self):
+        for counter, _ in self.counters:
+            counter.close()
+        self.counters = []
@@ -0,0 +1,67 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import ctypes
+import os
+import platform
+import struct
+
+# perf_event_open syscall numbers
+PERF_EVENT_OPEN_SYSCALLS = {"x86_64": 298, "i386": 336, "i686": 336}
+PERF_FLAG_FD_CLOEXEC = 8
+# type, size, config, the rest of perf_event_attr stays zero: counting, enabled, no sampling
+PERF_EVENT_ATTR = struct.Struct("<IIQ")
+PERF_ATTR_SIZE = 112
+
+LIBC = ctypes.CDLL(None, use_errno=True)
+# long syscall(long number, struct perf_event_attr *attr, pid_t pid, int cpu, int group_fd, unsigned long flags)
+LIBC.syscall.argtypes = [ctypes.c_long, ctypes.c_char_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+LIBC.syscall.restype = ctypes.c_long
+
+
+class PerfCounter(object):
+    """
+    A single counting perf event, read with one read() of 8 bytes. Counts from the moment it is opened.
+    """
+
+    def __init__(self, pmu_type, config, cpu):
+        """
+        :param pmu_type: the PMU's type, from /sys/bus/event_source/devices/PMU/type
+        :param config: event encoding
+        :param cpu: cpu to count on, uncore PMUs count the whole package from one cpu
+        :raises OSError: the kernel refused the event
+        """
+        syscall_number = PERF_EVENT_OPEN_SYSCALLS.get(platform.machine())
+        if syscall_number is None:
+            raise OSError("perf_event_open isn't known on {:s}".format(platform.machine()))
+
+        attr = ctypes.create_string_buffer(PERF_ATTR_SIZE)
+        PERF_EVENT_ATTR.pack_into(attr, 0, pmu_type, PERF_ATTR_SIZE, config)
+
+        fd = LIBC.syscall(syscall_number, attr, -1, cpu, -1, PERF_FLAG_FD_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.fd = fd
+
+    def read(self):
+        return struct.unpack("<Q", os.read(self.fd, 8))[0]
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
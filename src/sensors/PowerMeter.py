@@ -0,0 +1,84 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+
+
+class PowerMeter(object):
+    """
+    Rolling power of RAPL domains from energy counter deltas.
+    Power is smoothed with an exponential moving average over time_constant seconds,
+    so a single short sample doesn't swing the governor.
+    """
+
+    def __init__(self, domains, time_constant=1.0):
+        self.domains = domains
+        self.time_constant = time_constant
+
+        # taken on the first sample
+        self.previous_energy = None
+        self.previous_timestamp = None
+
+        # domain name -> watts, package domains are summed into "package"
+        self.power = {}
+        self.energy_joules = {}
+        # energy of the last sample interval alone
+        self.interval_joules = {}
+
+    def sample(self, timestamp):
+        """
+        Reads every energy counter and updates the rolling power.
+        :param timestamp: seconds
+        :return: domain name -> watts
+        """
+        if self.previous_timestamp is None:
+            self.previous_energy = [domain.read_energy_uj() for domain in self.domains]
+            self.previous_timestamp = timestamp
+            return self.power
+
+        elapsed = timestamp - self.previous_timestamp
+        if elapsed <= 0:
+            return self.power
+        self.previous_timestamp = timestamp
+        weight = 1 - math.exp(-elapsed / self.time_constant)
+
+        watts = {}
+        joules = {}
+        for index, domain in enumerate(self.domains):
+            energy = domain.read_energy_uj()
+            delta = energy - self.previous_energy[index]
+            if delta < 0:
+                # the counter wrapped around
+                delta += domain.max_energy_range_uj
+            self.previous_energy[index] = energy
+
+            name = "package" if domain.is_package() else domain.name
+            joules[name] = joules.get(name, 0.0) + delta / 1e6
+            watts[name] = watts.get(name, 0.0) + delta / 1e6 / elapsed
+
+        for name, value in watts.items():
+            previous = self.power.get(name)
+            self.power[name] = value if previous is None else previous + weight * (value - previous)
+        for name, value in joules.items():
+            self.energy_joules[name] = self.energy_joules.get(name, 0.0) + value
+        self.interval_joules = joules
+
+        return self.power
+
+    def close(self):
+        for domain in self.domains:
+            domain.close()
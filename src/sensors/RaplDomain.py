@@ -0,0 +1,76 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+POWERCAP_PATH = "/sys/class/powercap/"
+
+
+class RaplDomain(object):
+    """
+    A RAPL power domain in the powercap class: a package or one of its subdomains (core, uncore, dram).
+    The energy counter is kept open, it is read on every tick.
+    """
+
+    def __init__(self, sysfs, path):
+        self.sysfs = sysfs
+        self.path = path
+        self.name = sysfs.read_str(os.path.join(path, "name"))
+
+        self.energy = sysfs.attribute(os.path.join(path, "energy_uj"))
+        # the counter wraps around to 0 after this
+        self.max_energy_range_uj = sysfs.read_int(os.path.join(path, "max_energy_range_uj"))
+
+        # constraint name (long_term, short_term) -> power limit attribute path
+        self.power_limit_paths = {}
+        for name_path in sorted(sysfs.glob(os.path.join(path, "constraint_*_name"))):
+            limit_path = name_path[:-len("name")] + "power_limit_uw"
+            if sysfs.exists(limit_path):
+                self.power_limit_paths[sysfs.read_str(name_path)] = limit_path
+
+    def is_package(self):
+        return self.name.startswith("package")
+
+    def read_energy_uj(self):
+        return self.energy.read_int()
+
+    def read_power_limit_watts(self, constraint="long_term"):
+        """
+        :param constraint:
+        :return: the limit in watts, None if the domain doesn't have the constraint
+        """
+        path = self.power_limit_paths.get(constraint)
+        if path is None:
+            return None
+        return self.sysfs.read_int(path) / 1e6
+
+    def close(self):
+        self.energy.close()
+
+    @staticmethod
+    def discover(sysfs):
+        """
+        Finds the RAPL domains, intel-rapl:N are packages and intel-rapl:N:M their subdomains.
+        AMD exposes its RAPL counters under the same names.
+        :param sysfs:
+        :return: list of RaplDomain
+        """
+        domains = []
+        for path in sorted(sysfs.glob(os.path.join(POWERCAP_PATH, "intel-rapl:*"))):
+            if sysfs.exists(os.path.join(path, "energy_uj")):
+                domains.append(RaplDomain(sysfs, path))
+        return domains
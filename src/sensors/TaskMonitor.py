@@ -0,0 +1,175 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+TASK_PATTERN = "/proc/[0-9]*/task/[0-9]*"
+# kernel threads are bound to their cpus or moved by the kernel itself
+PF_KTHREAD = 0x00200000
+# fields after the ") " closing the comm: state is field 3 of /proc/<pid>/stat, so field n is at n - 3
+FLAGS_FIELD = 9 - 3
+UTIME_FIELD = 14 - 3
+STIME_FIELD = 15 - 3
+PROCESSOR_FIELD = 39 - 3
+# the stat line runs past 300 bytes with the counters of a long running thread
+STAT_BUFFER_SIZE = 1024
+
+
+def parse_task_stat(data):
+    """
+    Picks the fields the placement needs out of /proc/<pid>/task/<tid>/stat.
+    The comm can hold spaces and parentheses, the fields start after the last ")".
+    :param data: bytes
+    :return: comm, flags, cpu time in clock ticks, cpu last run on
+    """
+    comm_start = data.index(b"(")
+    comm_end = data.rindex(b")")
+    fields = data[comm_end + 2:].split()
+    return (bytes(data[comm_start + 1:comm_end]).decode(errors="replace"), int(fields[FLAGS_FIELD]),
+            int(fields[UTIME_FIELD]) + int(fields[STIME_FIELD]), int(fields[PROCESSOR_FIELD]))
+
+
+class Task(object):
+    """
+    A user thread with the share of a cpu it used between the last two samples.
+    """
+
+    def __init__(self, pid, tid, comm):
+        self.pid = pid
+        self.tid = tid
+        self.comm = comm
+
+        self.ticks = None
+        self.timestamp = None
+        # 0..1 of one cpu
+        self.usage = 0.0
+        self.cpu = None
+
+    def update(self, ticks, cpu, timestamp, clock_ticks):
+        if self.timestamp is not None and timestamp > self.timestamp:
+            self.usage = (ticks - self.ticks) / clock_ticks / (timestamp - self.timestamp)
+        self.ticks = ticks
+        self.cpu = cpu
+        self.timestamp = timestamp
+
+
+class TaskMonitor(object):
+    """
+    CPU usage and last cpu of the busiest user threads, from /proc/<pid>/task/<tid>/stat.
+    Every thread is read once per rescan, the busiest max_tasks of them are kept open in between and
+    sampled with a pread each, so a sample costs the same on a machine running thousands of threads.
+    """
+
+    def __init__(self, sysfs, rescan_seconds=5.0, max_tasks=16, min_usage=0.05):
+        """
+        :param sysfs:
+        :param rescan_seconds: how often all threads are read to find the busy ones
+        :param max_tasks: busy threads kept open between rescans
+        :param min_usage: share of a cpu a thread needs to be kept open
+        """
+        self.sysfs = sysfs
+        self.rescan_seconds = rescan_seconds
+        self.max_tasks = max_tasks
+        self.min_usage = min_usage
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+
+        # tid -> (cpu time in ticks, timestamp) seen by the last rescan
+        self.scanned = {}
+        self.last_rescan = None
+
+        # tid -> Task, the busy threads kept open
+        self.tasks = {}
+        self.attributes = {}
+
+        self.rescans = 0
+
+    def sample(self, timestamp):
+        """
+        Updates the busy threads, rescans all of them every rescan_seconds.
+        :param timestamp: seconds
+        :return: busy Tasks
+        """
+        if self.last_rescan is None or timestamp - self.last_rescan >= self.rescan_seconds:
+            self.rescan(timestamp)
+            return list(self.tasks.values())
+
+        for tid, attribute in list(self.attributes.items()):
+            try:
+                comm, flags, ticks, cpu = parse_task_stat(attribute.read_bytes())
+            except (OSError, IndexError, ValueError):
+                # exited since the last rescan, or a torn read
+                self.drop(tid)
+                continue
+            self.tasks[tid].update(ticks, cpu, timestamp, self.clock_ticks)
+        return list(self.tasks.values())
+
+    def rescan(self, timestamp):
+        """
+        Reads every thread once, keeps the busiest open.
+        :param timestamp:
+        :return:
+        """
+        self.rescans += 1
+        scanned = {}
+        candidates = []
+        for path in self.sysfs.glob(TASK_PATTERN):
+            parts = path.split("/")
+            pid, tid = int(parts[2]), int(parts[4])
+            try:
+                attribute = self.sysfs.attribute(path + "/stat", buffer_size=STAT_BUFFER_SIZE)
+                try:
+                    comm, flags, ticks, cpu = parse_task_stat(attribute.read_bytes())
+                finally:
+                    attribute.close()
+            except (OSError, IndexError, ValueError):
+                # exited while listing, or a torn read
+                continue
+            if flags & PF_KTHREAD:
+                continue
+
+            scanned[tid] = (ticks, timestamp)
+            task = self.tasks.get(tid)
+            if task is None:
+                task = Task(pid, tid, comm)
+                if tid in self.scanned:
+                    task.ticks, task.timestamp = self.scanned[tid]
+            task.update(ticks, cpu, timestamp, self.clock_ticks)
+            if task.usage >= self.min_usage:
+                candidates.append(task)
+
+        candidates.sort(key=lambda candidate: candidate.usage, reverse=True)
+        busy = {task.tid: task for task in candidates[:self.max_tasks]}
+        for tid in list(self.attributes):
+            if tid not in busy:
+                self.drop(tid)
+        for tid, task in busy.items():
+            if tid not in self.attributes:
+                self.attributes[tid] = self.sysfs.attribute("/proc/{:d}/task/{:d}/stat".format(task.pid, tid),
+                                                            buffer_size=STAT_BUFFER_SIZE)
+        self.tasks = busy
+        self.scanned = scanned
+        self.last_rescan = timestamp
+
+    def drop(self, tid):
+        self.tasks.pop(tid, None)
+        attribute = self.attributes.pop(tid, None)
+        if attribute is not None:
+            attribute.close()
+
+    def close(self):
+        for tid in list(self.attributes):
+            self.drop(tid)
@@ -0,0 +1,95 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+PROC_STAT_PATH = "/proc/stat"
+CPU_PRESSURE_PATH = "/proc/pressure/cpu"
+
+# /proc/stat cpu line: user nice system idle iowait irq softirq steal guest guest_nice
+IDLE_FIELDS = (3, 4)
+# guest time is already counted in user and nice
+ACCOUNTED_FIELDS = 8
+
+
+class WorkloadMonitor(object):
+    """
+    Samples CPU utilisation from /proc/stat and CPU pressure (PSI) from /proc/pressure/cpu.
+    Both are read with a single pread of the first line into the attribute's buffer,
+    only the counters are parsed and compared to the previous sample.
+    """
+
+    def __init__(self, sysfs):
+        self.stat = sysfs.attribute(PROC_STAT_PATH)
+        # kernels built without PSI or booted with psi=0 don't have it
+        self.pressure = sysfs.attribute(CPU_PRESSURE_PATH) if sysfs.exists(CPU_PRESSURE_PATH) else None
+
+        # taken on the first sample
+        self.previous_busy = None
+        self.previous_total = None
+        self.previous_stall_us = None
+        self.previous_timestamp = None
+
+        self.utilisation = 0.0
+        self.pressure_fraction = 0.0
+
+    def sample(self, timestamp):
+        """
+        Updates utilisation and pressure with the deltas since the previous sample.
+        :param timestamp: seconds
+        :return: utilisation and pressure, both between 0 and 1
+        """
+        busy, total = self.read_cpu_times()
+        if self.previous_total is not None and total > self.previous_total:
+            self.utilisation = (busy - self.previous_busy) / (total - self.previous_total)
+        self.previous_busy = busy
+        self.previous_total = total
+
+        if self.pressure is not None:
+            stall_us = self.read_stall_us()
+            if self.previous_timestamp is not None and timestamp > self.previous_timestamp:
+                elapsed = timestamp - self.previous_timestamp
+                self.pressure_fraction = min(1.0, (stall_us - self.previous_stall_us) / (elapsed * 1e6))
+            self.previous_stall_us = stall_us
+
+        self.previous_timestamp = timestamp
+        return self.utilisation, self.pressure_fraction
+
+    def read_cpu_times(self):
+        """
+        :return: busy and total jiffies of all cpus
+        """
+        line = bytes(self.stat.read_bytes()).split(b"\n", 1)[0]
+        fields = line.split()[1:ACCOUNTED_FIELDS + 1]
+        total = 0
+        idle = 0
+        for index, field in enumerate(fields):
+            value = int(field)
+            total += value
+            if index in IDLE_FIELDS:
+                idle += value
+        return total - idle, total
+
+    def read_stall_us(self):
+        """
+        :return: total microseconds some task was stalled waiting for a cpu
+        """
+        line = bytes(self.pressure.read_bytes()).split(b"\n", 1)[0]
+        return int(line[line.rfind(b"total=") + len(b"total="):])
+
+    def close(self):
+        self.stat.close()
+        if self.pressure is not None:
+            self.pressure.close()
@@ -0,0 +1,290 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from drivers.IntelPstateDriver import IntelPstateDriver
+
+PSTATE_PATH = "/sys/devices/system/cpu/intel_pstate/"
+CPU_PATH = "/sys/devices/system/cpu/"
+CPUFREQ_PATH = "/sys/devices/system/cpu/cpufreq/"
+HWMON_PATH = "/sys/class/hwmon/hwmon0/"
+FAN_HWMON_PATH = "/sys/class/hwmon/hwmon1/"
+CORETEMP_DEVICE_PATH = "/sys/devices/platform/coretemp.0"
+PROC_STAT_PATH = "/proc/stat"
+CPU_PRESSURE_PATH = "/proc/pressure/cpu"
+CGROUP_ROOT = "/sys/fs/cgroup/"
+RAPL_PATH = "/sys/class/powercap/intel-rapl:0/"
+UNCORE_PATH = "/sys/devices/system/cpu/intel_uncore_frequency/package_00_die_00/"
+
+# jiffies per second in /proc/stat
+USER_HZ = 100
+
+# scaling drivers the tree can mimic
+DRIVERS = ("intel_pstate", "intel_cpufreq", "acpi-cpufreq", "amd-pstate-epp")
+CPUINFO_MIN_FREQ = 800000
+# with turbo
+CPUINFO_MAX_FREQ = 4000000
+UNCORE_MIN_FREQ = 800000
+UNCORE_MAX_FREQ = 3000000
+CPU_DMA_LATENCY_PATH = "/dev/cpu_dma_latency"
+# name and exit latency in us of the cpuidle states of every cpu
+IDLE_STATES = (("POLL", 0), ("C1", 2), ("C1E", 10), ("C6", 133))
+
+
+class FakeSysfsTree(object):
+    """
+    Minimal intel_pstate, cpufreq and coretemp tree set up on a sysfs backend that can create attributes.
+    Has just enough in it to construct and run the governors.
+    The intel_pstate drivers have their percent limits, the others one cpufreq policy per cpu and a global boost.
+    acpi-cpufreq lists its turbo range as a single frequency 1 MHz above the base, like the real one.
+    With hwp, intel_pstate and amd-pstate-epp policies have an energy performance preference, intel cpus an EPB.
+    /proc/stat follows the load given to advance_load(), CPU pressure stays at zero.
+    With fan, a thinkpad hwmon device has a pwm fan under firmware control.
+    The intel drivers come with one intel_uncore_frequency die at its full range.
+    Every cpu has intel_idle like cpuidle states and /dev/cpu_dma_latency takes PM QoS requests.
+    With core_sensors, coretemp has a Core N sensor per cpu and threads can be put in /proc with set_task().
+    """
+
+    def __init__(self, sysfs, min_perf_pct=20, max_perf_pct=100, num_pstates=30, turbo_pct=30, max_temp=90,
+                 crit_temp=100, temperature=40, cpu_count=4, power_limit_watts=25,
+                 max_energy_range_uj=262143328850, driver="intel_pstate", cpus_per_policy=1,
+                 hwp=True, fan=False, core_sensors=False):
+        if driver not in DRIVERS:
+            raise ValueError("Unknown scaling driver {:s}".format(driver))
+
+        self.sysfs = sysfs
+        self.driver = driver
+
+        self.min_perf_pct = min_perf_pct
+        self.max_perf_pct = max_perf_pct
+        self.num_pstates = num_pstates
+        self.turbo_pct = turbo_pct
+        self.cpu_count = cpu_count
+
+        self.busy_jiffies = 0.0
+        self.idle_jiffies = 0.0
+
+        self.max_energy_range_uj = max_energy_range_uj
+        self.energy_uj = 0.0
+
+        # highest frequency without turbo
+        self.base_freq = CPUINFO_MAX_FREQ * (100 - turbo_pct) // 100
+        self.cpuinfo_max_freq = self.base_freq + 1000 if driver == "acpi-cpufreq" else CPUINFO_MAX_FREQ
+        scaling_governor = "powersave" if driver in ("intel_pstate", "amd-pstate-epp") else "schedutil"
+        self.hwp = hwp and driver in ("intel_pstate", "amd-pstate-epp")
+
+        if driver in ("intel_pstate", "intel_cpufreq"):
+            for name, value in (("min_perf_pct", min_perf_pct), ("max_perf_pct", max_perf_pct),
+                                ("num_pstates", num_pstates), ("turbo_pct", turbo_pct), ("no_turbo", 0)):
+                self.write(PSTATE_PATH + name, value)
+            self.write(PSTATE_PATH + "status", "active" if driver == "intel_pstate" else "passive")
+            for name in ("initial_min_freq_khz", "min_freq_khz"):
+                self.write(UNCORE_PATH + name, UNCORE_MIN_FREQ)
+            for name in ("initial_max_freq_khz", "max_freq_khz"):
+                self.write(UNCORE_PATH + name, UNCORE_MAX_FREQ)
+        else:
+            self.write(CPUFREQ_PATH + "boost", 1)
+
+        for cpu in range(cpu_count):
+            cpu_path = CPU_PATH + "cpu{:d}/".format(cpu)
+            self.write(cpu_path + "topology/physical_package_id", 0)
+            self.write(cpu_path + "topology/core_id", cpu)
+            self.write(cpu_path + "cpufreq/scaling_driver", driver)
+            self.write(cpu_path + "cpufreq/scaling_governor", scaling_governor)
+            self.write(cpu_path + "cpufreq/cpuinfo_min_freq", CPUINFO_MIN_FREQ)
+            self.write(cpu_path + "cpufreq/cpuinfo_max_freq", self.cpuinfo_max_freq)
+            self.write(cpu_path + "cpufreq/scaling_min_freq", CPUINFO_MIN_FREQ)
+            self.write(cpu_path + "cpufreq/scaling_max_freq", self.cpuinfo_max_freq)
+            policy_cpu = cpu - cpu % cpus_per_policy
+            self.write(cpu_path + "cpufreq/related_cpus",
+                       " ".join(str(related) for related in range(policy_cpu, min(policy_cpu + cpus_per_policy,
+                                                                                  cpu_count))))
+
+            if driver not in ("intel_pstate", "intel_cpufreq") and cpu == policy_cpu:
+                # cpuN/cpufreq is a link to the policy on a real system, the backends can't follow links
+                self.write_policy(CPUFREQ_PATH + "policy{:d}/".format(cpu), scaling_governor)
+
+            if self.hwp and cpu == policy_cpu:
+                policy_path = CPUFREQ_PATH + "policy{:d}/".format(cpu)
+                self.write(policy_path + "energy_performance_preference", "balance_performance")
+                self.write(policy_path + "energy_performance_available_preferences",
+                           "default performance balance_performance balance_power power")
+            if self.hwp and driver == "intel_pstate":
+                self.write(cpu_path + "power/energy_perf_bias", 6)
+
+            for index, (name, latency) in enumerate(IDLE_STATES):
+                state_path = cpu_path + "cpuidle/state{:d}/".format(index)
+                self.write(state_path + "name", name)
+                self.write(state_path + "latency", latency)
+                self.write(state_path + "disable", 0)
+
+        sysfs.create_link(HWMON_PATH + "device", CORETEMP_DEVICE_PATH)
+        self.write(HWMON_PATH + "name", "coretemp")
+        self.write(HWMON_PATH + "temp1_label", "Package id 0")
+        self.write(HWMON_PATH + "temp1_max", max_temp * 1000)
+        self.write(HWMON_PATH + "temp1_crit", crit_temp * 1000)
+        self.write(HWMON_PATH + "temp1_input", int(temperature) * 1000)
+
+        self.core_temperatures = []
+        if core_sensors:
+            for cpu in range(cpu_count):
+                prefix = HWMON_PATH + "temp{:d}_".format(cpu + 2)
+                self.write(prefix + "label", "Core {:d}".format(cpu))
+                self.write(prefix + "max", max_temp * 1000)
+                self.write(prefix + "crit", crit_temp * 1000)
+                self.write(prefix + "input", int(temperature) * 1000)
+                self.core_temperatures.append(sysfs.attribute(prefix + "input", writable=True))
+        # tid -> stat attribute
+        self.tasks = {}
+
+        self.fan = fan
+        if fan:
+            self.write(FAN_HWMON_PATH + "name", "thinkpad")
+            self.write(FAN_HWMON_PATH + "pwm1_enable", 2)
+            self.write(FAN_HWMON_PATH + "pwm1", 128)
+
+        self.write(CPU_DMA_LATENCY_PATH, 2000000000)
+        self.write(PROC_STAT_PATH, self.format_proc_stat())
+        self.write(RAPL_PATH + "name", "package-0")
+        self.write(RAPL_PATH + "energy_uj", 0)
+        self.write(RAPL_PATH + "max_energy_range_uj", max_energy_range_uj)
+        self.write(RAPL_PATH + "constraint_0_name", "long_term")
+        self.write(RAPL_PATH + "constraint_0_power_limit_uw", power_limit_watts * 1000000)
+
+        self.write(CGROUP_ROOT + "cgroup.controllers", "cpu io memory pids")
+        self.write(CGROUP_ROOT + "cpu.stat", "usage_usec 0")
+        self.write(CPU_PRESSURE_PATH, "some avg10=0.00 avg60=0.00 avg300=0.00 total=0\n"
+                                      "full avg10=0.00 avg60=0.00 avg300=0.00 total=0")
+
+        # the tree is read every tick, keep the handles open like the governor does
+        self.temperature = sysfs.attribute(HWMON_PATH + "temp1_input", writable=True)
+        self.proc_stat = sysfs.attribute(PROC_STAT_PATH, writable=True)
+        self.energy = sysfs.attribute(RAPL_PATH + "energy_uj", writable=True)
+        if driver in ("intel_pstate", "intel_cpufreq"):
+            self.pstate_limits = [sysfs.attribute(PSTATE_PATH + name)
+                                  for name in ("min_perf_pct", "max_perf_pct", "no_turbo")]
+        else:
+            self.pstate_limits = [sysfs.attribute(CPUFREQ_PATH + "policy0/" + name)
+                                  for name in ("scaling_min_freq", "scaling_max_freq")]
+            self.pstate_limits.append(sysfs.attribute(CPUFREQ_PATH + "boost"))
+
+    def write(self, path, value):
+        self.sysfs.create(path, value)
+
+    def write_policy(self, policy_path, scaling_governor):
+        self.write(policy_path + "scaling_driver", self.driver)
+        self.write(policy_path + "scaling_governor", scaling_governor)
+        self.write(policy_path + "cpuinfo_min_freq", CPUINFO_MIN_FREQ)
+        self.write(policy_path + "cpuinfo_max_freq", self.cpuinfo_max_freq)
+        self.write(policy_path + "scaling_min_freq", CPUINFO_MIN_FREQ)
+        self.write(policy_path + "scaling_max_freq", self.cpuinfo_max_freq)
+
+        if self.driver == "acpi-cpufreq":
+            frequencies = [self.cpuinfo_max_freq] + list(range(self.base_freq, CPUINFO_MIN_FREQ - 1, -200000))
+            self.write(policy_path + "scaling_available_frequencies", " ".join(str(value) for value in frequencies))
+        elif self.driver == "amd-pstate-epp":
+            self.write(policy_path + "amd_pstate_max_freq", CPUINFO_MAX_FREQ)
+
+    def set_temperature(self, temperature):
+        # coretemp reports whole degrees
+        self.temperature.write_int(int(temperature) * 1000)
+
+    def set_core_temperatures(self, temperatures):
+        for attribute, temperature in zip(self.core_temperatures, temperatures):
+            attribute.write_int(int(temperature) * 1000)
+
+    def set_task(self, pid, tid, comm, ticks, cpu):
+        """
+        Writes /proc/<pid>/task/<tid>/stat of a user thread.
+        :param pid:
+        :param tid:
+        :param comm:
+        :param ticks: user cpu time in clock ticks
+        :param cpu: cpu it last ran on
+        :return:
+        """
+        # pid (comm) state ppid pgrp session tty tpgid flags minflt cminflt majflt cmajflt utime stime ... processor
+        fields = ["R", 1, pid, pid, 0, -1, 0x400000, 0, 0, 0, 0, int(ticks), 0] + [0] * 23 + [cpu] + [0] * 13
+        line = "{:d} ({:s}) {:s}".format(tid, comm, " ".join(str(field) for field in fields))
+        if tid not in self.tasks:
+            self.write("/proc/{:d}/task/{:d}/stat".format(pid, tid), line)
+            self.tasks[tid] = self.sysfs.attribute("/proc/{:d}/task/{:d}/stat".format(pid, tid), writable=True)
+        else:
+            self.tasks[tid].write_str(line)
+
+    def advance_load(self, load, duration):
+        """
+        Accounts the cpu time of running at the given load for the given duration.
+        :param load: 0 to 1
+        :param duration: seconds
+        :return:
+        """
+        jiffies = duration * USER_HZ * self.cpu_count
+        self.busy_jiffies += jiffies * load
+        self.idle_jiffies += jiffies * (1 - load)
+        self.proc_stat.write_str(self.format_proc_stat())
+
+    def advance_energy(self, joules):
+        """
+        Adds to the RAPL package energy counter, wrapping around like the hardware one.
+        :param joules:
+        :return:
+        """
+        self.energy_uj = (self.energy_uj + joules * 1e6) % self.max_energy_range_uj
+        self.energy.write_int(int(self.energy_uj))
+
+    def format_proc_stat(self):
+        return "cpu  {:d} 0 0 {:d} 0 0 0 0 0 0\n".format(int(self.busy_jiffies), int(self.idle_jiffies))
+
+    def get_pstate_limits(self):
+        """
+        :return: min_perf_pct, max_perf_pct and no_turbo as the governor left them, whatever the driver
+        """
+        if self.driver in ("intel_pstate", "intel_cpufreq"):
+            return tuple(attribute.read_int() for attribute in self.pstate_limits)
+
+        min_freq, max_freq, boost = (attribute.read_int() for attribute in self.pstate_limits)
+        return self.get_frequency_pct(min_freq), self.get_frequency_pct(max_freq), 0 if boost else 1
+
+    def get_energy_profile(self):
+        """
+        :return: EPP of the first policy, None without hwp
+        """
+        if not self.hwp:
+            return None
+        return self.sysfs.read_str(CPUFREQ_PATH + "policy0/energy_performance_preference")
+
+    def get_fan_duty(self):
+        """
+        :return: duty pct the fan was set to, None without a fan or under firmware control
+        """
+        if not self.fan or self.sysfs.read_int(FAN_HWMON_PATH + "pwm1_enable") != 1:
+            return None
+        return self.sysfs.read_int(FAN_HWMON_PATH + "pwm1") * 100 / 255
+
+    def get_frequency_pct(self, frequency):
+        # acpi-cpufreq's top frequency lets the whole turbo range in
+        if frequency >= self.cpuinfo_max_freq:
+            return 100
+        return frequency * 100 // CPUINFO_MAX_FREQ
+
+    def get_noturbo_max_pct(self):
+        """
+        :return: the pct the package really runs at with turbo off
+        """
+        if self.driver in ("intel_pstate", "intel_cpufreq"):
+            return IntelPstateDriver(self.sysfs).noturbo_max_pct
+        return self.get_frequency_pct(self.base_freq)
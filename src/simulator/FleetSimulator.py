@@ -0,0 +1,208 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import contextlib
+import os
+import tempfile
+
+from drivers.DriverDetection import detect_driver
+from fleet.FleetCoordinator import FleetCoordinator
+from fleet.FleetNode import FleetNode
+from modes.pstate.PerformanceGovernor import PerformancePstateGovernor
+from sensors.HwmonIndex import HwmonIndex
+from simulator.FakeSysfsTree import CPU_PATH, FakeSysfsTree
+from simulator.ThermalPlant import ThermalPlant
+from sysfs.MemorySysfsBackend import MemorySysfsBackend
+
+# seconds the plants are advanced by between ticks
+STEP_SECONDS = 0.25
+
+
+class SimulatedNode(object):
+    """
+    One daemon of the fleet: a fake sysfs tree, a thermal plant and a real governor, with its FleetNode if any.
+    """
+
+    def __init__(self, name, trace, governor_class, clock, max_pct=None, max_temp=90):
+        self.name = name
+        self.trace = trace
+        self.sysfs = MemorySysfsBackend()
+        self.plant = ThermalPlant()
+        self.tree = FakeSysfsTree(self.sysfs, max_temp=max_temp, temperature=self.plant.die_temperature)
+        self.driver = detect_driver(self.sysfs)
+        self.governor = governor_class(self.driver, HwmonIndex(self.sysfs), self.sysfs)
+        self.governor.clock = self.governor.scheduler.clock = clock
+        # the percore mode throttles through these instead of the global limits
+        self.scaling_max_freq = [self.sysfs.attribute(CPU_PATH + "cpu{:d}/cpufreq/scaling_max_freq".format(cpu))
+                                 for cpu in range(self.tree.cpu_count)]
+        if max_pct is not None:
+            # a static share of the budget, the way a fleet is capped without a coordinator
+            self.governor.max_pct_limit = max_pct
+            self.governor.apply_settings_limits()
+        self.next_tick = 0.0
+
+        self.work = 0.0
+        self.busy_seconds = 0.0
+
+    def get_load(self, timestamp):
+        """
+        :param timestamp: seconds
+        :return: load of the trace at that time, the trace repeats
+        """
+        timestamp %= sum(duration for duration, _ in self.trace)
+        for duration, load in self.trace:
+            if timestamp < duration:
+                return load
+            timestamp -= duration
+        return self.trace[-1][1]
+
+    def advance(self, timestamp, duration):
+        """
+        Runs the governor if its poll period is up and the package for the given duration.
+        :param timestamp: seconds
+        :param duration: seconds
+        :return: package watts
+        """
+        if timestamp >= self.next_tick:
+            self.governor.tick()
+            self.next_tick = timestamp + self.governor.get_poll_period()
+
+        min_perf_pct, max_perf_pct, no_turbo = self.tree.get_pstate_limits()
+        pct = max(max_perf_pct, min_perf_pct)
+        pct = sum(min(pct, self.tree.get_frequency_pct(attribute.read_int()))
+                  for attribute in self.scaling_max_freq) / len(self.scaling_max_freq)
+        load = self.get_load(timestamp)
+
+        self.plant.advance(pct, load, duration)
+        self.tree.advance_load(load, duration)
+        self.tree.advance_energy(self.plant.power * duration)
+        self.tree.set_temperature(self.plant.die_temperature)
+
+        # pct seconds of useful work, what the load would have got done
+        self.work += pct * load * duration
+        self.busy_seconds += load * duration
+        return self.plant.power
+
+    def close(self):
+        self.governor.exit()
+        if self.governor.fleet is not None:
+            self.governor.fleet.close()
+        self.driver.close()
+
+
+class FleetSimulator(object):
+    """
+    Runs several simulated daemons in lockstep on simulated time, optionally reporting over a Unix socket
+    to an in-process fleet coordinator, and measures the fleet power against the budget.
+    The sockets, the protocol and the coordinator are the real ones, only the clock is simulated.
+    """
+
+    def __init__(self, traces, budget_watts, duration, coordinated=True, static_caps=False, outage=None,
+                 governor_class=PerformancePstateGovernor, lease_seconds=5.0):
+        """
+        :param traces: list of load traces, one node each
+        :param budget_watts: package power the fleet may draw in total
+        :param duration: simulated seconds
+        :param coordinated: run the coordinator and connect the nodes to it
+        :param static_caps: cap every node at an equal share of the budget instead
+        :param outage: (start, end) seconds the coordinator is down for, or None
+        :param governor_class: PstateGovernor subclass every node runs
+        :param lease_seconds: ceiling lease of the coordinator
+        """
+        self.traces = traces
+        self.budget_watts = budget_watts
+        self.duration = duration
+        self.coordinated = coordinated
+        self.static_caps = static_caps
+        self.outage = outage
+        self.governor_class = governor_class
+        self.lease_seconds = lease_seconds
+
+        self.time = 0.0
+
+    def get_static_pct(self):
+        """
+        :return: max pct of an equal budget share at full load
+        """
+        plant = ThermalPlant()
+        share = self.budget_watts / len(self.traces) - plant.idle_power
+        return int(100 * max(0.0, share / plant.max_power) ** (1 / plant.power_exponent))
+
+    def run(self):
+        """
+        Runs the fleet for the whole duration.
+        :return: dict of results
+        """
+        self.time = 0.0
+        clock = lambda: self.time
+
+        with tempfile.TemporaryDirectory() as root, open(os.devnull, "w") as devnull, \
+                contextlib.redirect_stdout(devnull):
+            address = "unix:" + os.path.join(root, "coordinator.sock")
+            coordinator = None
+            if self.coordinated:
+                coordinator = FleetCoordinator(address, self.budget_watts, lease_seconds=self.lease_seconds,
+                                               clock=clock)
+
+            max_pct = self.get_static_pct() if self.static_caps else None
+            nodes = []
+            for index, trace in enumerate(self.traces):
+                node = SimulatedNode("node{:d}".format(index), trace, self.governor_class, clock, max_pct)
+                if self.coordinated:
+                    node.governor.fleet = FleetNode(address, node.name, node.sysfs)
+                node.governor.enter()
+                nodes.append(node)
+
+            results = {
+                "energy": 0.0,
+                "time_over_budget": 0.0,
+                "fallback_seconds": 0.0,
+            }
+            while self.time < self.duration:
+                in_outage = self.outage is not None and self.outage[0] <= self.time < self.outage[1]
+                if coordinator is not None and in_outage:
+                    coordinator.close()
+                    coordinator = None
+                elif coordinator is None and self.coordinated and not in_outage:
+                    coordinator = FleetCoordinator(address, self.budget_watts, lease_seconds=self.lease_seconds,
+                                                   clock=clock)
+
+                power = sum(node.advance(self.time, STEP_SECONDS) for node in nodes)
+                if coordinator is not None:
+                    coordinator.poll()
+
+                results["energy"] += power * STEP_SECONDS
+                if power > self.budget_watts:
+                    results["time_over_budget"] += STEP_SECONDS
+                if self.coordinated and any(node.governor.fleet.get_ceiling(self.time) is None for node in nodes):
+                    results["fallback_seconds"] += STEP_SECONDS
+                self.time += STEP_SECONDS
+
+            reconnects = sum(max(0, node.governor.fleet.connects - 1) for node in nodes) if self.coordinated else 0
+            for node in nodes:
+                node.close()
+            if coordinator is not None:
+                coordinator.close()
+
+        return {
+            "mean_power": results["energy"] / self.time,
+            "time_over_budget": results["time_over_budget"],
+            "fallback_seconds": results["fallback_seconds"],
+            "reconnects": reconnects,
+            "node_pct": [node.work / max(node.busy_seconds, 1e-9) for node in nodes],
+            "mean_busy_pct": sum(node.work for node in nodes) / sum(node.busy_seconds for node in nodes),
+        }
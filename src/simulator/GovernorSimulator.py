@@ -0,0 +1,176 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import contextlib
+import os
+import random
+import tempfile
+import time
+
+from drivers.DriverDetection import detect_driver
+from fans.FanController import FanController
+from fans.FanDetection import detect_fans
+from sensors.HwmonIndex import HwmonIndex
+from simulator.FakeSysfsTree import FakeSysfsTree
+from simulator.ThermalPlant import ThermalPlant
+from sysfs.DirectorySysfsBackend import DirectorySysfsBackend
+from sysfs.MemorySysfsBackend import MemorySysfsBackend
+
+BACKENDS = ("memory", "directory")
+
+# rough share of the allowed pct the hardware picks under each EPP while busy
+EPP_PCT_SCALE = {"performance": 1.0, "balance_performance": 0.95, "balance_power": 0.85, "power": 0.75}
+
+
+def get_firmware_fan_duty(temperature):
+    """
+    Fan duty of a typical laptop firmware curve, slow from 50 degrees, full speed only at 95.
+    :param temperature:
+    :return: pct
+    """
+    return max(0.0, min(100.0, (temperature - 50) * 100 / 45))
+
+
+class GovernorSimulator(object):
+    """
+    Runs a real governor against a fake sysfs tree and a thermal plant, on simulated time.
+    Every tick goes through the governor's own tick() and get_poll_period(), so the sysfs reads and writes,
+    the controller and the adaptive poll period are the ones the service would run.
+    """
+
+    def __init__(self, governor_class, trace, plant=None, sensor_noise=0.0, max_temp=90, backend="memory",
+                 fan_curve=None, **tree_options):
+        """
+        :param governor_class: PstateGovernor subclass to run
+        :param trace: list of (seconds, load)
+        :param plant: ThermalPlant, a default one if omitted
+        :param sensor_noise: standard deviation of the sensor reading in degrees
+        :param max_temp: package temperature limit
+        :param backend: "memory" for a dict, "directory" for regular files on tmpfs (or the temp dir without one)
+        :param fan_curve: FanCurve the governor runs the fan on, needs fan=True, the firmware runs it if omitted
+        :param tree_options: passed on to FakeSysfsTree
+        """
+        self.governor_class = governor_class
+        self.trace = trace
+        self.plant = plant if plant is not None else ThermalPlant()
+        self.sensor_noise = sensor_noise
+        self.max_temp = max_temp
+        self.backend = backend
+        self.fan_curve = fan_curve
+        self.tree_options = tree_options
+
+        self.time = 0.0
+
+    def run(self):
+        """
+        Runs the whole trace.
+        :return: dict of results
+        """
+        noise = random.Random(1)
+        self.time = 0.0
+
+        if self.backend not in BACKENDS:
+            raise ValueError("Unknown sysfs backend {:s}".format(self.backend))
+
+        temp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        with tempfile.TemporaryDirectory(dir=temp_dir) as root, open(os.devnull, "w") as devnull, \
+                contextlib.redirect_stdout(devnull):
+            if self.backend == "memory":
+                sysfs = MemorySysfsBackend()
+            else:
+                sysfs = DirectorySysfsBackend(root)
+            tree = FakeSysfsTree(sysfs, max_temp=self.max_temp, temperature=self.plant.die_temperature,
+                                 **self.tree_options)
+
+            driver = detect_driver(sysfs)
+            governor = self.governor_class(driver, HwmonIndex(sysfs), sysfs)
+            governor.clock = governor.scheduler.clock = lambda: self.time
+            if self.fan_curve is not None:
+                governor.fans = FanController(detect_fans(sysfs), self.fan_curve)
+            noturbo_max_pct = tree.get_noturbo_max_pct()
+
+            results = {
+                "ticks": 0,
+                "time_over_limit": 0.0,
+                "pct_seconds": 0.0,
+                "loaded_pct_seconds": 0.0,
+                "loaded_seconds": 0.0,
+                "max_temperature": self.plant.die_temperature,
+                "tick_costs": [],
+            }
+
+            started = time.perf_counter()
+            governor.enter()
+
+            for duration, load in self.trace:
+                segment_end = self.time + duration
+                while self.time < segment_end:
+                    tick_started = time.perf_counter()
+                    governor.tick()
+                    period = governor.get_poll_period()
+                    results["tick_costs"].append(time.perf_counter() - tick_started)
+                    results["ticks"] += 1
+
+                    period = min(period, segment_end - self.time)
+
+                    min_perf_pct, max_perf_pct, no_turbo = tree.get_pstate_limits()
+                    pct = min(max_perf_pct, noturbo_max_pct) if no_turbo else max_perf_pct
+                    pct = max(pct, min_perf_pct)
+                    pct *= EPP_PCT_SCALE.get(tree.get_energy_profile(), 1.0)
+
+                    if tree.fan:
+                        fan_duty = tree.get_fan_duty()
+                        if fan_duty is None:
+                            fan_duty = get_firmware_fan_duty(self.plant.die_temperature)
+                        self.plant.fan_duty = fan_duty
+
+                    self.plant.advance(pct, load, period)
+                    tree.advance_load(load, period)
+                    tree.advance_energy(self.plant.power * period)
+                    self.time += period
+                    tree.set_temperature(self.plant.die_temperature + noise.gauss(0, self.sensor_noise))
+
+                    results["pct_seconds"] += pct * period
+                    if load >= 0.5:
+                        results["loaded_pct_seconds"] += pct * period
+                        results["loaded_seconds"] += period
+                    if self.plant.die_temperature > self.max_temp:
+                        results["time_over_limit"] += period
+                    results["max_temperature"] = max(results["max_temperature"], self.plant.die_temperature)
+
+            governor.exit()
+            if governor.fans is not None:
+                governor.fans.close()
+            driver.close()
+            wall_seconds = time.perf_counter() - started
+
+        return {
+            "ticks": results["ticks"],
+            "simulated_seconds": self.time,
+            "wall_seconds": wall_seconds,
+            "speedup": self.time / wall_seconds,
+            "time_over_limit": results["time_over_limit"],
+            "overshoot": max(0, results["max_temperature"] - self.max_temp),
+            "mean_pct": results["pct_seconds"] / self.time,
+            "mean_loaded_pct": results["loaded_pct_seconds"] / max(results["loaded_seconds"], 1e-9),
+            "sysfs_writes": governor.get_write_counters()["issued"],
+            "fan_holds": governor.metrics.fan_holds.value,
+            "tick_cost_us": sum(results["tick_costs"]) / results["ticks"] * 1e6,
+            "tick_costs_us": [cost * 1e6 for cost in results["tick_costs"]],
+            "energy": self.plant.energy,
+            "mean_power": self.plant.energy / self.time,
+        }
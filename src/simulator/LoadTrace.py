@@ -0,0 +1,35 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+# idle, sustained full load, half load, full load again, idle, then bursts
+SYNTHETIC_TRACE = [(60, 0.05), (300, 1.0), (120, 0.5), (240, 1.0), (60, 0.05)] + [(20, 1.0), (10, 0.1)] * 10
+
+
+def load_trace(path):
+    """
+    Reads a load trace from a CSV file of "seconds,load" lines, load between 0 and 1.
+    :param path:
+    :return: list of (seconds, load)
+    """
+    trace = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                seconds, load = line.split(",")
+                trace.append((float(seconds), float(load)))
+    return trace
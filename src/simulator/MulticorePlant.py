@@ -0,0 +1,83 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+class MulticorePlant(object):
+    """
+    Thermal model of a package with a die node per core on top of a shared heatsink.
+    Cores differ in how well they get rid of heat, like the ones next to the hot spot of a real die,
+    so the same thread runs hotter on some cores than on others.
+    Power of a core grows faster than linearly with the perf pct, like in ThermalPlant.
+    """
+
+    def __init__(self, core_resistances=(2.2, 2.0, 1.8, 0.8, 0.6, 0.5, 0.5, 0.5), ambient_temperature=35,
+                 core_capacity=0.3, heatsink_capacity=40.0, heatsink_resistance=0.4, idle_power=4,
+                 core_power=22, power_exponent=2.5, integration_step=0.02):
+        """
+        :param core_resistances: thermal resistance from each core to the heatsink in K/W
+        :param ambient_temperature: degrees
+        :param core_capacity: heat capacity of a core in J/K
+        :param heatsink_capacity: heat capacity of the heatsink in J/K
+        :param heatsink_resistance: thermal resistance from heatsink to air in K/W
+        :param idle_power: watts of the whole package without load
+        :param core_power: additional watts of a core busy at 100 pct
+        :param power_exponent: how steeply power grows with pct
+        :param integration_step: seconds
+        """
+        self.core_resistances = list(core_resistances)
+        self.ambient_temperature = ambient_temperature
+        self.core_capacity = core_capacity
+        self.heatsink_capacity = heatsink_capacity
+        self.heatsink_resistance = heatsink_resistance
+        self.idle_power = idle_power
+        self.core_power = core_power
+        self.power_exponent = power_exponent
+        self.integration_step = integration_step
+
+        self.core_temperatures = [ambient_temperature] * len(self.core_resistances)
+        self.heatsink_temperature = ambient_temperature
+        self.power = idle_power
+        self.energy = 0.0
+
+    def advance(self, pcts, loads, duration):
+        """
+        Runs the model forward with constant per core pcts and loads.
+        :param pcts: perf pct each core is allowed to run at
+        :param loads: share of time each core is busy, 0..1
+        :param duration: seconds
+        :return: the hottest core temperature at the end
+        """
+        idle_power = self.idle_power / len(self.core_resistances)
+        powers = [idle_power + load * self.core_power * (pct / 100) ** self.power_exponent
+                  for pct, load in zip(pcts, loads)]
+        self.power = sum(powers)
+
+        elapsed = 0
+        while elapsed < duration:
+            step = min(self.integration_step, duration - elapsed)
+
+            into_heatsink = 0.0
+            for core, (power, resistance) in enumerate(zip(powers, self.core_resistances)):
+                flow = (self.core_temperatures[core] - self.heatsink_temperature) / resistance
+                self.core_temperatures[core] += (power - flow) / self.core_capacity * step
+                into_heatsink += flow
+            heatsink_to_air = (self.heatsink_temperature - self.ambient_temperature) / self.heatsink_resistance
+            self.heatsink_temperature += (into_heatsink - heatsink_to_air) / self.heatsink_capacity * step
+            self.energy += self.power * step
+
+            elapsed += step
+
+        return max(self.core_temperatures)
@@ -0,0 +1,165 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import contextlib
+import os
+import time
+
+from config.ModeSettings import ModeSettings
+from drivers.DriverDetection import detect_driver
+from sensors.HwmonIndex import HwmonIndex
+from simulator.FakeSysfsTree import CPU_PATH, FakeSysfsTree
+from simulator.MulticorePlant import MulticorePlant
+from sysfs.MemorySysfsBackend import MemorySysfsBackend
+
+# comm, share of a cpu used, cpu it starts on: three busy workers on the cores by the hot spot, two light threads
+DEFAULT_THREADS = (
+    ("worker", 1.0, 0),
+    ("worker", 1.0, 1),
+    ("worker", 1.0, 2),
+    ("compositor", 0.1, 3),
+    ("daemon", 0.05, 4),
+)
+FIRST_TID = 1000
+
+
+class SimulatedThread(object):
+
+    def __init__(self, tid, comm, usage, cpu, cpus):
+        self.tid = tid
+        self.comm = comm
+        self.usage = usage
+        self.cpu = cpu
+        self.affinity = set(cpus)
+        self.ticks = 0.0
+
+
+class PlacementSimulator(object):
+    """
+    Runs a real governor with or without thermal placement against a fake sysfs tree with per core sensors,
+    a multicore thermal plant and a handful of threads.
+    The simulated scheduler leaves a thread on its cpu until its affinity rules the cpu out, then puts it
+    on the allowed cpu with the least work, so the only migrations are the ones placement asks for.
+    Throughput is the pct each busy thread ran at, summed up over time.
+    """
+
+    def __init__(self, governor_class, placement=None, duration=600, plant=None, threads=DEFAULT_THREADS,
+                 max_temp=90):
+        """
+        :param governor_class: PstateGovernor subclass to run
+        :param placement: suggest or apply, None runs the governor as it is
+        :param duration: simulated seconds of sustained load
+        :param plant: MulticorePlant, a default one if omitted
+        :param threads: list of (comm, usage, cpu)
+        :param max_temp: temperature limit
+        """
+        self.governor_class = governor_class
+        self.placement = placement
+        self.duration = duration
+        self.plant = plant if plant is not None else MulticorePlant()
+        self.threads = threads
+        self.max_temp = max_temp
+
+        self.time = 0.0
+
+    def run(self):
+        """
+        :return: dict of results
+        """
+        self.time = 0.0
+        cpu_count = len(self.plant.core_resistances)
+        clock_ticks = os.sysconf("SC_CLK_TCK")
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            sysfs = MemorySysfsBackend()
+            tree = FakeSysfsTree(sysfs, max_temp=self.max_temp, temperature=self.plant.ambient_temperature,
+                                 cpu_count=cpu_count, core_sensors=True)
+            threads = {}
+            for index, (comm, usage, cpu) in enumerate(self.threads):
+                thread = SimulatedThread(FIRST_TID + index, comm, usage, cpu, range(cpu_count))
+                threads[thread.tid] = thread
+                tree.set_task(FIRST_TID, thread.tid, comm, 0, cpu)
+            scaling_max_freq = [sysfs.attribute(CPU_PATH + "cpu{:d}/cpufreq/scaling_max_freq".format(cpu))
+                                for cpu in range(cpu_count)]
+
+            driver = detect_driver(sysfs)
+            governor = self.governor_class(driver, HwmonIndex(sysfs), sysfs)
+            governor.clock = governor.scheduler.clock = lambda: self.time
+            if self.placement is not None:
+                governor.configure(ModeSettings("placement", placement=self.placement))
+                governor.placement.get_affinity = lambda tid: set(threads[tid].affinity)
+                governor.placement.set_affinity = lambda tid, cpus: setattr(threads[tid], "affinity", set(cpus))
+            noturbo_max_pct = tree.get_noturbo_max_pct()
+
+            results = {
+                "ticks": 0,
+                "time_over_limit": 0.0,
+                "busy_pct_seconds": 0.0,
+                "busy_seconds": 0.0,
+                "max_temperature": self.plant.ambient_temperature,
+            }
+
+            started = time.perf_counter()
+            governor.enter()
+            while self.time < self.duration:
+                governor.tick()
+                period = min(governor.get_poll_period(), self.duration - self.time)
+                results["ticks"] += 1
+
+                min_perf_pct, max_perf_pct, no_turbo = tree.get_pstate_limits()
+                pct = min(max_perf_pct, noturbo_max_pct) if no_turbo else max_perf_pct
+                pct = max(pct, min_perf_pct)
+                pcts = [min(pct, tree.get_frequency_pct(attribute.read_int())) for attribute in scaling_max_freq]
+
+                loads = [0.0] * cpu_count
+                for thread in threads.values():
+                    if thread.cpu not in thread.affinity:
+                        thread.cpu = min(sorted(thread.affinity), key=lambda cpu: loads[cpu] + sum(
+                            other.usage for other in threads.values() if other.cpu == cpu and other is not thread))
+                    loads[thread.cpu] += thread.usage
+
+                self.plant.advance(pcts, [min(1.0, load) for load in loads], period)
+                self.time += period
+
+                for thread in threads.values():
+                    thread.ticks += thread.usage * period * clock_ticks
+                    tree.set_task(FIRST_TID, thread.tid, thread.comm, thread.ticks, thread.cpu)
+                    if thread.usage >= 0.5:
+                        results["busy_pct_seconds"] += pcts[thread.cpu] * period
+                        results["busy_seconds"] += period
+                tree.set_core_temperatures(self.plant.core_temperatures)
+                hottest = max(self.plant.core_temperatures)
+                tree.set_temperature(hottest)
+
+                if hottest > self.max_temp:
+                    results["time_over_limit"] += period
+                results["max_temperature"] = max(results["max_temperature"], hottest)
+
+            governor.exit()
+            driver.close()
+            wall_seconds = time.perf_counter() - started
+
+        return {
+            "ticks": results["ticks"],
+            "wall_seconds": wall_seconds,
+            "time_over_limit": results["time_over_limit"],
+            "overshoot": max(0, results["max_temperature"] - self.max_temp),
+            "mean_busy_pct": results["busy_pct_seconds"] / max(results["busy_seconds"], 1e-9),
+            "migrations": governor.metrics.thread_migrations.value,
+            "affinities_left": sum(1 for thread in threads.values() if len(thread.affinity) < cpu_count),
+            "mean_power": self.plant.energy / self.time,
+        }
@@ -0,0 +1,92 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+
+class ThermalPlant(object):
+    """
+    Two node thermal model of a CPU package: a die with little heat capacity on top of a heatsink with a lot.
+    Power grows faster than linearly with the perf pct, as voltage goes up with the clock.
+    The defaults roughly behave like a 15-25 W laptop part that can't sustain full turbo.
+    """
+
+    def __init__(self, ambient_temperature=35, die_capacity=2.0, heatsink_capacity=40.0, die_resistance=0.25,
+                 heatsink_resistance=0.55, idle_power=5, max_power=95, power_exponent=2.5,
+                 integration_step=0.05, fan_cooling=0.0):
+        """
+        :param ambient_temperature: degrees
+        :param die_capacity: heat capacity of the die in J/K
+        :param heatsink_capacity: heat capacity of the heatsink in J/K
+        :param die_resistance: thermal resistance from die to heatsink in K/W
+        :param heatsink_resistance: thermal resistance from heatsink to air in K/W
+        :param idle_power: watts drawn without load
+        :param max_power: additional watts drawn at full load and 100 pct
+        :param power_exponent: how steeply power grows with pct
+        :param integration_step: seconds
+        :param fan_cooling: share of the heatsink resistance a fan at full speed takes away, 0 for a fixed airflow
+        """
+        self.ambient_temperature = ambient_temperature
+        self.die_capacity = die_capacity
+        self.heatsink_capacity = heatsink_capacity
+        self.die_resistance = die_resistance
+        self.heatsink_resistance = heatsink_resistance
+        self.idle_power = idle_power
+        self.max_power = max_power
+        self.power_exponent = power_exponent
+        self.integration_step = integration_step
+        self.fan_cooling = fan_cooling
+
+        # pct, only matters with fan_cooling
+        self.fan_duty = 0.0
+
+        self.die_temperature = ambient_temperature
+        self.heatsink_temperature = ambient_temperature
+        self.power = idle_power
+        self.energy = 0.0
+
+    def get_power(self, pct, load):
+        """
+        :param pct: perf pct the cpu is allowed to run at
+        :param load: share of time the cpu is busy, 0..1
+        :return: watts
+        """
+        return self.idle_power + load * self.max_power * (pct / 100) ** self.power_exponent
+
+    def advance(self, pct, load, duration):
+        """
+        Runs the model forward with constant pct and load.
+        :param pct:
+        :param load:
+        :param duration: seconds
+        :return: die temperature at the end
+        """
+        self.power = self.get_power(pct, load)
+        heatsink_resistance = self.heatsink_resistance * (1 - self.fan_cooling * self.fan_duty / 100)
+
+        elapsed = 0
+        while elapsed < duration:
+            step = min(self.integration_step, duration - elapsed)
+
+            die_to_heatsink = (self.die_temperature - self.heatsink_temperature) / self.die_resistance
+            heatsink_to_air = (self.heatsink_temperature - self.ambient_temperature) / heatsink_resistance
+
+            self.die_temperature += (self.power - die_to_heatsink) / self.die_capacity * step
+            self.heatsink_temperature += (die_to_heatsink - heatsink_to_air) / self.heatsink_capacity * step
+            self.energy += self.power * step
+
+            elapsed += step
+
+        return self.die_temperature
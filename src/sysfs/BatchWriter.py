@@ -0,0 +1,30 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+class BatchWriter(object):
+    """
+    Applies a batch of cached attribute writes at once, like a limit on every cpufreq policy of a big machine.
+    Writes go out one after the other on the calling thread, the attributes skip values that are already set.
+    benchmarks/batch-apply.py had a thread pool slower than serial writes up to 256 policies, so there is none.
+    """
+
+    def write_all(self, writes):
+        """
+        :param writes: list of (CachedSysfsAttribute, value)
+        :return: list of booleans in the order of writes, True where a write was issued
+        """
+        return [attribute.write_int(value) for attribute, value in writes]
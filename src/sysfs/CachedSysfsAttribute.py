@@ -0,0 +1,89 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+class CachedSysfsAttribute(object):
+    """
+    Wraps an attribute, remembers the last value written to it and skips writes that would not change anything.
+    Every verify_interval elided writes the attribute is read back, if someone else has changed it in the meantime
+    the shadow value is dropped and the write goes through.
+    Works on top of the attributes of any sysfs backend.
+    """
+
+    def __init__(self, attribute, verify_interval=20):
+        self.attribute = attribute
+        self.path = attribute.path
+
+        self.verify_interval = verify_interval
+
+        self.shadow_value = None
+        self.elided_since_verify = 0
+        self.seen_reopen_count = attribute.reopen_count
+
+        self.writes_issued = 0
+        self.writes_elided = 0
+        self.external_changes = 0
+
+    def write_int(self, value):
+        """
+        Writes the value unless it is already known to be set.
+        :param value:
+        :return: True if a write was issued
+        """
+        value = int(value)
+
+        if self.attribute.reopen_count != self.seen_reopen_count:
+            # the node may have been recreated with its default value
+            self.seen_reopen_count = self.attribute.reopen_count
+            self.invalidate()
+
+        if value == self.shadow_value:
+            self.elided_since_verify += 1
+            if self.elided_since_verify < self.verify_interval:
+                self.writes_elided += 1
+                return False
+
+            self.elided_since_verify = 0
+            if self.attribute.read_int() == value:
+                self.writes_elided += 1
+                return False
+
+            # somebody else wrote to the attribute, our shadow copy is stale
+            self.external_changes += 1
+            self.invalidate()
+
+        self.attribute.write_int(value)
+        self.shadow_value = value
+        self.elided_since_verify = 0
+        self.writes_issued += 1
+        return True
+
+    def invalidate(self):
+        """
+        Forgets the shadow value, the next write always goes through.
+        :return:
+        """
+        self.shadow_value = None
+        self.elided_since_verify = 0
+
+    def read_int(self):
+        return self.attribute.read_int()
+
+    def read_str(self):
+        return self.attribute.read_str()
+
+    def close(self):
+        self.attribute.close()
@@ -0,0 +1,69 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import glob
+import os
+
+from sysfs.SysfsAttribute import SysfsAttribute
+from sysfs.SysfsBackend import SysfsBackend
+
+
+class DirectorySysfsBackend(SysfsBackend):
+    """
+    Sysfs tree made of regular files under a directory, e.g. a tmpfs fixture mimicking intel_pstate and coretemp.
+    Writes truncate the file, so a shorter value doesn't leave the tail of the previous one behind.
+    """
+
+    def __init__(self, root, truncate_writes=True):
+        self.root = root
+        self.truncate_writes = truncate_writes
+
+    def get_path(self, path):
+        """
+        Translates a system path into a path under the root.
+        :param path:
+        :return:
+        """
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def attribute(self, path, writable=False, buffer_size=None):
+        return SysfsAttribute(self.get_path(path), writable, self.truncate_writes, buffer_size)
+
+    def exists(self, path):
+        return os.path.exists(self.get_path(path))
+
+    def isdir(self, path):
+        return os.path.isdir(self.get_path(path))
+
+    def glob(self, pattern):
+        root = os.path.join(self.root, "")
+        return ["/" + os.path.relpath(path, root) for path in glob.glob(self.get_path(pattern))]
+
+    def get_link_name(self, path):
+        return os.path.basename(os.path.realpath(self.get_path(path)))
+
+    def create(self, path, value):
+        path = self.get_path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # rewrite in place, open handles keep seeing the file
+        with open(path, "w") as f:
+            f.write("{}\n".format(value))
+
+    def create_link(self, path, target):
+        os.makedirs(self.get_path(target), exist_ok=True)
+        os.makedirs(os.path.dirname(self.get_path(path)), exist_ok=True)
+        os.symlink(self.get_path(target), self.get_path(path))
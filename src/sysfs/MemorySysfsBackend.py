@@ -0,0 +1,112 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import errno
+import fnmatch
+import os
+
+from sysfs.SysfsBackend import SysfsBackend
+
+
+class MemorySysfsAttribute(object):
+    """
+    Attribute of a MemorySysfsBackend. Has no file descriptor, so it can't be polled.
+    """
+
+    def __init__(self, backend, path, writable=False):
+        self.backend = backend
+        self.path = path
+        self.writable = writable
+
+        self.fd = None
+        self.reopen_count = 0
+
+        if path not in backend.values:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def reopen(self):
+        self.reopen_count += 1
+
+    def read_bytes(self):
+        return self.backend.values[self.path].encode()
+
+    def read_int(self):
+        return int(self.backend.values[self.path])
+
+    def read_str(self):
+        return self.backend.values[self.path].strip()
+
+    def write_bytes(self, data):
+        self.write_str(bytes(data).decode())
+
+    def write_int(self, value):
+        self.write_str(str(int(value)))
+
+    def write_str(self, value):
+        if not self.writable:
+            raise PermissionError(errno.EBADF, os.strerror(errno.EBADF), self.path)
+        self.backend.values[self.path] = value
+
+
+class MemorySysfsBackend(SysfsBackend):
+    """
+    Sysfs tree held in a dict of path to value, no system calls at all.
+    Used to measure the cost of the governor logic on its own.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.links = {}
+
+    def attribute(self, path, writable=False, buffer_size=None):
+        return MemorySysfsAttribute(self, path, writable)
+
+    def exists(self, path):
+        return path in self.values or path in self.links or self.isdir(path)
+
+    def isdir(self, path):
+        prefix = os.path.join(path, "")
+        return any(key.startswith(prefix) for key in self.get_paths())
+
+    def glob(self, pattern):
+        parts = pattern.strip("/").split("/")
+        matches = set()
+        for path in self.get_paths():
+            path_parts = path.strip("/").split("/")
+            if len(path_parts) < len(parts):
+                continue
+            if all(fnmatch.fnmatchcase(name, part) for name, part in zip(path_parts, parts)):
+                matches.add("/" + "/".join(path_parts[:len(parts)]))
+        return sorted(matches)
+
+    def get_link_name(self, path):
+        return os.path.basename(self.links.get(path, path).rstrip("/"))
+
+    def create(self, path, value):
+        self.values[path] = "{}\n".format(value)
+
+    def create_link(self, path, target):
+        self.links[path] = target
+
+    def get_paths(self):
+        return list(self.values) + list(self.links)
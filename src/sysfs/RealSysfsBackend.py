@@ -0,0 +1,33 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from sysfs.DirectorySysfsBackend import DirectorySysfsBackend
+
+
+class RealSysfsBackend(DirectorySysfsBackend):
+    """
+    The kernel's sysfs. Attributes replace their whole value on every write, no truncating needed.
+    """
+
+    def __init__(self):
+        super().__init__("/", truncate_writes=False)
+
+    def create(self, path, value):
+        raise NotImplementedError("Attributes can't be created on the real sysfs")
+
+    def create_link(self, path, target):
+        raise NotImplementedError("Links can't be created on the real sysfs")
@@ -0,0 +1,132 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import errno
+import os
+
+# errors that mean the node behind our file descriptor is gone (hotplug, module reload)
+STALE_HANDLE_ERRNOS = (errno.ENODEV, errno.ENOENT, errno.ENXIO, errno.EBADF, errno.ESTALE)
+
+
+class SysfsAttribute(object):
+    """
+    A single sysfs attribute that is opened once and kept open.
+    Reads use pread at offset 0 into a reused buffer, writes use pwrite, so a governor tick
+    costs one syscall per attribute instead of an open/read/close triplet.
+    If the node goes away, the handle is reopened once before giving up.
+    With truncate set, writes also cut the file to the written length, which regular files
+    standing in for sysfs (simulations) need to behave like attributes.
+    """
+
+    # fits sysfs attributes, the first line of /proc/stat and all of /proc/pressure/cpu,
+    # longer files such as /proc/<pid>/task/<tid>/stat ask for a bigger buffer
+    BUFFER_SIZE = 256
+
+    def __init__(self, path, writable=False, truncate=False, buffer_size=None):
+        """
+        :param path:
+        :param writable:
+        :param truncate: cut the file to the written length on every write
+        :param buffer_size: bytes read at most, BUFFER_SIZE if omitted
+        """
+        self.path = path
+        self.writable = writable
+        self.truncate = truncate
+
+        self.fd = None
+        self.buffer = bytearray(buffer_size or self.BUFFER_SIZE)
+        self.reopen_count = 0
+
+    def open(self):
+        """
+        Opens the attribute if it isn't open yet.
+        :return:
+        """
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDWR if self.writable else os.O_RDONLY)
+
+    def close(self):
+        """
+        Closes the underlying file descriptor, the next access will reopen it.
+        :return:
+        """
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except OSError:
+                pass
+            self.fd = None
+
+    def reopen(self):
+        self.close()
+        self.open()
+        self.reopen_count += 1
+
+    def read_bytes(self):
+        """
+        Reads the raw contents of the attribute.
+        :return:
+        """
+        try:
+            return self._pread()
+        except OSError as e:
+            if e.errno not in STALE_HANDLE_ERRNOS:
+                raise
+            self.reopen()
+            return self._pread()
+
+    def read_int(self):
+        return int(self.read_bytes())
+
+    def read_str(self):
+        return bytes(self.read_bytes()).decode().strip()
+
+    def write_bytes(self, data):
+        """
+        Writes raw bytes to the attribute.
+        :param data:
+        :return:
+        """
+        try:
+            self._pwrite(data)
+        except OSError as e:
+            if e.errno not in STALE_HANDLE_ERRNOS:
+                raise
+            self.reopen()
+            self._pwrite(data)
+
+    def write_int(self, value):
+        self.write_bytes(str(int(value)).encode())
+
+    def write_str(self, value):
+        self.write_bytes(value.encode())
+
+    def _pread(self):
+        self.open()
+        if hasattr(os, "preadv"):
+            count = os.preadv(self.fd, [self.buffer], 0)
+            return self.buffer[:count]
+        return os.pread(self.fd, len(self.buffer), 0)
+
+    def _pwrite(self, data):
+        self.open()
+        os.pwrite(self.fd, data, 0)
+        if self.truncate:
+            os.ftruncate(self.fd, len(data))
+
+    def __del__(self):
+        self.close()
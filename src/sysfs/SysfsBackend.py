@@ -0,0 +1,104 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from abc import ABCMeta, abstractmethod
+
+from sysfs.CachedSysfsAttribute import CachedSysfsAttribute
+
+
+class SysfsBackend(object):
+    """
+    Every sysfs read and write in the service goes through a backend.
+    Paths are always given as on a real system ("/sys/..."), the backend decides where they really live.
+    """
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def attribute(self, path, writable=False, buffer_size=None):
+        """
+        Gets a handle to an attribute, kept open until closed.
+        :param path:
+        :param writable:
+        :param buffer_size: bytes read at most, for files longer than a sysfs attribute
+        :return: attribute with read_bytes/read_int/read_str/write_bytes/write_int/write_str/close
+        """
+        pass
+
+    @abstractmethod
+    def exists(self, path):
+        pass
+
+    @abstractmethod
+    def isdir(self, path):
+        pass
+
+    @abstractmethod
+    def glob(self, pattern):
+        """
+        :param pattern: system path pattern
+        :return: matching system paths
+        """
+        pass
+
+    @abstractmethod
+    def get_link_name(self, path):
+        """
+        Name of the file a symlink (like hwmonN/device) points to.
+        :param path:
+        :return:
+        """
+        pass
+
+    def create(self, path, value):
+        """
+        Creates or overwrites an attribute, used to set up test and simulation trees.
+        :param path:
+        :param value:
+        :return:
+        """
+        raise NotImplementedError("{:s} can't create attributes".format(type(self).__name__))
+
+    def create_link(self, path, target):
+        raise NotImplementedError("{:s} can't create links".format(type(self).__name__))
+
+    def cached_attribute(self, path, verify_interval=20):
+        """
+        Gets a writable attribute that skips writes of values that are already set.
+        :param path:
+        :param verify_interval:
+        :return:
+        """
+        return CachedSysfsAttribute(self.attribute(path, writable=True), verify_interval)
+
+    def read_int(self, path):
+        """
+        One-off read of an attribute that isn't worth keeping open.
+        :param path:
+        :return:
+        """
+        attribute = self.attribute(path)
+        try:
+            return attribute.read_int()
+        finally:
+            attribute.close()
+
+    def read_str(self, path):
+        attribute = self.attribute(path)
+        try:
+            return attribute.read_str()
+        finally:
+            attribute.close()
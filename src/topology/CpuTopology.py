@@ -0,0 +1,76 @@
+# Copyright (C) 2018 Herman Õunapuu
+#
+# This file is part of Linux CPU Manager.
+#
+# Linux CPU Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Linux CPU Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Linux CPU Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import re
+
+
+class CpuTopology(object):
+    """
+    Maps logical CPUs to the physical package and core they belong to, and to the cpufreq policy they share.
+    Read once from /sys/devices/system/cpu/cpuN/topology, offline CPUs are left out.
+    """
+
+    def __init__(self, sysfs, cpu_path="/sys/devices/system/cpu/"):
+        self.sysfs = sysfs
+        self.cpu_path = cpu_path
+
+        # logical cpu number -> (physical package id, core id)
+        self.cpus = {}
+        # first cpu of a cpufreq policy -> the online cpus in it, writing to any of them sets the whole policy
+        self.policies = {}
+
+        self.read_topology()
+
+    def read_topology(self):
+        for cpu_dir in self.sysfs.glob(os.path.join(self.cpu_path, "cpu[0-9]*")):
+            cpu = int(re.search(r"(\d+)$", cpu_dir).group(1))
+            topology_dir = os.path.join(cpu_dir, "topology")
+            if not self.sysfs.isdir(topology_dir):
+                # offline cpus have no topology
+                continue
+
+            package_id = self.sysfs.read_int(os.path.join(topology_dir, "physical_package_id"))
+            core_id = self.sysfs.read_int(os.path.join(topology_dir, "core_id"))
+            self.cpus[cpu] = (package_id, core_id)
+
+        for cpu in sorted(self.cpus):
+            related_cpus_path = os.path.join(self.get_cpufreq_path(cpu), "related_cpus")
+            if self.sysfs.exists(related_cpus_path):
+                related_cpus = [int(value) for value in self.sysfs.read_str(related_cpus_path).split()]
+            else:
+                related_cpus = [cpu]
+            online_cpus = [related for related in related_cpus if related in self.cpus]
+            self.policies.setdefault(online_cpus[0] if online_cpus else cpu, []).append(cpu)
+
+    def get_packages(self):
+        return sorted(set(package_id for package_id, core_id in self.cpus.values()))
+
+    def get_cpus_of_core(self, package_id, core_id):
+        """
+        Gets the logical CPUs (hyperthreads) sharing a physical core.
+        :param package_id:
+        :param core_id:
+        :return: sorted list of cpu numbers
+        """
+        return sorted(cpu for cpu, location in self.cpus.items() if location == (package_id, core_id))
+
+    def get_cpus_of_package(self, package_id):
+        return sorted(cpu for cpu, location in self.cpus.items() if location[0] == package_id)
+
+    def get_cpufreq_path(self, cpu):
+        return os.path.join(self.cpu_path, "cpu{:d}".format(cpu), "cpufreq/")